@@ -0,0 +1,98 @@
+import json
+from datetime import timedelta
+
+# Marks JSON that has not been decoded yet, since the body may decode to None
+_UNDECODED = object()
+
+class APIResponse(object):
+    """
+    Fully read Grafana HTTP response kept in the data of Function Status dictionaries.
+    Exposes the parts of requests.Response used by callers. The JSON body is decoded on
+    first use and memoized, and the raw body is released once decoded.
+
+    :param status: HTTP status code
+    :type status: int
+    :param headers: Response headers
+    :type headers: dict
+    :param content: Response body
+    :type content: bytes
+    :param url: Requested URL
+    :type url: str
+    :param elapsed: Seconds taken by the request, including retries, kept as a timedelta like requests.Response.elapsed
+    :type elapsed: float
+    :param reason: HTTP reason phrase
+    :type reason: str
+    """
+    __slots__ = ('status_code', 'headers', 'url', 'elapsed', 'reason', '_content', '_json')
+
+    def __init__(self, status, headers, content, url=None, elapsed=0.0, reason=None):
+        """
+        Constructor Method
+        """
+        # Responses only exist once requests has been loaded
+        from requests.structures import CaseInsensitiveDict
+
+        self.status_code = status
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.url = url
+        self.elapsed = timedelta(seconds=elapsed)
+        self.reason = reason
+
+        self._content = content
+        self._json = _UNDECODED
+
+    @classmethod
+    def fromResponse(cls, x, elapsed=0.0):
+        """
+        Copies the parts of a requests.Response kept by APIResponse, so the Response can be freed.
+
+        :param x: Response to copy
+        :type x: requests.Response
+        :param elapsed: Seconds taken by the request, including retries
+        :type elapsed: float
+        :return: Response copy
+        :rtype: APIResponse
+        """
+        return cls(x.status_code, x.headers, x.content, x.url, elapsed, x.reason)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        """
+        Response body. Once the body has been decoded it is rebuilt from the decoded JSON.
+        """
+        if self._content is None:
+            return json.dumps(self._json).encode('utf-8')
+        return self._content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        """
+        Decodes JSON body on first call and releases the raw body.
+
+        :return: Decoded body
+        :rtype: dict or list
+        :raises ValueError: If the body is not JSON
+        """
+        if self._json is _UNDECODED:
+            self._json = json.loads(self._content)
+            self._content = None
+        return self._json
+
+    def raise_for_status(self):
+        """
+        :raises requests.exceptions.HTTPError: If the status code is 400 or above
+        """
+        from requests.exceptions import HTTPError
+
+        if not self.ok:
+            raise HTTPError(str(self.status_code) + " " + str(self.reason or '') + " for url: " + str(self.url), response=self)
+
+    def __repr__(self):
+        return '<APIResponse [' + str(self.status_code) + ']>'
@@ -0,0 +1,1089 @@
+import asyncio, time, gzip
+from contextlib import asynccontextmanager, nullcontext
+from os.path import exists
+from grafanaInterface import GrafanaManager, getHostLimit, getHostRateLimiter, GZIP_MIN_SIZE, RESUMED_STATUS, _minifiedDashboards, _hostGzipAccepted
+from dashboardTools import loadDashboardFile
+from apiResponse import APIResponse
+from requests.exceptions import HTTPError
+
+# aiohttp is only required by the asyncio interface
+import aiohttp
+
+# Earlier name of the response type, kept for existing imports
+AsyncResponse = APIResponse
+
+class AsyncGrafanaManager(GrafanaManager):
+    """
+    Grafana Manager interacting with Grafana Host from an asyncio event loop.
+    Network methods are coroutines returning the same Function Status dictionaries as GrafanaManager,
+    with APIResponse objects in data. Requests share the host limits, retries and metrics of GrafanaManager.
+    Bulk methods without an asyncio version run their GrafanaManager counterpart in a worker thread.
+    File handling methods are inherited unchanged.
+
+    :param host: Grafana Host 
+    :type host: str
+    :param username: Grafana Admin Username
+    :type username: str
+    :param password: Grafana Admin Password
+    :type password: str
+    :param infoFilePath: Path to User Information File
+    :type infoFilePath: str
+    :param infoFileDelimiter: User Information File Delimiter
+    :type infoFileDelimiter: str
+    :param key: Grafana API token
+    :type key: str
+    :param poolSize: Maximum number of kept-alive connections to Grafana Host
+    :type poolSize: int
+    :param hostConcurrency: Maximum number of concurrent requests to Grafana Host, defaults to poolSize
+    :type hostConcurrency: int
+    :param infoBackend: User Information File backend, 'file', 'sqlite' or a UserInfoStore object
+    :type infoBackend: str or UserInfoStore
+    :param userCacheSize: Maximum number of logins and emails kept in the user ID cache
+    :type userCacheSize: int
+    :param userCacheTTL: Seconds a cached user ID stays valid
+    :type userCacheTTL: float
+    :param dashboardCacheDir: Directory caching fetched dashboards, no caching when None
+    :type dashboardCacheDir: str
+    :param dashboardCacheSize: Maximum number of cached dashboards
+    :type dashboardCacheSize: int
+    :param dashboardCacheMaxAge: Seconds a cached dashboard is served without asking the server for its version
+    :type dashboardCacheMaxAge: float
+    :param retries: Number of times a request is retried after a connection error or a 429, 502, 503 or 504 response. Non-idempotent requests such as POST are only retried when they cannot have reached Grafana: failed connections and 429 or 503 responses
+    :type retries: int
+    :param backoffFactor: Base delay in seconds of the exponential backoff between retries
+    :type backoffFactor: float
+    :param maxBackoff: Longest delay in seconds between retries, including delays asked for by Retry-After
+    :type maxBackoff: float
+    :param rateLimit: Maximum requests per second to Grafana Host, no limit when None
+    :type rateLimit: float
+    :param rateBurst: Requests allowed back to back under rateLimit
+    :type rateBurst: int
+    :param minifyDashboards: Upload dashboard files re-serialized without whitespace instead of as written
+    :type minifyDashboards: bool
+    :param compressUploads: Gzip dashboard uploads, falling back to plain uploads if Grafana Host rejects them
+    :type compressUploads: bool
+    :param lazy: Defer creating the user information file and storing the admin login until the file is first used
+    :type lazy: bool
+    :param tokenCache: API token cache shared across processes, or path to its file. createAdminToken reuses its token until it nears expiry
+    :type tokenCache: str or TokenCache
+    :param tokenTTL: Seconds API tokens created through the token cache live, no expiry when None
+    :type tokenTTL: float
+    :param adminAuth: Authentication of admin requests, 'cookie' for the admin login or 'token' to try the API token first
+    :type adminAuth: str
+    :param journalDir: Directory of the journals kept by bulk methods given a job ID
+    :type journalDir: str
+    """
+    def __init__(self, host=None, username=None, password=None, infoFilePath=None, infoFileDelimiter=None, key=None, poolSize=10, hostConcurrency=None, infoBackend='file', userCacheSize=10000, userCacheTTL=300, dashboardCacheDir=None, dashboardCacheSize=500, dashboardCacheMaxAge=0, retries=3, backoffFactor=0.5, maxBackoff=30, rateLimit=None, rateBurst=None, minifyDashboards=False, compressUploads=False, lazy=False, tokenCache=None, tokenTTL=86400, adminAuth='cookie', journalDir='jobJournals'):
+        """
+        Constructor Method
+        """
+        super(AsyncGrafanaManager, self).__init__(host=host, username=username, password=password, infoFilePath=infoFilePath, infoFileDelimiter=infoFileDelimiter, key=key, poolSize=poolSize, hostConcurrency=hostConcurrency, infoBackend=infoBackend, userCacheSize=userCacheSize, userCacheTTL=userCacheTTL, dashboardCacheDir=dashboardCacheDir, dashboardCacheSize=dashboardCacheSize, dashboardCacheMaxAge=dashboardCacheMaxAge, retries=retries, backoffFactor=backoffFactor, maxBackoff=maxBackoff, rateLimit=rateLimit, rateBurst=rateBurst, minifyDashboards=minifyDashboards, compressUploads=compressUploads, lazy=lazy, tokenCache=tokenCache, tokenTTL=tokenTTL, adminAuth=adminAuth, journalDir=journalDir)
+
+        self._asyncSession = None
+        self._asyncLoginLock = None
+
+        # Runs bulk methods without an asyncio version, created on first use
+        self._syncManager = None
+
+    # Session Methods
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, excType, excValue, traceback):
+        await self.close()
+
+    def getSession(self):
+        """
+        Returns the shared aiohttp session, creating it on first use.
+        Must be called from within the running event loop.
+
+        :return: Pooled HTTP session
+        :rtype: aiohttp.ClientSession
+        """
+        if self._asyncSession is None or self._asyncSession.closed:
+            connector = aiohttp.TCPConnector(limit=self.poolSize, limit_per_host=self.hostConcurrency, ssl=False)
+            self._asyncSession = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.CookieJar(unsafe=True))
+            self._asyncLoginLock = asyncio.Lock()
+            self._loggedIn = False
+
+        return self._asyncSession
+
+    async def close(self):
+        """
+        Closes the shared session and its pooled connections.
+        """
+        if self._asyncSession is not None:
+            await self._asyncSession.close()
+            self._asyncSession = None
+        self._loggedIn = False
+
+        if self._syncManager is not None:
+            self._syncManager.closeSession()
+
+    def closeSession(self):
+        raise TypeError("Use 'await close()' to close an AsyncGrafanaManager session.")
+
+    def getSessionStats(self):
+        """
+        Obtains counters of the shared session.
+
+        :return: Number of logins
+        :rtype: dict
+        """
+        return {
+            "logins": self.loginCount
+        }
+
+    async def _login(self, generation=None):
+        """
+        Logs the shared session in to Grafana, skipping the login if another
+        task has already logged in since given generation.
+        """
+        self.getSession()
+
+        async with self._asyncLoginLock:
+            if generation is not None and generation != self._loginGeneration:
+                return
+
+            x = await self._send(
+                'POST',
+                '/grafana/login',
+                idempotent=True,
+                headers={'Content-Type': 'application/json'},
+                json={"password": self.password,"user": self.username}
+            )
+            self.loginCount += 1
+            self.requestMetrics.increment('logins')
+            self._loginGeneration += 1
+            self._loggedIn = x.status_code == 200
+
+    async def _adminRequest(self, method, path, **kwargs):
+        """
+        Sends request authenticated as the admin, see GrafanaManager._adminRequest. The admin login
+        cookie is logged in again once on 401.
+        """
+        if self.adminAuth == 'token' and self._adminTokenAccepted is not False:
+            if self.apiKey is None and self.tokenCache is not None:
+                await self._runSync('_cachedAdminToken', self._tokenName)
+
+            if self.apiKey is not None:
+                x = await self._tokenRequest(method, path, **kwargs)
+                if x.status_code != 403:
+                    return x
+                self._adminTokenAccepted = False
+
+        if not self._loggedIn:
+            await self._login(self._loginGeneration)
+
+        generation = self._loginGeneration
+        x = await self._send(method, path, **kwargs)
+
+        # Cookie expired or was revoked
+        if x.status_code == 401:
+            await self._login(generation)
+            x = await self._send(method, path, **kwargs)
+
+        return x
+
+    async def _tokenRequest(self, method, path, headers=None, **kwargs):
+        """
+        Sends request authenticated with the object's API token. With a token cache, a token Grafana
+        rejects is replaced through the cache and the request is sent once more.
+        """
+        requestHeaders = dict(headers or {})
+        requestHeaders['Authorization'] = "Bearer " + self.apiKey
+
+        x = await self._send(method, path, headers=requestHeaders, **kwargs)
+
+        # Token expired or was revoked
+        if x.status_code == 401 and self.tokenCache is not None:
+            rejectedKey = self.apiKey
+            if (await self._runSync('_cachedAdminToken', self._tokenName, rejectedKey))['success'] and self.apiKey != rejectedKey:
+                requestHeaders['Authorization'] = "Bearer " + self.apiKey
+                x = await self._send(method, path, headers=requestHeaders, **kwargs)
+
+        return x
+
+    async def _send(self, method, path, idempotent=None, **kwargs):
+        """
+        Sends request over the shared session and reads the whole body. Host concurrency slots,
+        the rate limit, retries and metrics are shared with GrafanaManager, see GrafanaManager._send.
+        """
+        session = self.getSession()
+        hostLimit = getHostLimit(self.host, self.hostConcurrency)
+        rateLimiter = getHostRateLimiter(self.host, self.rateLimit, self.rateBurst) if self.rateLimit else None
+
+        attempt = 0
+        requestStart = time.perf_counter()
+        while True:
+            if rateLimiter is not None:
+                delay = rateLimiter.take()
+                while delay > 0:
+                    await asyncio.sleep(delay)
+                    delay = rateLimiter.take()
+
+            startTime = time.perf_counter()
+            try:
+                async with _heldSlot(hostLimit), _heldSlot(self.requestLimit):
+                    async with session.request(method, self._url(path), **kwargs) as x:
+                        content = await x.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                self._recordAttempt(method, path, 'error', time.perf_counter() - startTime, 0, 0)
+                if not self._shouldRetry(method, idempotent, attempt, None, isinstance(error, aiohttp.ClientConnectorError)):
+                    raise
+                x = None
+            else:
+                bytesSent = int(x.request_info.headers.get('Content-Length') or 0)
+                self._recordAttempt(method, path, x.status, time.perf_counter() - startTime, bytesSent, len(content))
+
+            if x is not None and not self._shouldRetry(method, idempotent, attempt, x.status):
+                return APIResponse(x.status, x.headers, content, str(x.url), time.perf_counter() - requestStart, x.reason)
+
+            await asyncio.sleep(self._retryDelay(attempt, x))
+            attempt += 1
+            with self._counterLock:
+                self.retryCount += 1
+            self.requestMetrics.increment('retries')
+
+    def _adminSettingsError(self, requireInfoFile=False):
+        if self.password is None:
+            return "No Grafana host admin password specified to object."
+        if self.username is None:
+            return "No Grafana host username specified to object."
+        if self.host is None:
+            return "No Grafana host specified to object."
+        if requireInfoFile and self.infoFilePath is None:
+            return "No user information file path specified to object."
+        return None
+
+    def _tokenSettingsError(self):
+        if self.apiKey is None:
+            return "No Grafana API token specified to object."
+        if self.host is None:
+            return "No Grafana host specified to object."
+        return None
+
+    # Admin Methods
+
+    async def createNewUser(self, newUserName, newUserEmail, newUserLogin, newUserPassword):
+        """
+        Creates new Grafana user, automatically assigning to default organization
+
+        :param newUserName: New Grafana User Name
+        :type newUserName: str
+        :param newUserEmail: New Grafana User Email
+        :type newUserEmail: str
+        :param newUserLogin: New Grafana User Login Username
+        :type newUserLogin: str
+        :param newUserPassword: New Grafana User Password
+        :type newUserPassword: str
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._adminSettingsError(requireInfoFile=True)
+        if response['msg'] is not None:
+            return response
+
+        newUser = {
+            "name": newUserName,
+            "email": newUserEmail,
+            "login": newUserLogin,
+            "password": newUserPassword
+        }
+
+        x = await self._adminRequest(
+            'POST',
+            '/grafana/api/admin/users',
+            headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+            json=newUser
+        )
+
+        if x.status_code == 200:
+            response['success'] = True
+            response['msg'] = "Successfully created new Grafana user."
+            response['data'] = x
+
+            self.storeUserInfo(newUserLogin, newUserPassword)
+        else:
+            response['msg'] = "Failed to create new Grafana user."
+            response['data'] = x
+
+        return response
+
+    async def findUser(self, credential):
+        """
+        Find Grafana user
+
+        :param credential: Grafana username or email to find
+        :type credential: str
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._adminSettingsError()
+        if response['msg'] is not None:
+            return response
+
+        x = await self._adminRequest(
+            'GET',
+            '/grafana/api/users/lookup',
+            headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+            params={'loginOrEmail': str(credential)}
+        )
+
+        if x.status_code == 200:
+            response['success'] = True
+            response['msg'] = "Successfully found Grafana user."
+            response['data'] = x
+
+            self.userIdCache.put(x.json())
+        else:
+            response['msg'] = "Failed to find Grafana user."
+            response['data'] = x
+
+        return response
+
+    async def getAllUsers(self, pageSize=None):
+        """
+        Get all Grafana users
+
+        :param pageSize: Users fetched per page. When given, users are paged through
+            iterUsers and data holds the list of user dictionaries instead of the raw response
+        :type pageSize: int
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._adminSettingsError()
+        if response['msg'] is not None:
+            return response
+
+        if pageSize is not None:
+            try:
+                response['data'] = [user async for user in self.iterUsers(pageSize)]
+                response['success'] = True
+                response['msg'] = "Successfully found Grafana user."
+            except HTTPError as e:
+                response['msg'] = "Failed to find Grafana user."
+                response['data'] = e.response
+            return response
+
+        x = await self._adminRequest(
+            'GET',
+            '/grafana/api/users',
+            headers={'Content-Type': 'application/json', 'Accept': 'application/json'}
+        )
+
+        if x.status_code == 200:
+            response['success'] = True
+            response['msg'] = "Successfully found Grafana user."
+            response['data'] = x
+
+            for user in x.json():
+                self.userIdCache.put(user)
+        else:
+            response['msg'] = "Failed to find Grafana user."
+            response['data'] = x
+
+        return response
+
+    async def iterUsers(self, pageSize=1000, prefetch=True):
+        """
+        Lazily yields every Grafana user, one search page at a time, so only
+        about two pages are held in memory.
+
+        :param pageSize: Users fetched per page
+        :type pageSize: int
+        :param prefetch: Fetch the next page in the background while the current page is consumed
+        :type prefetch: bool
+        :return: Asynchronous generator of Grafana user dictionaries
+        :rtype: async generator
+        :raises ValueError: If host or admin login is not specified to object
+        :raises requests.exceptions.HTTPError: If a page fails to load
+        """
+        settingsError = self._adminSettingsError()
+        if settingsError is not None:
+            raise ValueError(settingsError)
+
+        async def fetchPage(page):
+            x = await self._adminRequest(
+                'GET',
+                '/grafana/api/users/search',
+                headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+                params={'perpage': pageSize, 'page': page}
+            )
+            x.raise_for_status()
+            return x.json()
+
+        page = 1
+        pending = asyncio.ensure_future(fetchPage(page)) if prefetch else None
+        fetched = 0
+        try:
+            while True:
+                result = await pending if prefetch else await fetchPage(page)
+                pending = None
+                users = result.get('users') or []
+                fetched += len(users)
+
+                hasMore = len(users) >= pageSize and fetched < result.get('totalCount', fetched + 1)
+                page += 1
+                if prefetch and hasMore:
+                    pending = asyncio.ensure_future(fetchPage(page))
+
+                for user in users:
+                    self.userIdCache.put(user)
+                    yield user
+
+                del users, result
+
+                if not hasMore:
+                    return
+        finally:
+            # Consumer stopped early
+            if pending is not None:
+                pending.cancel()
+
+    async def changePassword(self, credential, newPassword):
+        """
+        Change Grafana user password
+
+        :param credential: Grafana username or email to be updated
+        :type credential: str
+        :param newPassword: New Password of given user
+        :type newPassword: str
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._adminSettingsError(requireInfoFile=True)
+        if response['msg'] is not None:
+            return response
+
+        # Change Password
+        x, found = await self._updateUser(credential, 'password', {"password": newPassword})
+
+        # Return if user does not exist
+        if not found:
+            response['msg'] = "Failed to change password. User not found."
+            response['data'] = x
+            return response
+
+        if x.status_code == 200:
+            response['success'] = True
+            response['msg'] = "Successfully changed password for Grafana user."
+            response['data'] = x
+
+            self.storeUserInfo(credential, newPassword)
+        else:
+            response['msg'] = "Failed to change password for Grafana user."
+            response['data'] = x
+
+        return response
+
+    async def changeAdminPermission(self, credential, makeAdmin):
+        """
+        Change Grafana user admin permissions
+
+        :param credential: Grafana username or email to be updated
+        :type credential: str
+        :param makeAdmin: Give Admission Permission
+        :type makeAdmin: bool
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._adminSettingsError()
+        if response['msg'] is not None:
+            return response
+
+        # Change Admin Permission
+        x, found = await self._updateUser(credential, 'permissions', {"isGrafanaAdmin": makeAdmin})
+
+        # Return if user does not exist
+        if not found:
+            response['msg'] = "Failed to change admin permissions. User not found."
+            response['data'] = x
+            return response
+
+        if x.status_code == 200:
+            response['success'] = True
+            response['msg'] = "Successfully changed admin permissions for Grafana user."
+            response['data'] = x
+        else:
+            response['msg'] = "Failed to change admin permissions for Grafana user."
+            response['data'] = x
+
+        return response
+
+    async def _findUserId(self, credential):
+        """
+        Resolves login or email to user ID through the user ID cache, see GrafanaManager._findUserId.
+        """
+        userId = self.userIdCache.get(credential)
+        if userId is not None:
+            return userId, None
+
+        responseData = (await self.findUser(credential))['data']
+
+        if responseData.status_code != 200:
+            return None, responseData
+
+        return responseData.json()['id'], responseData
+
+    async def _updateUser(self, credential, pathSuffix, body):
+        """
+        Sends admin PUT for the user with given login or email, see GrafanaManager._updateUser.
+        """
+        while True:
+            userId, responseData = await self._findUserId(credential)
+
+            if userId is None:
+                return responseData, False
+
+            x = await self._adminRequest(
+                'PUT',
+                '/grafana/api/admin/users/' + str(userId) + '/' + pathSuffix,
+                headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+                json=body
+            )
+
+            # Cached ID belonged to a since deleted user, look it up again
+            if x.status_code == 404 and responseData is None:
+                self.userIdCache.invalidate(credential)
+                continue
+
+            return x, True
+
+    async def createAdminToken(self, tokenName="newToken"):
+        """
+        Generate new admin API token for object. With a token cache, the cached token of the host is
+        reused without logging in, and a new token is only created once it nears expiry.
+
+        :param tokenName: Name of new token
+        :type tokenName: str
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        self._tokenName = tokenName
+        if self.tokenCache is not None:
+            return await self._runSync('_cachedAdminToken', tokenName)
+
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._adminSettingsError()
+        if response['msg'] is not None:
+            return response
+
+        try:
+            x = await self._adminRequest(
+                'POST',
+                '/grafana/api/auth/keys',
+                headers={'Content-Type': 'application/json'},
+                json={"name": tokenName, "role":"Admin"}
+            )
+
+            if x.status_code == 200:
+                self.apiKey = x.json()['key']
+                response['success'] = True
+                response['msg'] = "Successfully created new Grafana API token."
+                response['data'] = x
+            else:
+                response['msg'] = "Failed to create new Grafana API token."
+                response['data'] = x
+        except KeyError:
+            response['msg'] = "Grafana API token with given name has already been created."
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            response['msg'] = "Failed to create new Grafana API token."
+
+        return response
+
+    # Dashboard Methods
+
+    async def createDashboard(self, fileDir, validate=False, queryBudget=None, transform=None):
+        """
+        Creates Grafana dashboard from given JSON file
+
+        :param fileDir: Path to JSON containing Grafana dashboard
+        :type fileDir: str
+        :param validate: Check the dashboard structure before uploading
+        :type validate: bool
+        :param queryBudget: Maximum allowed values of dashboard query load fields, see checkQueryBudget. Dashboards over budget are not uploaded
+        :type queryBudget: dict
+        :param transform: Function returning the payload to upload from a dashboard upload payload, e.g. collapseRows
+        :type transform: function
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._tokenSettingsError()
+        if response['msg'] is not None:
+            return response
+
+        response['msg'] = self._queryBudgetError(queryBudget)
+        if response['msg'] is not None:
+            return response
+
+        # Checked and transformed dashboards are uploaded from memory
+        if validate or queryBudget is not None or transform is not None:
+            try:
+                payload = await asyncio.to_thread(loadDashboardFile, fileDir)
+            except ValueError as e:
+                response['msg'] = "Invalid dashboard. Invalid JSON: " + str(e)
+                return response
+            return await self.createDashboardFromObject(payload, validate, queryBudget, transform)
+
+        # Read file off the event loop
+        if self.minifyDashboards:
+            body = await asyncio.to_thread(_minifiedDashboards.get, fileDir)
+            compressedBody = await asyncio.to_thread(_minifiedDashboards.getCompressed, fileDir) if self._useGzip() else None
+        else:
+            body = await asyncio.to_thread(_readFile, fileDir)
+            compressedBody = None
+
+        x = await self._postDashboard(body, compressedBody)
+
+        if x.status_code == 200:
+            response['success'] = True
+            response['msg'] = "Successfully uploaded dashboard."
+            response['data'] = x
+        else:
+            response['msg'] = "Failed to upload dashboard."
+            response['data'] = x
+
+        return response
+
+    async def _postDashboard(self, body, compressedBody=None):
+        """
+        Posts dashboard body, gzipped when compressUploads is set, see GrafanaManager._postDashboard.
+        """
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': "Mozilla/5.0 (Windows NT 6.1; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/72.0.3626.119 Safari/537.36"
+        }
+
+        if self._useGzip() and len(body) >= GZIP_MIN_SIZE:
+            if compressedBody is None:
+                compressedBody = await asyncio.to_thread(gzip.compress, body)
+
+            x = await self._tokenRequest(
+                'POST',
+                '/grafana/api/dashboards/db',
+                headers=dict(headers, **{'Content-Encoding': 'gzip'}),
+                data=compressedBody
+            )
+
+            # Grafana without request decompression fails to parse the body
+            if x.status_code == 200:
+                _hostGzipAccepted[self.host] = True
+            if x.status_code not in (400, 415) or _hostGzipAccepted.get(self.host):
+                return x
+
+            plain = await self._tokenRequest('POST', '/grafana/api/dashboards/db', headers=headers, data=body)
+            if plain.status_code == 200:
+                _hostGzipAccepted[self.host] = False
+            return plain
+
+        return await self._tokenRequest('POST', '/grafana/api/dashboards/db', headers=headers, data=body)
+
+    async def deleteDashboard(self, dashboardUID):
+        """
+        Deletes given dashboard unique ID in Grafana host
+
+        :param dashboardUID: Grafana Dashboard Unique ID, usually written within JSON
+        :type dashboardUID: str
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._tokenSettingsError()
+        if response['msg'] is not None:
+            return response
+
+        x = await self._tokenRequest('DELETE', '/grafana/api/dashboards/uid/' + dashboardUID)
+
+        if x.status_code == 200:
+            response['success'] = True
+            response['msg'] = "Successfully deleted dashboard."
+            response['data'] = x
+        else:
+            response['msg'] = "Failed to delete dashboard."
+            response['data'] = x
+
+        return response
+
+    async def findDashboard(self, dashboardUID):
+        """
+        Locates given dashboard unique ID in Grafana host
+
+        :param dashboardUID: Grafana Dashboard Unique ID, usually written within JSON
+        :type dashboardUID: str
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._tokenSettingsError()
+        if response['msg'] is not None:
+            return response
+
+        # The dashboard cache keeps files, so cached lookups run in a worker thread
+        if self.dashboardCache is not None:
+            return await self._runSync('findDashboard', dashboardUID)
+
+        x = await self._tokenRequest('GET', '/grafana/api/dashboards/uid/' + dashboardUID)
+
+        if x.status_code == 200:
+            response['success'] = True
+            response['msg'] = "Successfully found dashboard."
+            response['data'] = x
+        else:
+            response['msg'] = "Failed to find dashboard."
+            response['data'] = x
+
+        return response
+
+    async def getHomeDashboard(self):
+        """
+        Locates home dashboard in Grafana host
+
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._tokenSettingsError()
+        if response['msg'] is not None:
+            return response
+
+        if self.dashboardCache is not None:
+            return await self._runSync('getHomeDashboard')
+
+        x = await self._tokenRequest('GET', '/grafana/api/dashboards/home')
+
+        if x.status_code == 200:
+            response['success'] = True
+            response['msg'] = "Successfully found home dashboard."
+            response['data'] = x
+        else:
+            response['msg'] = "Failed to find home dashboard."
+            response['data'] = x
+
+        return response
+
+    async def uploadDashboards(self, dashboardDir, workers=10, failFast=False, validate=False, queryBudget=None, transform=None, jobId=None):
+        """
+        Uploads all dashboards in given dashboard directory and its subdirectories.
+        Results are keyed by path relative to the directory, in sorted walk order.
+
+        :param dashboardDir: Path containing directory of dashboards to be uploaded
+        :type dashboardDir: str
+        :param workers: Number of dashboards uploaded concurrently
+        :type workers: int
+        :param failFast: Stop uploading remaining dashboards after the first failure
+        :type failFast: bool
+        :param validate: Check the structure of every dashboard before uploading it
+        :type validate: bool
+        :param queryBudget: Maximum allowed values of dashboard query load fields, see checkQueryBudget. Dashboards over budget are not uploaded
+        :type queryBudget: dict
+        :param transform: Function returning the payload to upload from a dashboard upload payload, e.g. collapseRows
+        :type transform: function
+        :param jobId: Journal results under this job ID, so a rerun with the same ID skips items that already succeeded
+        :type jobId: str
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        response['msg'] = self._tokenSettingsError()
+        if response['msg'] is not None:
+            return response
+
+        response['msg'] = self._queryBudgetError(queryBudget)
+        if response['msg'] is not None:
+            return response
+
+        if not exists(dashboardDir):
+            response['msg'] = "Given directory not found. Failed to upload dashboards."
+            return response
+
+        dashboardFiles = self._listDashboardFiles(dashboardDir)
+        limit = asyncio.Semaphore(max(workers, 1))
+        stopped = asyncio.Event()
+
+        with (self._openJournal(jobId) if jobId is not None else nullcontext()) as journal:
+            completed = journal.completed() if journal is not None else {}
+
+            async def upload(name, filePath):
+                if completed.get(name, {}).get('success'):
+                    return dict(RESUMED_STATUS)
+
+                async with limit:
+                    if stopped.is_set():
+                        return {
+                            "success": False,
+                            "msg": "Skipped dashboard after an earlier failure."
+                        }
+                    try:
+                        status = await self.createDashboard(filePath, validate, queryBudget, transform)
+                    except (OSError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        status = {
+                            "success": False,
+                            "msg": "Failed to upload dashboard. " + str(e)
+                        }
+
+                    if journal is not None:
+                        await asyncio.to_thread(journal.record, name, status)
+                    if failFast and not status['success']:
+                        stopped.set()
+                    return status
+
+            results = await asyncio.gather(*[upload(name, filePath) for name, filePath in dashboardFiles])
+
+        dashboardUploadStatus = {}
+        for (name, filePath), status in zip(dashboardFiles, results):
+            dashboardUploadStatus[name] = status
+
+        if stopped.is_set():
+            response['msg'] = "Stopped uploading dashboards after a failure. Check data for specific information."
+        else:
+            response['success'] = True
+            response['msg'] = "Successfully uploaded dashboards. Check data for specific information."
+        response['data'] = dashboardUploadStatus
+
+        return response
+
+    # Bulk Methods run in a worker thread
+
+    async def createUsers(self, users, workers=10, jobId=None):
+        """
+        Creates many Grafana users concurrently, see GrafanaManager.createUsers
+
+        :param users: Users to create, as dictionaries with name, email, login and password keys
+        :type users: iterable
+        :param workers: Number of users created concurrently
+        :type workers: int
+        :param jobId: Journal results under this job ID, so a rerun with the same ID skips items that already succeeded
+        :type jobId: str
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        return await self._runSync('createUsers', users, workers, jobId)
+
+    async def reconcileUsers(self, desiredUsers, dryRun=False, workers=10, pageSize=1000):
+        """
+        Brings Grafana users in line with a desired state, see GrafanaManager.reconcileUsers
+
+        :param desiredUsers: Path to desired-state JSON or CSV file, or desired users as dictionaries with login, email, name, isAdmin and optional password keys
+        :type desiredUsers: str or iterable
+        :param dryRun: Only plan the changes without applying them
+        :type dryRun: bool
+        :param workers: Number of users changed concurrently
+        :type workers: int
+        :param pageSize: Users fetched per search page
+        :type pageSize: int
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        return await self._runSync('reconcileUsers', desiredUsers, dryRun, workers, pageSize)
+
+    async def createDashboardFromObject(self, dashboardObject, validate=False, queryBudget=None, transform=None):
+        """
+        Creates Grafana dashboard from dashboard upload payload held in memory, see GrafanaManager.createDashboardFromObject
+
+        :param dashboardObject: Dashboard upload payload with a top-level dashboard key
+        :type dashboardObject: dict
+        :param validate: Check the dashboard structure before uploading
+        :type validate: bool
+        :param queryBudget: Maximum allowed values of dashboard query load fields, see checkQueryBudget
+        :type queryBudget: dict
+        :param transform: Function returning the payload to upload from a dashboard upload payload, e.g. collapseRows
+        :type transform: function
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        return await self._runSync('createDashboardFromObject', dashboardObject, validate, queryBudget, transform)
+
+    async def uploadDashboardTemplate(self, template, parameterTable, workers=1, failFast=False, validate=False, queryBudget=None, transform=None, jobId=None):
+        """
+        Renders one variant of dashboard template per parameter row and uploads them, see GrafanaManager.uploadDashboardTemplate
+
+        :param template: Template to render, or path to JSON containing the base dashboard
+        :type template: DashboardTemplate or str
+        :param parameterTable: Rows of DashboardTemplate.render keyword arguments
+        :type parameterTable: iterable
+        :param workers: Number of variants rendered and uploaded concurrently
+        :type workers: int
+        :param failFast: Stop uploading remaining variants after the first failure
+        :type failFast: bool
+        :param validate: Check the structure of every variant before uploading it
+        :type validate: bool
+        :param queryBudget: Maximum allowed values of dashboard query load fields, see checkQueryBudget
+        :type queryBudget: dict
+        :param transform: Function returning the payload to upload from a dashboard upload payload, e.g. collapseRows
+        :type transform: function
+        :param jobId: Journal results under this job ID, so a rerun with the same ID skips items that already succeeded
+        :type jobId: str
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        return await self._runSync('uploadDashboardTemplate', template, parameterTable, workers, failFast, validate, queryBudget, transform, jobId)
+
+    async def syncDashboards(self, dashboardDir, manifestPath=None, workers=1, failFast=False, validate=False, queryBudget=None, transform=None):
+        """
+        Uploads only the dashboards in given directory whose content changed, see GrafanaManager.syncDashboards
+
+        :param dashboardDir: Path containing directory of dashboards to be synced
+        :type dashboardDir: str
+        :param manifestPath: Path to manifest file recording hashes of uploaded dashboards
+        :type manifestPath: str
+        :param workers: Number of dashboards compared and uploaded concurrently
+        :type workers: int
+        :param failFast: Stop uploading remaining dashboards after the first failure
+        :type failFast: bool
+        :param validate: Check the structure of every dashboard before comparing it
+        :type validate: bool
+        :param queryBudget: Maximum allowed values of dashboard query load fields, see checkQueryBudget
+        :type queryBudget: dict
+        :param transform: Function returning the payload to upload from a dashboard upload payload, e.g. collapseRows
+        :type transform: function
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        return await self._runSync('syncDashboards', dashboardDir, manifestPath, workers, failFast, validate, queryBudget, transform)
+
+    async def exportDashboards(self, exportDir, manifestPath=None, workers=10, prune=False):
+        """
+        Downloads every dashboard of the host into given directory, see GrafanaManager.exportDashboards
+
+        :param exportDir: Directory to write dashboards to, created if missing
+        :type exportDir: str
+        :param manifestPath: Path to export manifest, defaults to .manifest.json inside exportDir
+        :type manifestPath: str
+        :param workers: Number of dashboards checked and downloaded concurrently
+        :type workers: int
+        :param prune: Remove exported files of dashboards no longer on the host
+        :type prune: bool
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        return await self._runSync('exportDashboards', exportDir, manifestPath, workers, prune)
+
+    async def _runSync(self, methodName, *args):
+        """
+        Runs GrafanaManager method in a worker thread, keeping the event loop free.
+        """
+        manager = self._getSyncManager()
+        try:
+            return await asyncio.to_thread(getattr(manager, methodName), *args)
+        finally:
+            # The token cache may have created or rotated the API token
+            self.apiKey = manager.apiKey
+
+    def _getSyncManager(self):
+        """
+        Returns the GrafanaManager running bulk methods, brought up to date with the object's host,
+        login and API token. It shares the object's user information store, caches and metrics.
+        """
+        with self._sessionLock:
+            if self._syncManager is None:
+                manager = GrafanaManager(
+                    poolSize=self.poolSize,
+                    hostConcurrency=self.hostConcurrency,
+                    retries=self.retries,
+                    backoffFactor=self.backoffFactor,
+                    maxBackoff=self.maxBackoff,
+                    rateLimit=self.rateLimit,
+                    rateBurst=self.rateBurst,
+                    minifyDashboards=self.minifyDashboards,
+                    compressUploads=self.compressUploads,
+                    lazy=True,
+                    tokenCache=self.tokenCache,
+                    tokenTTL=self.tokenTTL,
+                    adminAuth=self.adminAuth,
+                    journalDir=self.journalDir
+                )
+                manager.requestMetrics = self.requestMetrics
+                manager.requestHooks = self.requestHooks
+                manager.userIdCache = self.userIdCache
+                manager.dashboardCache = self.dashboardCache
+                manager.dashboardCacheMaxAge = self.dashboardCacheMaxAge
+                self._syncManager = manager
+
+            # The user information file is prepared by this object, lazy objects on first use of the helper
+            self._prepareUserInfoFile()
+            self._syncManager._infoFilePending = False
+
+            manager = self._syncManager
+            if manager.host != self.host:
+                manager.setHost(self.host)
+            if manager.username != self.username or manager.password != self.password:
+                manager.setUserLogin(self.username, self.password)
+            manager.apiKey = self.apiKey
+            manager.requestLimit = self.requestLimit
+
+            manager.infoFilePath = self.infoFilePath
+            manager.infoFileDelimiter = self.infoFileDelimiter
+            if self.infoFilePath is not None:
+                manager.infoBackend = self._getUserInfoStore()
+
+            return manager
+
+@asynccontextmanager
+async def _heldSlot(semaphore):
+    # Threading semaphores are shared with GrafanaManager threads, so they are polled instead of blocking the event loop
+    if semaphore is None:
+        yield
+        return
+
+    while not semaphore.acquire(blocking=False):
+        await asyncio.sleep(0.01)
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+def _readFile(fileDir):
+    with open(fileDir, 'rb') as dashboardFile:
+        return dashboardFile.read()
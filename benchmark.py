@@ -0,0 +1,219 @@
+from grafanaInterface import GrafanaManager
+from dashboardTools import DashboardTemplate
+from fakeGrafana import FakeGrafana
+import argparse, json, math, os, subprocess, sys, tempfile, time
+
+# Runs in a fresh interpreter: times importing grafanaInterface and creating the first manager
+_STARTUP_SCRIPT = '''
+import json, os, sys, tempfile, time
+start = time.perf_counter()
+import grafanaInterface
+imported = time.perf_counter()
+with tempfile.TemporaryDirectory() as workDir:
+    constructStart = time.perf_counter()
+    grafanaInterface.GrafanaManager('localhost', 'admin', 'admin', os.path.join(workDir, 'userInfo.txt'), '-', lazy=sys.argv[1] == 'lazy')
+    constructed = time.perf_counter()
+print(json.dumps({"import": imported - start, "construct": constructed - constructStart}))
+'''
+
+def percentile(samples, fraction):
+    """
+    Finds percentile of samples by nearest rank.
+
+    :param samples: Measured values
+    :type samples: list
+    :param fraction: Percentile as a fraction, e.g. 0.99
+    :type fraction: float
+    :return: Percentile value, 0 if there are no samples
+    :rtype: float
+    """
+    if len(samples) == 0:
+        return 0.0
+
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def timeCalls(name, function, calls, items=1):
+    """
+    Times repeated calls of a GrafanaManager method.
+
+    :param name: Benchmark name
+    :type name: str
+    :param function: Called with the call number, returns a Function Status dictionary
+    :type function: function
+    :param calls: Number of calls
+    :type calls: int
+    :param items: Number of items handled by each call, e.g. dashboards uploaded
+    :type items: int
+    :return: Benchmark result with throughput in items per second and p50/p99 latency per call in seconds
+    :rtype: dict
+    """
+    latencies = []
+    failures = 0
+
+    for i in range(calls):
+        start = time.perf_counter()
+        result = function(i)
+        latencies.append(time.perf_counter() - start)
+
+        if not result['success']:
+            failures += 1
+
+    return _summarize(name, latencies, failures, items)
+
+def measureStartup(runs=10):
+    """
+    Times importing grafanaInterface and creating a first GrafanaManager, eager and lazy,
+    each in a fresh interpreter as a short-lived command or serverless handler would.
+
+    :param runs: Number of interpreters started per mode
+    :type runs: int
+    :return: Benchmark results for the import and both construction modes
+    :rtype: list
+    """
+    moduleDir = os.path.dirname(os.path.abspath(__file__))
+    samples = {"import": [], "eager": [], "lazy": []}
+
+    for i in range(runs):
+        for mode in ('eager', 'lazy'):
+            output = subprocess.check_output([sys.executable, '-c', _STARTUP_SCRIPT, mode], cwd=moduleDir)
+            timing = json.loads(output)
+            samples['import'].append(timing['import'])
+            samples[mode].append(timing['construct'])
+
+    return [
+        _summarize('import grafanaInterface', samples['import'], 0, 1),
+        _summarize('GrafanaManager()', samples['eager'], 0, 1),
+        _summarize('GrafanaManager(lazy=True)', samples['lazy'], 0, 1)
+    ]
+
+def _summarize(name, latencies, failures, items):
+    calls = len(latencies)
+    total = sum(latencies)
+
+    return {
+        "name": name,
+        "calls": calls,
+        "items": calls * items,
+        "failures": failures,
+        "total": total,
+        "throughput": calls * items / total if total > 0 else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99)
+    }
+
+def runBenchmarks(latency=0.0, iterations=50, workers=8, users=200, dashboardDir='Dashboards'):
+    """
+    Starts a local FakeGrafana server and benchmarks every GrafanaManager method against it,
+    along with the bulk user and dashboard paths.
+
+    :param latency: Seconds the fake server adds to every response
+    :type latency: float
+    :param iterations: Number of calls of each single-request method
+    :type iterations: int
+    :param workers: Number of concurrent requests of the bulk paths
+    :type workers: int
+    :param users: Number of users created by the batch user benchmark
+    :type users: int
+    :param dashboardDir: Directory of dashboard JSON files uploaded by the bulk dashboard benchmarks
+    :type dashboardDir: str
+    :return: Benchmark results in run order
+    :rtype: list
+    """
+    dashboardFiles = sorted(name for name in os.listdir(dashboardDir) if name.endswith('.json'))
+    firstDashboard = os.path.join(dashboardDir, dashboardFiles[0])
+    template = DashboardTemplate(firstDashboard)
+    results = []
+
+    with tempfile.TemporaryDirectory() as workDir, FakeGrafana(latency=latency) as fake:
+        infoFilePath = os.path.join(workDir, 'userInfo.txt')
+        configFilePath = os.path.join(workDir, 'configFile.txt')
+
+        with GrafanaManager(fake.host, fake.state.username, fake.state.password, infoFilePath, '-', poolSize=max(workers, 10)) as interface:
+            # Local file methods
+            results.append(timeCalls('createConfigFile', lambda i: interface.createConfigFile(configFilePath, '-'), iterations))
+            results.append(timeCalls('parseConfigFile', lambda i: interface.parseConfigFile(configFilePath, '-'), iterations))
+            results.append(timeCalls('storeUserInfo', lambda i: interface.storeUserInfo('storedUser' + str(i), 'storedPassword'), iterations))
+            results.append(timeCalls('getUserInfo', lambda i: interface.getUserInfo('storedUser' + str(i)), iterations))
+            results.append(timeCalls('getAllUserInfo', lambda i: interface.getAllUserInfo(), iterations))
+
+            # User methods
+            results.append(timeCalls('createNewUser', lambda i: interface.createNewUser('user' + str(i), 'user' + str(i) + '@bench', 'benchUser' + str(i), 'benchPassword'), iterations))
+            results.append(timeCalls('findUser', lambda i: interface.findUser('benchUser' + str(i)), iterations))
+            results.append(timeCalls('changePassword', lambda i: interface.changePassword('benchUser' + str(i), 'newBenchPassword'), iterations))
+            results.append(timeCalls('changeAdminPermission', lambda i: interface.changeAdminPermission('benchUser' + str(i), i % 2 == 0), iterations))
+            results.append(timeCalls('getAllUsers', lambda i: interface.getAllUsers(), iterations))
+            results.append(timeCalls('createAdminToken', lambda i: interface.createAdminToken('benchToken' + str(i)), iterations))
+
+            # Dashboard methods
+            uid = template.payload['dashboard']['uid']
+            results.append(timeCalls('createDashboard', lambda i: interface.createDashboard(firstDashboard), iterations))
+            results.append(timeCalls('createDashboardFromObject', lambda i: interface.createDashboardFromObject(template.payload), iterations))
+            results.append(timeCalls('findDashboard', lambda i: interface.findDashboard(uid), iterations))
+            results.append(timeCalls('getHomeDashboard', lambda i: interface.getHomeDashboard(), iterations))
+
+            # Bulk paths
+            batch = [
+                {'name': 'user' + str(i), 'email': 'user' + str(i) + '@batch', 'login': 'batchUser' + str(i), 'password': 'batchPassword'}
+                for i in range(users)
+            ]
+            results.append(timeCalls('createUsers', lambda i: interface.createUsers(batch, workers=workers), 1, users))
+            results.append(timeCalls('getAllUsers(pageSize=100)', lambda i: interface.getAllUsers(pageSize=100), iterations))
+
+            results.append(timeCalls('uploadDashboards', lambda i: interface.uploadDashboards(dashboardDir), iterations, len(dashboardFiles)))
+            results.append(timeCalls('uploadDashboards(workers)', lambda i: interface.uploadDashboards(dashboardDir, workers=workers), iterations, len(dashboardFiles)))
+            with GrafanaManager(fake.host, key=interface.apiKey, minifyDashboards=True, compressUploads=True) as compact:
+                results.append(timeCalls('uploadDashboards(compact)', lambda i: compact.uploadDashboards(dashboardDir), iterations, len(dashboardFiles)))
+            results.append(timeCalls('syncDashboards', lambda i: interface.syncDashboards(dashboardDir, workers=workers), iterations, len(dashboardFiles)))
+
+            variants = [{"uid": 'bench' + str(i), "title": 'Bench ' + str(i)} for i in range(iterations)]
+            results.append(timeCalls('uploadDashboardTemplate', lambda i: interface.uploadDashboardTemplate(template, variants, workers=workers), 1, len(variants)))
+
+            exportDir = os.path.join(workDir, 'export')
+            results.append(timeCalls('exportDashboards', lambda i: interface.exportDashboards(exportDir, workers=workers), 1, len(fake.state.dashboards)))
+            results.append(timeCalls('exportDashboards(unchanged)', lambda i: interface.exportDashboards(exportDir, workers=workers), iterations, len(fake.state.dashboards)))
+
+            results.append(timeCalls('deleteDashboard', lambda i: interface.deleteDashboard('bench' + str(i)), iterations))
+
+    return results
+
+def formatResults(results):
+    """
+    Formats benchmark results as a table.
+
+    :param results: Benchmark results
+    :type results: list
+    :return: Table text
+    :rtype: str
+    """
+    lines = ['%-28s %7s %9s %12s %10s %10s' % ('benchmark', 'calls', 'failures', 'items/s', 'p50 ms', 'p99 ms')]
+    for result in results:
+        lines.append('%-28s %7d %9d %12.1f %10.2f %10.2f' % (
+            result['name'],
+            result['calls'],
+            result['failures'],
+            result['throughput'],
+            result['p50'] * 1000,
+            result['p99'] * 1000
+        ))
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks GrafanaManager against a local fake Grafana server.')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the fake server adds to every response')
+    parser.add_argument('--iterations', type=int, default=50, help='calls of each single-request method')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent requests of the bulk paths')
+    parser.add_argument('--users', type=int, default=200, help='users created by the batch user benchmark')
+    parser.add_argument('--dashboards', default='Dashboards', help='directory of dashboards uploaded by the bulk benchmarks')
+    parser.add_argument('--startup-runs', dest='startupRuns', type=int, default=10, help='fresh interpreters started to time import and construction')
+    parser.add_argument('--json', dest='jsonPath', help='also write results as JSON to this file')
+    args = parser.parse_args()
+
+    results = measureStartup(args.startupRuns)
+    results.extend(runBenchmarks(args.latency, args.iterations, args.workers, args.users, args.dashboards))
+    print(formatResults(results))
+
+    if args.jsonPath is not None:
+        with open(args.jsonPath, 'w') as jsonFile:
+            json.dump(results, jsonFile, indent=2)
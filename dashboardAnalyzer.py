@@ -0,0 +1,328 @@
+import json, os, sys
+from dashboardTools import loadDashboardFile
+
+# Panel datasources that never reach a data source: built-in annotations and panels reusing another panel's results
+_NON_QUERY_DATASOURCES = ('-- Grafana --', '-- Dashboard --')
+
+# Copies assumed for a repeat over a variable whose values are only known at view time
+ASSUMED_REPEAT_VALUES = 10
+
+# Analysis fields a query budget can limit: counts, and lists compared by length
+QUERY_BUDGET_FIELDS = (
+    'panels', 'variableQueries', 'annotationQueries', 'queriesPerLoad', 'queriesPerRefresh', 'queriesPerMinute',
+    'deferredQueries', 'panelLoad', 'unboundedPanels', 'repeatedPanels', 'warnings'
+)
+
+_REFRESH_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+def parseRefresh(refresh):
+    """
+    Converts Grafana refresh interval such as 5s or 1m to seconds.
+
+    :param refresh: Dashboard refresh setting
+    :type refresh: str
+    :return: Seconds between refreshes, None when auto-refresh is off or the interval cannot be read
+    :rtype: int
+    """
+    if not isinstance(refresh, str) or len(refresh) < 2 or refresh[-1] not in _REFRESH_UNITS:
+        return None
+
+    try:
+        value = int(refresh[:-1])
+    except ValueError:
+        return None
+
+    return value * _REFRESH_UNITS[refresh[-1]] if value > 0 else None
+
+def analyzeDashboard(payload, assumedRepeatValues=ASSUMED_REPEAT_VALUES):
+    """
+    Estimates data source queries a dashboard issues per viewer, without contacting Grafana.
+    Walks panels, rows in both the current and legacy layouts, repeats, annotations and templating.
+    Panels in collapsed rows only query once their row is expanded, so they count as deferred.
+
+    :param payload: Dashboard upload payload or bare dashboard model
+    :type payload: dict
+    :param assumedRepeatValues: Copies assumed for a repeat whose variable values are unknown
+    :type assumedRepeatValues: int
+    :return: Analysis with queriesPerLoad, queriesPerRefresh, queriesPerMinute, deferredQueries, per-panel load, unboundedPanels, repeatedPanels and warnings
+    :rtype: dict
+    """
+    dashboard = payload.get('dashboard', payload) if isinstance(payload, dict) else {}
+    variables = {variable.get('name'): variable for variable in (dashboard.get('templating') or {}).get('list', []) if isinstance(variable, dict)}
+
+    panelLoad = []
+    warnings = []
+    for row, panel, collapsed in _walkPanels(dashboard):
+        if panel.get('type') == 'row':
+            continue
+
+        queries = _panelQueries(panel)
+        if queries == 0:
+            continue
+
+        copies = 1
+        for repeating in (row, panel):
+            if repeating is not None and repeating.get('repeat'):
+                repeatCopies, known = _repeatCopies(variables.get(repeating['repeat']), assumedRepeatValues)
+                copies *= repeatCopies
+                if not known:
+                    warnings.append("Panel '" + str(panel.get('title')) + "' repeats by '" + repeating['repeat'] + "', whose values depend on the viewer. Assumed " + str(repeatCopies) + " copies.")
+
+        panelLoad.append({
+            "title": panel.get('title'),
+            "type": panel.get('type'),
+            "row": row.get('title') if row is not None else None,
+            "queries": queries,
+            "copies": copies,
+            "collapsed": collapsed,
+            "bounded": _isBounded(panel)
+        })
+
+    variableQueries = 0
+    refreshVariableQueries = 0
+    for variable in variables.values():
+        # Only query variables reach a data source; refresh 1 runs on load, 2 on every time range change
+        if variable.get('type') == 'query' and variable.get('refresh') in (1, 2):
+            variableQueries += 1
+            if variable.get('refresh') == 2:
+                refreshVariableQueries += 1
+
+    annotationQueries = 0
+    for annotation in (dashboard.get('annotations') or {}).get('list', []):
+        if isinstance(annotation, dict) and annotation.get('enable', True) and annotation.get('datasource') not in _NON_QUERY_DATASOURCES and not annotation.get('builtIn'):
+            annotationQueries += 1
+
+    visibleQueries = sum(panel['queries'] * panel['copies'] for panel in panelLoad if not panel['collapsed'])
+    deferredQueries = sum(panel['queries'] * panel['copies'] for panel in panelLoad if panel['collapsed'])
+
+    # Auto-refresh moves relative time ranges, so time range variables query again on every refresh
+    queriesPerRefresh = visibleQueries + annotationQueries + refreshVariableQueries
+    refreshSeconds = parseRefresh(dashboard.get('refresh'))
+
+    unboundedPanels = [panel['title'] for panel in panelLoad if not panel['bounded']]
+    repeatedPanels = [panel['title'] for panel in panelLoad if panel['copies'] > 1]
+
+    if len(unboundedPanels) > 0:
+        warnings.append(str(len(unboundedPanels)) + " panels set neither interval nor maxDataPoints.")
+    if refreshSeconds is not None and refreshSeconds < 60:
+        warnings.append("Dashboard refreshes every " + dashboard['refresh'] + ".")
+
+    return {
+        "title": dashboard.get('title'),
+        "uid": dashboard.get('uid'),
+        "refresh": refreshSeconds,
+        "panels": len(panelLoad),
+        "variableQueries": variableQueries,
+        "annotationQueries": annotationQueries,
+        "queriesPerLoad": visibleQueries + annotationQueries + variableQueries,
+        "queriesPerRefresh": queriesPerRefresh,
+        "queriesPerMinute": queriesPerRefresh * 60.0 / refreshSeconds if refreshSeconds is not None else 0.0,
+        "deferredQueries": deferredQueries,
+        "panelLoad": panelLoad,
+        "unboundedPanels": unboundedPanels,
+        "repeatedPanels": repeatedPanels,
+        "warnings": warnings
+    }
+
+def analyzeDashboardFile(fileDir, assumedRepeatValues=ASSUMED_REPEAT_VALUES):
+    """
+    Runs analyzeDashboard on dashboard JSON file.
+
+    :param fileDir: Path to JSON containing Grafana dashboard
+    :type fileDir: str
+    :param assumedRepeatValues: Copies assumed for a repeat whose variable values are unknown
+    :type assumedRepeatValues: int
+    :return: Dashboard analysis
+    :rtype: dict
+    """
+    return analyzeDashboard(loadDashboardFile(fileDir), assumedRepeatValues)
+
+def checkQueryBudget(analysis, budget):
+    """
+    Compares dashboard analysis with a query budget. Budget keys name analysis fields of
+    QUERY_BUDGET_FIELDS, such as queriesPerMinute or queriesPerLoad, and list fields such
+    as unboundedPanels are compared by length.
+
+    :param analysis: Analysis returned by analyzeDashboard
+    :type analysis: dict
+    :param budget: Maximum allowed value per analysis field
+    :type budget: dict
+    :return: Problems found, empty if the dashboard is within budget
+    :rtype: list
+    """
+    problems = []
+    for field, limit in budget.items():
+        if field not in QUERY_BUDGET_FIELDS:
+            raise ValueError("Unknown query budget field: " + str(field))
+
+        value = analysis.get(field)
+        if value is None:
+            continue
+        if isinstance(value, list):
+            value = len(value)
+
+        if value > limit:
+            problems.append("Dashboard " + field + " is " + ('%g' % value) + ", budget is " + ('%g' % limit) + ".")
+
+    return problems
+
+def validateQueryBudget(budget):
+    """
+    Checks that every query budget key is one of QUERY_BUDGET_FIELDS and every limit is a number,
+    so a mistyped budget is caught before any dashboard is checked against it.
+
+    :param budget: Maximum allowed value per analysis field
+    :type budget: dict
+    :return: Problems found, empty if the budget is valid
+    :rtype: list
+    """
+    problems = []
+    for field, limit in budget.items():
+        if field not in QUERY_BUDGET_FIELDS:
+            problems.append("Unknown query budget field: " + str(field) + ".")
+        elif isinstance(limit, bool) or not isinstance(limit, (int, float)):
+            problems.append("Query budget of " + str(field) + " is not a number.")
+
+    return problems
+
+def formatAnalysis(name, analysis):
+    """
+    Formats dashboard analysis as a short report.
+
+    :param name: Dashboard name shown in the report, e.g. its file path
+    :type name: str
+    :param analysis: Analysis returned by analyzeDashboard
+    :type analysis: dict
+    :return: Report text
+    :rtype: str
+    """
+    lines = [
+        name + ': ' + str(analysis['panels']) + ' query panels, refresh ' + (str(analysis['refresh']) + 's' if analysis['refresh'] is not None else 'off'),
+        '  queries per load %d, per refresh %d, per minute per viewer %.1f, deferred in collapsed rows %d' % (
+            analysis['queriesPerLoad'],
+            analysis['queriesPerRefresh'],
+            analysis['queriesPerMinute'],
+            analysis['deferredQueries']
+        )
+    ]
+    for warning in analysis['warnings']:
+        lines.append('  ! ' + warning)
+    return '\n'.join(lines)
+
+def _walkPanels(dashboard):
+    """
+    Yields (row, panel, collapsed) for every panel, with the row panel or legacy row holding it.
+    """
+    row = None
+    for panel in dashboard.get('panels') or []:
+        if not isinstance(panel, dict):
+            continue
+
+        if panel.get('type') == 'row':
+            # Collapsed rows hold their panels, expanded rows are followed by them
+            row = panel
+            if panel.get('collapsed'):
+                for nested in panel.get('panels') or []:
+                    if isinstance(nested, dict):
+                        yield row, nested, True
+            continue
+
+        yield row, panel, False
+
+    # Dashboards from before schema 16 keep panels in rows
+    for legacyRow in dashboard.get('rows') or []:
+        if not isinstance(legacyRow, dict):
+            continue
+        for panel in legacyRow.get('panels') or []:
+            if isinstance(panel, dict):
+                yield legacyRow, panel, bool(legacyRow.get('collapse'))
+
+def _panelQueries(panel):
+    if panel.get('datasource') in _NON_QUERY_DATASOURCES:
+        return 0
+    return len([target for target in panel.get('targets') or [] if isinstance(target, dict) and not target.get('hide')])
+
+def _isBounded(panel):
+    if panel.get('interval') or panel.get('maxDataPoints'):
+        return True
+
+    targets = [target for target in panel.get('targets') or [] if isinstance(target, dict) and not target.get('hide')]
+    return len(targets) > 0 and all(target.get('interval') for target in targets)
+
+def _repeatCopies(variable, assumedRepeatValues):
+    """
+    Returns (copies, known) for a repeat over given variable.
+    """
+    if variable is None:
+        return assumedRepeatValues, False
+
+    value = (variable.get('current') or {}).get('value')
+    if not isinstance(value, list):
+        value = [value]
+
+    if '$__all' not in value:
+        return max(len(value), 1), not (variable.get('multi') or variable.get('includeAll'))
+
+    # Query variables refreshed by Grafana are saved without their options
+    options = [option for option in variable.get('options') or [] if option.get('value') != '$__all']
+    if len(options) > 0 and variable.get('type') != 'query':
+        return len(options), True
+    return max(len(options), assumedRepeatValues), False
+
+def main():
+    """
+    Command line entry point, analyzing dashboard files and checking them against query budgets.
+
+    :return: Exit status, 1 if any dashboard is over budget
+    :rtype: int
+    """
+    # Only the command line needs argparse, so importing the module stays cheap
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Estimates data source query load of Grafana dashboard files.')
+    parser.add_argument('paths', nargs='+', help='dashboard JSON files or directories of them')
+    parser.add_argument('--budget', action='append', default=[], metavar='FIELD=LIMIT', help='fail when an analysis field, e.g. queriesPerMinute, exceeds LIMIT')
+    parser.add_argument('--json', dest='jsonOutput', action='store_true', help='print analyses as JSON')
+    args = parser.parse_args()
+
+    budget = {}
+    for item in args.budget:
+        field, _, limit = item.partition('=')
+        try:
+            budget[field] = float(limit)
+        except ValueError:
+            parser.error('budget limit of ' + field + ' is not a number: ' + limit)
+
+    budgetProblems = validateQueryBudget(budget)
+    if len(budgetProblems) > 0:
+        parser.error(' '.join(budgetProblems))
+
+    dashboardFiles = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(directory for directory in dirs if not directory.startswith('.'))
+                dashboardFiles.extend(os.path.join(root, name) for name in sorted(files) if name.endswith('.json') and not name.startswith('.'))
+        else:
+            dashboardFiles.append(path)
+
+    analyses = {}
+    overBudget = False
+    for dashboardFile in dashboardFiles:
+        analysis = analyzeDashboardFile(dashboardFile)
+        analysis['budgetProblems'] = checkQueryBudget(analysis, budget)
+        overBudget = overBudget or len(analysis['budgetProblems']) > 0
+        analyses[dashboardFile] = analysis
+
+    if args.jsonOutput:
+        print(json.dumps(analyses, indent=2))
+    else:
+        for dashboardFile, analysis in analyses.items():
+            print(formatAnalysis(dashboardFile, analysis))
+            for problem in analysis['budgetProblems']:
+                print('  over budget: ' + problem)
+
+    return 1 if overBudget else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
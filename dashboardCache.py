@@ -0,0 +1,173 @@
+import json, hashlib, os, threading, time
+from os.path import exists
+from fileTools import atomicWrite
+
+class DashboardCache(object):
+    """
+    On-disk cache of dashboard payloads fetched from Grafana. Payloads are stored once per
+    distinct content under their SHA-256 digest, and an index maps each key to its payload,
+    the server version it was fetched at and when it was last used. Least recently used
+    entries are evicted once the cache holds more than maxEntries keys or maxBytes of payloads.
+    The directory is created and the index read on first use.
+
+    :param cacheDir: Directory holding the cache, created if missing
+    :type cacheDir: str
+    :param maxEntries: Maximum number of cached keys
+    :type maxEntries: int
+    :param maxBytes: Maximum total size of cached payloads in bytes
+    :type maxBytes: int
+    """
+    def __init__(self, cacheDir, maxEntries=500, maxBytes=256 * 1024 * 1024):
+        """
+        Constructor Method
+        """
+        self.cacheDir = cacheDir
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+
+        self._lock = threading.RLock()
+        self._objectDir = os.path.join(cacheDir, 'objects')
+        self._indexPath = os.path.join(cacheDir, 'index.json')
+        self._index = None
+
+    def get(self, key):
+        """
+        Finds cached payload of given key.
+
+        :param key: Cache key
+        :type key: str
+        :return: Entry with content bytes, server version and seconds since last validation, None if not cached
+        :rtype: dict
+        """
+        with self._lock:
+            self._load()
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+
+            try:
+                with open(os.path.join(self._objectDir, entry['hash']), 'rb') as objectFile:
+                    content = objectFile.read()
+            except OSError:
+                self._remove(key)
+                self._saveIndex()
+                return None
+
+            entry['lastUsed'] = time.time()
+
+            return {
+                "content": content,
+                "version": entry['version'],
+                "age": time.time() - entry['validated']
+            }
+
+    def put(self, key, version, content):
+        """
+        Caches payload of given key, evicting least recently used entries past the size bounds.
+
+        :param key: Cache key
+        :type key: str
+        :param version: Server version of the payload
+        :type version: int
+        :param content: Payload bytes
+        :type content: bytes
+        """
+        contentHash = hashlib.sha256(content).hexdigest()
+        objectPath = os.path.join(self._objectDir, contentHash)
+
+        with self._lock:
+            self._load()
+            if not exists(objectPath):
+                self._writeFile(objectPath, content)
+
+            previous = self._index.get(key)
+            now = time.time()
+            self._index[key] = {
+                "hash": contentHash,
+                "version": version,
+                "size": len(content),
+                "lastUsed": now,
+                "validated": now
+            }
+
+            if previous is not None and previous['hash'] != contentHash:
+                self._removeObject(previous['hash'])
+
+            self._evict()
+            self._saveIndex()
+
+    def markValidated(self, key):
+        """
+        Records that cached payload of given key was confirmed current by the server.
+
+        :param key: Cache key
+        :type key: str
+        """
+        with self._lock:
+            self._load()
+            entry = self._index.get(key)
+            if entry is not None:
+                entry['validated'] = time.time()
+                self._saveIndex()
+
+    def invalidate(self, key):
+        """
+        Removes given key from the cache.
+
+        :param key: Cache key
+        :type key: str
+        """
+        with self._lock:
+            self._load()
+            if key in self._index:
+                self._remove(key)
+                self._saveIndex()
+
+    def clear(self):
+        with self._lock:
+            self._load()
+            for key in list(self._index):
+                self._remove(key)
+            self._saveIndex()
+
+    def _load(self):
+        if self._index is not None:
+            return
+
+        os.makedirs(self._objectDir, exist_ok=True)
+
+        self._index = {}
+        if exists(self._indexPath):
+            try:
+                with open(self._indexPath, 'r') as indexFile:
+                    self._index = json.load(indexFile)
+            except ValueError:
+                self._index = {}
+
+    def _evict(self):
+        totalBytes = sum(entry['size'] for entry in self._index.values())
+
+        for key in sorted(self._index, key=lambda key: self._index[key]['lastUsed']):
+            if len(self._index) <= self.maxEntries and totalBytes <= self.maxBytes:
+                break
+            totalBytes -= self._index[key]['size']
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self._index.pop(key)
+        self._removeObject(entry['hash'])
+
+    def _removeObject(self, contentHash):
+        # Payloads are shared between keys with identical content
+        if any(entry['hash'] == contentHash for entry in self._index.values()):
+            return
+
+        objectPath = os.path.join(self._objectDir, contentHash)
+        if exists(objectPath):
+            os.remove(objectPath)
+
+    def _saveIndex(self):
+        self._writeFile(self._indexPath, json.dumps(self._index).encode('utf-8'))
+
+    def _writeFile(self, filePath, content):
+        atomicWrite(filePath, content)
@@ -0,0 +1,495 @@
+import json, hashlib, os, csv, gzip, threading
+from collections import OrderedDict
+from os.path import exists
+from fileTools import FileLock, atomicWrite
+
+# Dashboard fields Grafana rewrites on every save
+VOLATILE_DASHBOARD_FIELDS = ('id', 'version', 'iteration')
+
+# Held by threads of this process while they update a manifest
+_manifestLock = threading.Lock()
+
+def loadDashboardFile(fileDir):
+    """
+    Parses dashboard JSON file.
+
+    :param fileDir: Path to JSON containing Grafana dashboard
+    :type fileDir: str
+    :return: Dashboard upload payload
+    :rtype: dict
+    """
+    with open(fileDir, 'r') as dashboardFile:
+        return json.load(dashboardFile)
+
+def saveDashboardFile(fileDir, payload):
+    """
+    Atomically writes dashboard upload payload as JSON file.
+
+    :param fileDir: Path of JSON file to write
+    :type fileDir: str
+    :param payload: Dashboard upload payload
+    :type payload: dict
+    """
+    # One-shot dumps uses the C encoder, json.dump encodes in Python
+    atomicWrite(fileDir, json.dumps(payload).encode('utf-8'))
+
+def minifyDashboard(payload):
+    """
+    Serializes dashboard upload payload without whitespace.
+
+    :param payload: Dashboard upload payload
+    :type payload: dict
+    :return: Compact UTF-8 JSON
+    :rtype: bytes
+    """
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def collapseRows(payload, openRows=1):
+    """
+    Collapses rows of dashboard so the panels under them only query once a viewer expands the row.
+    Panels above the first row and the rows chosen by openRows stay open. Rows are stacked again
+    from the top, and the panels of each row are placed directly under it, keeping their layout
+    relative to each other. Usable as the transform of GrafanaManager dashboard uploads.
+
+    :param payload: Dashboard upload payload or bare dashboard model, left unchanged
+    :type payload: dict
+    :param openRows: Number of leading rows kept open, or titles of the rows kept open
+    :type openRows: int or collection
+    :return: Copy of payload with collapsed rows
+    :rtype: dict
+    """
+    wrapped = isinstance(payload.get('dashboard'), dict)
+    dashboard = dict(payload['dashboard'] if wrapped else payload)
+
+    def keepOpen(index, row):
+        if isinstance(openRows, int):
+            return index < openRows
+        return row.get('title') in openRows
+
+    if isinstance(dashboard.get('panels'), list):
+        # Layout order, as Grafana sorts panels before grouping them under rows
+        panels = sorted(
+            (dict(panel, gridPos=dict(panel.get('gridPos') or {})) for panel in dashboard['panels'] if isinstance(panel, dict)),
+            key=lambda panel: (panel['gridPos'].get('y', 0), panel['gridPos'].get('x', 0))
+        )
+
+        leading = []
+        sections = []
+        for panel in panels:
+            if panel.get('type') == 'row':
+                # Collapsed rows hold their panels, expanded rows are followed by them
+                nested = [dict(nestedPanel, gridPos=dict(nestedPanel.get('gridPos') or {})) for nestedPanel in panel.get('panels') or [] if isinstance(nestedPanel, dict)]
+                sections.append((panel, nested))
+            elif len(sections) > 0:
+                sections[-1][1].append(panel)
+            else:
+                leading.append(panel)
+
+        layout = list(leading)
+        top = max([panel['gridPos'].get('y', 0) + panel['gridPos'].get('h', 0) for panel in leading] or [0])
+
+        for index, (row, members) in enumerate(sections):
+            row['gridPos']['y'] = top
+            rowBottom = top + row['gridPos'].get('h', 1)
+
+            bottom = rowBottom
+            if len(members) > 0:
+                firstY = min(member['gridPos'].get('y', 0) for member in members)
+                for member in members:
+                    member['gridPos']['y'] = rowBottom + member['gridPos'].get('y', 0) - firstY
+                    bottom = max(bottom, member['gridPos']['y'] + member['gridPos'].get('h', 0))
+
+            layout.append(row)
+            if keepOpen(index, row):
+                row['collapsed'] = False
+                row['panels'] = []
+                layout.extend(members)
+                top = bottom
+            else:
+                row['collapsed'] = True
+                row['panels'] = members
+                top = rowBottom
+
+        dashboard['panels'] = layout
+
+    # Dashboards from before schema 16 keep panels in rows with a collapse flag
+    if isinstance(dashboard.get('rows'), list):
+        dashboard['rows'] = [
+            dict(row, collapse=not keepOpen(index, row)) if isinstance(row, dict) else row
+            for index, row in enumerate(dashboard['rows'])
+        ]
+
+    return dict(payload, dashboard=dashboard) if wrapped else dashboard
+
+def validateDashboard(payload):
+    """
+    Checks structure of dashboard upload payload: a dashboard object with uid, title and a panels list.
+
+    :param payload: Dashboard upload payload
+    :type payload: dict
+    :return: Problems found, empty if the payload is valid
+    :rtype: list
+    """
+    if not isinstance(payload, dict):
+        return ["Payload is not a JSON object."]
+
+    dashboard = payload.get('dashboard')
+    if not isinstance(dashboard, dict):
+        return ["Missing top-level 'dashboard' object."]
+
+    problems = []
+
+    if not isinstance(dashboard.get('uid'), str) or len(dashboard['uid']) == 0:
+        problems.append("Dashboard has no 'uid'.")
+
+    if not isinstance(dashboard.get('title'), str) or len(dashboard['title'].strip()) == 0:
+        problems.append("Dashboard has no 'title'.")
+
+    panels = dashboard.get('panels')
+    if not isinstance(panels, list):
+        problems.append("Dashboard has no 'panels' list.")
+    elif any(not isinstance(panel, dict) for panel in panels):
+        problems.append("Dashboard 'panels' contains non-object entries.")
+
+    return problems
+
+def validateDashboardFile(fileDir):
+    """
+    Checks that dashboard file is JSON with the structure required by validateDashboard.
+
+    :param fileDir: Path to JSON containing Grafana dashboard
+    :type fileDir: str
+    :return: Problems found, empty if the file is valid
+    :rtype: list
+    """
+    try:
+        payload = loadDashboardFile(fileDir)
+    except ValueError as e:
+        return ["Invalid JSON: " + str(e)]
+
+    return validateDashboard(payload)
+
+def normalizeDashboard(dashboard):
+    """
+    Copies dashboard without the fields Grafana changes on every save.
+
+    :param dashboard: Grafana dashboard model
+    :type dashboard: dict
+    :return: Normalized dashboard model
+    :rtype: dict
+    """
+    return {key: value for key, value in dashboard.items() if key not in VOLATILE_DASHBOARD_FIELDS}
+
+def dashboardHash(dashboard):
+    """
+    Computes content hash of dashboard model, ignoring id, version and iteration.
+    Upload payloads wrapping the model in a dashboard key hash the same as the bare model.
+
+    :param dashboard: Grafana dashboard model or upload payload
+    :type dashboard: dict
+    :return: Hex SHA-256 digest
+    :rtype: str
+    """
+    if isinstance(dashboard.get('dashboard'), dict):
+        dashboard = dashboard['dashboard']
+
+    canonical = json.dumps(normalizeDashboard(dashboard), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def loadManifest(manifestPath):
+    """
+    Reads dashboard manifest, mapping dashboard keys to content hashes.
+
+    :param manifestPath: Path to manifest file
+    :type manifestPath: str
+    :return: Manifest, empty if the file does not exist
+    :rtype: dict
+    """
+    if not exists(manifestPath):
+        return {}
+
+    with open(manifestPath, 'r') as manifestFile:
+        return json.load(manifestFile)
+
+def saveManifest(manifestPath, manifest):
+    """
+    Atomically writes dashboard manifest.
+
+    :param manifestPath: Path to manifest file
+    :type manifestPath: str
+    :param manifest: Manifest to write
+    :type manifest: dict
+    """
+    atomicWrite(manifestPath, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+def updateManifest(manifestPath, section, entries, removed=()):
+    """
+    Merges entries into one section of dashboard manifest, such as the section of one host, while holding
+    a lock on a companion .lock file. The manifest is read again under the lock, so updates made meanwhile
+    by other processes and threads, to other sections or other entries, are kept.
+
+    :param manifestPath: Path to manifest file
+    :type manifestPath: str
+    :param section: Manifest section to update
+    :type section: str
+    :param entries: Entries to add or replace in the section
+    :type entries: dict
+    :param removed: Keys of entries to remove from the section
+    :type removed: iterable
+    :return: Updated manifest
+    :rtype: dict
+    """
+    with FileLock(manifestPath + '.lock', _manifestLock):
+        manifest = loadManifest(manifestPath)
+        sectionEntries = manifest.setdefault(section, {})
+        sectionEntries.update(entries)
+        for key in removed:
+            sectionEntries.pop(key, None)
+        saveManifest(manifestPath, manifest)
+
+    return manifest
+
+class MinifiedDashboardCache(object):
+    """
+    In-memory cache of compactly re-serialized dashboard files, along with their gzipped form.
+    Entries are reused while the file keeps its modification time and size. A file whose
+    modification time changed is read again but only re-serialized if its SHA-256 digest changed.
+
+    :param maxEntries: Maximum number of cached files, least recently used are dropped first
+    :type maxEntries: int
+    """
+    def __init__(self, maxEntries=64):
+        """
+        Constructor Method
+        """
+        self.maxEntries = maxEntries
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, fileDir):
+        """
+        Obtains minified content of dashboard file.
+
+        :param fileDir: Path to JSON containing Grafana dashboard
+        :type fileDir: str
+        :return: Compact UTF-8 JSON
+        :rtype: bytes
+        """
+        return self._entry(fileDir)['content']
+
+    def getCompressed(self, fileDir):
+        """
+        Obtains gzipped minified content of dashboard file, compressing it on first use.
+
+        :param fileDir: Path to JSON containing Grafana dashboard
+        :type fileDir: str
+        :return: Gzipped compact UTF-8 JSON
+        :rtype: bytes
+        """
+        entry = self._entry(fileDir)
+        if entry['compressed'] is None:
+            entry['compressed'] = gzip.compress(entry['content'])
+        return entry['compressed']
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _entry(self, fileDir):
+        path = os.path.abspath(fileDir)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry['signature'] == signature:
+                self._entries.move_to_end(path)
+                return entry
+
+        with open(path, 'rb') as dashboardFile:
+            raw = dashboardFile.read()
+        contentHash = hashlib.sha256(raw).hexdigest()
+
+        # Touched but unchanged files keep their minified content
+        if entry is None or entry['hash'] != contentHash:
+            entry = {
+                "hash": contentHash,
+                "content": minifyDashboard(json.loads(raw)),
+                "compressed": None
+            }
+        entry['signature'] = signature
+
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+
+        return entry
+
+class DashboardTemplate(object):
+    """
+    Base dashboard parsed once and stamped out into variants. Locations of datasource references and
+    templating variables are found when the template is created, and every variant copies only the
+    objects along the patched paths, sharing the rest of the dashboard with the base.
+
+    :param payload: Dashboard upload payload, or path to JSON containing Grafana dashboard
+    :type payload: dict or str
+    """
+    def __init__(self, payload):
+        """
+        Constructor Method
+        """
+        if isinstance(payload, str):
+            payload = loadDashboardFile(payload)
+
+        if not isinstance(payload.get('dashboard'), dict):
+            payload = {"dashboard": payload}
+
+        self.payload = payload
+
+        self._datasourcePaths = []
+        self._findDatasources(payload['dashboard'], ('dashboard',))
+
+        self._variablePaths = {}
+        variables = payload['dashboard'].get('templating', {}).get('list', [])
+        for i, variable in enumerate(variables):
+            if isinstance(variable, dict) and 'name' in variable:
+                self._variablePaths[variable['name']] = ('dashboard', 'templating', 'list', i)
+
+    def render(self, uid, title, datasource=None, variables=None, patches=None):
+        """
+        Builds variant of the template.
+
+        :param uid: Dashboard unique ID of the variant
+        :type uid: str
+        :param title: Dashboard title of the variant
+        :type title: str
+        :param datasource: Datasource name or reference replacing every concrete datasource reference
+        :type datasource: str or dict
+        :param variables: Default values of templating variables, keyed by variable name
+        :type variables: dict
+        :param patches: Extra values keyed by path tuples from the payload root, e.g. ('dashboard', 'refresh')
+        :type patches: dict
+        :return: Dashboard upload payload
+        :rtype: dict
+        """
+        patchList = [
+            (('dashboard', 'id'), None),
+            (('dashboard', 'uid'), uid),
+            (('dashboard', 'title'), title),
+            (('overwrite',), True)
+        ]
+
+        if datasource is not None:
+            for path in self._datasourcePaths:
+                patchList.append((path, datasource))
+
+        for name, value in (variables or {}).items():
+            if name not in self._variablePaths:
+                raise KeyError("Dashboard has no templating variable named " + str(name))
+            path = self._variablePaths[name]
+            patchList.append((path + ('current',), {"selected": True, "text": value, "value": value}))
+            # Constant, textbox and custom variables hold their value in query
+            variable = _getPath(self.payload, path)
+            if variable.get('type') in ('constant', 'textbox', 'custom'):
+                patchList.append((path + ('query',), value))
+
+        for path, value in (patches or {}).items():
+            patchList.append((tuple(path), value))
+
+        return _applyPatches(self.payload, _patchTree(patchList))
+
+    def renderAll(self, parameterTable):
+        """
+        Builds one variant per row of parameter table.
+
+        :param parameterTable: Rows of render keyword arguments
+        :type parameterTable: iterable
+        :return: Generator of dashboard upload payloads
+        :rtype: generator
+        """
+        for parameters in parameterTable:
+            yield self.render(**parameters)
+
+    def _findDatasources(self, node, path):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == 'datasource' and _isConcreteDatasource(value):
+                    self._datasourcePaths.append(path + (key,))
+                else:
+                    self._findDatasources(value, path + (key,))
+        elif isinstance(node, list):
+            for i, value in enumerate(node):
+                self._findDatasources(value, path + (i,))
+
+def loadParameterTable(csvPath):
+    """
+    Reads template parameter table from CSV file. Columns uid, title and datasource map to
+    render arguments and columns named var.<name> set templating variable defaults.
+
+    :param csvPath: Path to CSV file
+    :type csvPath: str
+    :return: Rows of render keyword arguments
+    :rtype: list
+    """
+    parameterTable = []
+
+    with open(csvPath, 'r', newline='') as csvFile:
+        for row in csv.DictReader(csvFile):
+            parameters = {
+                "uid": row['uid'],
+                "title": row['title'],
+                "datasource": row.get('datasource') or None,
+                "variables": {}
+            }
+            for column, value in row.items():
+                if column.startswith('var.') and value != '':
+                    parameters['variables'][column[len('var.'):]] = value
+            parameterTable.append(parameters)
+
+    return parameterTable
+
+def _isConcreteDatasource(value):
+    # Leave unset, built-in and variable datasources alone
+    if value is None:
+        return False
+    name = value if isinstance(value, str) else value.get('uid') if isinstance(value, dict) else None
+    if not isinstance(name, str):
+        return False
+    return not name.startswith('$') and not name.startswith('-- ')
+
+def _getPath(node, path):
+    for key in path:
+        node = node[key]
+    return node
+
+class _PatchValue(object):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+def _patchTree(patchList):
+    # Merge paths into a tree so each container is copied once however many patches it holds
+    tree = {}
+    for path, value in patchList:
+        node = tree
+        for key in path[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            node = child
+        node[path[-1]] = _PatchValue(value)
+    return tree
+
+def _applyPatches(node, tree):
+    # Copy only the containers along patched paths so unchanged subtrees stay shared
+    copy = list(node) if isinstance(node, list) else dict(node)
+    for key, patch in tree.items():
+        if isinstance(patch, _PatchValue):
+            copy[key] = patch.value
+        else:
+            copy[key] = _applyPatches(node[key], patch)
+    return copy
@@ -0,0 +1,380 @@
+import json, gzip, threading, time, uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+class FakeGrafanaState(object):
+    """
+    In-memory users, dashboards, API keys and sessions of a FakeGrafana server
+
+    :param username: Admin login accepted by the server
+    :type username: str
+    :param password: Admin password accepted by the server
+    :type password: str
+    """
+    def __init__(self, username='admin', password='admin'):
+        """
+        Constructor Method
+        """
+        self.username = username
+        self.password = password
+
+        self.lock = threading.Lock()
+        self.users = {
+            1: {"id": 1, "login": username, "email": username + "@localhost", "name": username, "isGrafanaAdmin": True}
+        }
+        self.passwords = {1: password}
+        self.userIndex = {username: 1, username + "@localhost": 1}
+        self.nextUserId = 2
+        self.dashboards = {}
+        self.nextDashboardId = 1
+        self.apiKeys = {}
+        self.nextKeyId = 1
+        self.sessions = set()
+        self.requestCount = 0
+        self.bytesReceived = 0
+        self.pathCounts = {}
+        self.failures = {}
+
+class FakeGrafana(object):
+    """
+    Local stand-in for the Grafana HTTP API served under /grafana, for benchmarks and offline tests.
+    Implements login, admin user management, user lookup and search, dashboards and API keys.
+    Error responses can be injected per endpoint with failNext.
+
+    :param latency: Seconds added to every response
+    :type latency: float
+    :param username: Admin login accepted by the server
+    :type username: str
+    :param password: Admin password accepted by the server
+    :type password: str
+    :param port: Port to listen on, any free port when 0
+    :type port: int
+    :param acceptGzip: Decompress gzipped request bodies, otherwise they fail to parse like on a stock Grafana
+    :type acceptGzip: bool
+    :param tokenAdmin: Let API tokens use the server admin user endpoints, which a stock Grafana refuses with 403
+    :type tokenAdmin: bool
+    """
+    def __init__(self, latency=0.0, username='admin', password='admin', port=0, acceptGzip=True, tokenAdmin=False):
+        """
+        Constructor Method
+        """
+        self.latency = latency
+        self.acceptGzip = acceptGzip
+        self.tokenAdmin = tokenAdmin
+        self.state = FakeGrafanaState(username, password)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), _makeHandler(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        """
+        Host string to give GrafanaManager
+        """
+        return 'http://127.0.0.1:' + str(self._server.server_address[1])
+
+    def failNext(self, method, path, status, count=1, headers=None):
+        """
+        Answers the next requests to given endpoint with an error instead of handling them
+
+        :param method: HTTP method of the endpoint
+        :type method: str
+        :param path: Request path, e.g. /grafana/api/dashboards/db
+        :type path: str
+        :param status: HTTP status to answer with, e.g. 502 or 503
+        :type status: int
+        :param count: Number of requests to fail
+        :type count: int
+        :param headers: Extra response headers, e.g. Retry-After
+        :type headers: dict
+        """
+        with self.state.lock:
+            self.state.failures.setdefault((method, path), []).extend([(status, headers)] * count)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stop()
+
+def _makeHandler(fake):
+    state = fake.state
+
+    class FakeGrafanaHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately, which Nagle would hold back for a delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self._route('GET')
+
+        def do_POST(self):
+            self._route('POST')
+
+        def do_PUT(self):
+            self._route('PUT')
+
+        def do_DELETE(self):
+            self._route('DELETE')
+
+        def _reply(self, status, body, headers=None):
+            content = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(content)
+
+        def _readBody(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            content = self.rfile.read(length) if length > 0 else b''
+            if self.headers.get('Content-Encoding') == 'gzip' and fake.acceptGzip:
+                content = gzip.decompress(content)
+            return json.loads(content) if len(content) > 0 else {}
+
+        def _authorized(self):
+            authorization = self.headers.get('Authorization', '')
+            if authorization.startswith('Bearer '):
+                apiKey = state.apiKeys.get(authorization[len('Bearer '):])
+                return apiKey is not None and (apiKey['expires'] is None or apiKey['expires'] > time.time())
+
+            for cookie in self.headers.get('Cookie', '').split(';'):
+                name, _, value = cookie.strip().partition('=')
+                if name == 'grafana_session' and value in state.sessions:
+                    return True
+            return False
+
+        def _route(self, method):
+            if fake.latency > 0:
+                time.sleep(fake.latency)
+
+            with state.lock:
+                state.bytesReceived += int(self.headers.get('Content-Length') or 0)
+
+            url = urlparse(self.path)
+            path = url.path
+            query = parse_qs(url.query)
+
+            with state.lock:
+                state.requestCount += 1
+                state.pathCounts[(method, path)] = state.pathCounts.get((method, path), 0) + 1
+                failures = state.failures.get((method, path))
+                failure = failures.pop(0) if failures else None
+
+            try:
+                body = self._readBody() if method in ('POST', 'PUT') else None
+            except ValueError:
+                return self._reply(400, {"message": "bad request data"})
+
+            if failure is not None:
+                return self._reply(failure[0], {"message": "Injected failure"}, failure[1])
+
+            if not path.startswith('/grafana/'):
+                return self._reply(404, {"message": "Not found"})
+            path = path[len('/grafana'):]
+
+            if path == '/login' and method == 'POST':
+                return self._login(body)
+
+            if not self._authorized():
+                return self._reply(401, {"message": "Unauthorized"})
+
+            if self.headers.get('Authorization', '').startswith('Bearer ') and not fake.tokenAdmin and path.startswith(('/api/admin/', '/api/users')):
+                return self._reply(403, {"message": "Permission denied"})
+
+            parts = path.strip('/').split('/')
+
+            with state.lock:
+                if path == '/api/admin/users' and method == 'POST':
+                    return self._createUser(body)
+                if path == '/api/users/lookup' and method == 'GET':
+                    return self._lookupUser(query.get('loginOrEmail', [''])[0])
+                if path == '/api/users' and method == 'GET':
+                    return self._reply(200, self._usersPage(query)['users'])
+                if path == '/api/users/search' and method == 'GET':
+                    return self._reply(200, self._usersPage(query))
+                if parts[:3] == ['api', 'admin', 'users'] and len(parts) == 5 and method == 'PUT':
+                    return self._updateAdminUser(parts[3], parts[4], body)
+                if parts[:2] == ['api', 'users'] and len(parts) == 3 and method == 'PUT':
+                    return self._updateUser(parts[2], body)
+                if path == '/api/auth/keys' and method == 'POST':
+                    return self._createKey(body)
+                if parts[:3] == ['api', 'auth', 'keys'] and len(parts) == 4 and method == 'DELETE':
+                    return self._deleteKey(parts[3])
+                if path == '/api/dashboards/db' and method == 'POST':
+                    return self._saveDashboard(body)
+                if path == '/api/dashboards/home' and method == 'GET':
+                    return self._reply(200, {"dashboard": {"title": "Home", "panels": []}, "meta": {"isHome": True}})
+                if parts[:3] == ['api', 'dashboards', 'uid'] and len(parts) == 5 and parts[4] == 'versions':
+                    return self._dashboardVersions(parts[3])
+                if parts[:3] == ['api', 'dashboards', 'uid'] and len(parts) == 4:
+                    return self._dashboard(method, parts[3])
+                if path == '/api/search' and method == 'GET':
+                    return self._search(query)
+
+            return self._reply(404, {"message": "Not found"})
+
+        def _login(self, body):
+            with state.lock:
+                userId = state.userIndex.get(body.get('user'))
+                if userId is not None and state.passwords.get(userId) == body.get('password'):
+                    session = uuid.uuid4().hex
+                    state.sessions.add(session)
+                    return self._reply(200, {"message": "Logged in"}, {'Set-Cookie': 'grafana_session=' + session + '; Path=/; HttpOnly'})
+            return self._reply(401, {"message": "Invalid username or password"})
+
+        def _createUser(self, body):
+            if body.get('login') in state.userIndex or (body.get('email') and body.get('email') in state.userIndex):
+                return self._reply(412, {"message": "User with same email or login already exists"})
+
+            userId = state.nextUserId
+            state.nextUserId += 1
+            state.users[userId] = {
+                "id": userId,
+                "login": body.get('login'),
+                "email": body.get('email', ''),
+                "name": body.get('name', ''),
+                "isGrafanaAdmin": False
+            }
+            state.passwords[userId] = body.get('password')
+            state.userIndex[body.get('login')] = userId
+            if body.get('email'):
+                state.userIndex[body.get('email')] = userId
+            return self._reply(200, {"id": userId, "message": "User created"})
+
+        def _lookupUser(self, credential):
+            if credential in state.userIndex:
+                return self._reply(200, state.users[state.userIndex[credential]])
+            return self._reply(404, {"message": "user not found"})
+
+        def _usersPage(self, query):
+            # Listings name the admin flag isAdmin, single user lookups isGrafanaAdmin
+            users = []
+            for user in sorted(state.users.values(), key=lambda user: user['id']):
+                listed = {key: value for key, value in user.items() if key != 'isGrafanaAdmin'}
+                listed['isAdmin'] = user['isGrafanaAdmin']
+                users.append(listed)
+
+            perPage = int(query.get('perpage', [1000])[0])
+            page = int(query.get('page', [1])[0])
+            return {
+                "totalCount": len(users),
+                "users": users[(page - 1) * perPage:page * perPage],
+                "page": page,
+                "perPage": perPage
+            }
+
+        def _updateAdminUser(self, userId, field, body):
+            userId = int(userId) if userId.isdigit() else None
+            if userId not in state.users:
+                return self._reply(404, {"message": "user not found"})
+
+            if field == 'password':
+                state.passwords[userId] = body.get('password')
+                return self._reply(200, {"message": "User password updated"})
+            if field == 'permissions':
+                state.users[userId]['isGrafanaAdmin'] = bool(body.get('isGrafanaAdmin'))
+                return self._reply(200, {"message": "User permissions updated"})
+            return self._reply(404, {"message": "Not found"})
+
+        def _updateUser(self, userId, body):
+            userId = int(userId) if userId.isdigit() else None
+            if userId not in state.users:
+                return self._reply(404, {"message": "user not found"})
+
+            for field in ('login', 'email', 'name'):
+                if field in body:
+                    if field != 'name':
+                        state.userIndex.pop(state.users[userId][field], None)
+                        state.userIndex[body[field]] = userId
+                    state.users[userId][field] = body[field]
+            return self._reply(200, {"message": "User updated"})
+
+        def _createKey(self, body):
+            if body.get('name') in [key['name'] for key in state.apiKeys.values()]:
+                return self._reply(409, {"message": "API Key Organization ID And Name Must Be Unique"})
+
+            key = uuid.uuid4().hex
+            secondsToLive = body.get('secondsToLive') or 0
+            state.apiKeys[key] = {
+                "id": state.nextKeyId,
+                "name": body.get('name'),
+                "role": body.get('role'),
+                "expires": time.time() + secondsToLive if secondsToLive > 0 else None
+            }
+            state.nextKeyId += 1
+            return self._reply(200, {"id": state.apiKeys[key]['id'], "name": body.get('name'), "key": key})
+
+        def _deleteKey(self, keyId):
+            for key, apiKey in list(state.apiKeys.items()):
+                if str(apiKey['id']) == keyId:
+                    del state.apiKeys[key]
+                    return self._reply(200, {"message": "API key deleted"})
+            return self._reply(404, {"message": "API key not found"})
+
+        def _saveDashboard(self, body):
+            dashboard = body.get('dashboard') if isinstance(body, dict) else None
+            if not isinstance(dashboard, dict):
+                return self._reply(400, {"message": "Dashboard is missing"})
+
+            uid = dashboard.get('uid') or uuid.uuid4().hex[:9]
+            previous = state.dashboards.get(uid)
+            if previous is not None:
+                dashboardId = previous['dashboard']['id']
+                version = previous['dashboard']['version'] + 1
+            else:
+                dashboardId = state.nextDashboardId
+                state.nextDashboardId += 1
+                version = 1
+
+            state.dashboards[uid] = {
+                "dashboard": dict(dashboard, id=dashboardId, uid=uid, version=version),
+                "meta": {"version": version, "slug": str(dashboard.get('title', '')).lower().replace(' ', '-')}
+            }
+            return self._reply(200, {"id": dashboardId, "uid": uid, "version": version, "status": "success"})
+
+        def _dashboardVersions(self, uid):
+            if uid not in state.dashboards:
+                return self._reply(404, {"message": "Dashboard not found"})
+            return self._reply(200, [{"version": state.dashboards[uid]['dashboard']['version']}])
+
+        def _dashboard(self, method, uid):
+            if uid not in state.dashboards:
+                return self._reply(404, {"message": "Dashboard not found"})
+
+            if method == 'DELETE':
+                title = state.dashboards.pop(uid)['dashboard'].get('title')
+                return self._reply(200, {"title": title, "message": "Dashboard deleted"})
+            return self._reply(200, state.dashboards[uid])
+
+        def _search(self, query):
+            # Like Grafana, search results carry no version
+            results = []
+            for uid, saved in sorted(state.dashboards.items(), key=lambda item: item[1]['dashboard']['id']):
+                results.append({
+                    "id": saved['dashboard']['id'],
+                    "uid": uid,
+                    "title": saved['dashboard'].get('title'),
+                    "type": "dash-db"
+                })
+
+            limit = int(query.get('limit', [1000])[0])
+            page = int(query.get('page', [1])[0])
+            return self._reply(200, results[(page - 1) * limit:page * limit])
+
+    return FakeGrafanaHandler
@@ -0,0 +1,90 @@
+import os, stat, tempfile
+from os.path import exists
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# The umask can only be read by setting it, so it is read once at import
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def atomicWrite(filePath, content, sync=False, mode=None):
+    """
+    Writes file by writing a temporary file next to it and swapping it in,
+    so readers never see a partial file.
+
+    :param filePath: Path of file to write
+    :type filePath: str
+    :param content: File content
+    :type content: bytes
+    :param sync: Flush the content to disk before swapping the file in
+    :type sync: bool
+    :param mode: Permission bits of the file, defaults to those of the file being replaced, or to what open would give a new file
+    :type mode: int
+    """
+    if mode is None:
+        try:
+            mode = stat.S_IMODE(os.stat(filePath).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+
+    # Hidden temporary name so directory walks never pick up a partial file
+    fd, tempPath = tempfile.mkstemp(prefix='.', suffix='.tmp', dir=os.path.dirname(os.path.abspath(filePath)))
+    try:
+        with os.fdopen(fd, 'wb') as tempFile:
+            tempFile.write(content)
+            if sync:
+                tempFile.flush()
+                os.fsync(tempFile.fileno())
+        # Temporary files are created owner-only
+        os.chmod(tempPath, mode)
+        os.replace(tempPath, filePath)
+    except OSError:
+        if exists(tempPath):
+            os.remove(tempPath)
+        raise
+
+class FileLock(object):
+    """
+    Exclusive lock on a file, held across processes and, through threadLock, across threads
+
+    :param lockPath: Path to lock file, created if missing
+    :type lockPath: str
+    :param threadLock: Lock shared by the threads of this process using lockPath
+    :type threadLock: threading.Lock
+    """
+    def __init__(self, lockPath, threadLock):
+        self.lockPath = lockPath
+        self.threadLock = threadLock
+        self._file = None
+
+    def __enter__(self):
+        self.threadLock.acquire()
+        try:
+            self._file = open(self.lockPath, 'a+')
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        except OSError:
+            if self._file is not None:
+                self._file.close()
+            self.threadLock.release()
+            raise
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self.threadLock.release()
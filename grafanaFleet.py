@@ -0,0 +1,209 @@
+import os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from os.path import isdir
+from grafanaInterface import GrafanaManager, requests
+
+class GrafanaFleet(object):
+    """
+    Group of Grafana Managers, one per Grafana Host, running the same operation on every host at once.
+    Each host keeps its own manager and connection pool, while the requests of all hosts together
+    are bounded by maxConcurrency.
+
+    :param maxConcurrency: Maximum number of concurrent requests across all hosts
+    :type maxConcurrency: int
+    :param managerOptions: Keyword arguments given to every GrafanaManager created by the fleet, e.g. infoFilePath or poolSize
+    :type managerOptions: dict
+    """
+    def __init__(self, maxConcurrency=32, **managerOptions):
+        """
+        Constructor Method
+        """
+        self.maxConcurrency = maxConcurrency
+        self.managerOptions = managerOptions
+
+        self.managers = {}
+        self._requestLimit = threading.BoundedSemaphore(maxConcurrency)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def getHosts(self):
+        return list(self.managers)
+
+    def getManager(self, host):
+        return self.managers.get(host)
+
+    def addManager(self, manager):
+        """
+        Adds existing Grafana Manager to the fleet, replacing any manager of the same host.
+
+        :param manager: Grafana Manager with a host
+        :type manager: GrafanaManager
+        """
+        if manager.host is None:
+            raise ValueError("No Grafana host specified to object.")
+
+        manager.requestLimit = self._requestLimit
+        self.managers[manager.host] = manager
+
+    def addHost(self, host, username=None, password=None, key=None):
+        """
+        Creates Grafana Manager for given host with the fleet's manager options and adds it to the fleet.
+
+        :param host: Grafana Host
+        :type host: str
+        :param username: Grafana Admin Username
+        :type username: str
+        :param password: Grafana Admin Password
+        :type password: str
+        :param key: Grafana API token
+        :type key: str
+        :return: Created manager
+        :rtype: GrafanaManager
+        """
+        options = dict(self.managerOptions)
+        options.update(host=host, username=username, password=password, key=key)
+
+        manager = GrafanaManager(**options)
+        self.addManager(manager)
+        return manager
+
+    def removeHost(self, host):
+        manager = self.managers.pop(host, None)
+        if manager is not None:
+            manager.closeSession()
+
+    def loadConfigFiles(self, configFiles, delimiter):
+        """
+        Adds one host per configuration file, in the format written by GrafanaManager.createConfigFile.
+
+        :param configFiles: Configuration file paths, or a directory whose files are all configuration files
+        :type configFiles: list or str
+        :param delimiter: The delimiter of the configuration files
+        :type delimiter: str
+        :return: Function Status, data holds the parse status keyed by file path
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        if isinstance(configFiles, str):
+            if not isdir(configFiles):
+                response['msg'] = "No config directory found. Failed to load config files."
+                return response
+            configFiles = sorted(os.path.join(configFiles, name) for name in os.listdir(configFiles))
+
+        fileStatus = {}
+        for configFile in configFiles:
+            manager = GrafanaManager(**self.managerOptions)
+            status = manager.parseConfigFile(configFile, delimiter)
+
+            if status['success'] and manager.host in (None, ''):
+                status = {
+                    "success": False,
+                    "msg": "No host in config file. Failed to parse config file."
+                }
+
+            if status['success']:
+                self.addManager(manager)
+            fileStatus[configFile] = status
+
+        failed = len([status for status in fileStatus.values() if not status['success']])
+
+        response['data'] = fileStatus
+        if failed == 0:
+            response['success'] = True
+            response['msg'] = "Successfully loaded config files."
+        else:
+            response['msg'] = "Failed to load some config files. Check data for specific information."
+
+        return response
+
+    def run(self, operation, *args, **kwargs):
+        """
+        Runs GrafanaManager operation on every host concurrently. Extra arguments are passed to the operation.
+        Operations returning anything but a Function Status, such as getSessionStats, succeed with their
+        return value as data.
+
+        :param operation: Name of a GrafanaManager method, or a function called with each host's manager
+        :type operation: str or function
+        :return: Function Status, data holds results keyed by host, per-host elapsed seconds, succeeded and failed counts, and elapsed seconds
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        if len(self.managers) == 0:
+            response['msg'] = "No Grafana hosts in fleet."
+            return response
+
+        if isinstance(operation, str) and not callable(getattr(GrafanaManager, operation, None)):
+            response['msg'] = "Unknown Grafana Manager operation: " + operation
+            return response
+
+        startTime = time.perf_counter()
+
+        def runOnHost(manager):
+            hostStart = time.perf_counter()
+            try:
+                if isinstance(operation, str):
+                    result = getattr(manager, operation)(*args, **kwargs)
+                else:
+                    result = operation(manager, *args, **kwargs)
+
+                if not isinstance(result, dict) or 'success' not in result:
+                    result = {
+                        "success": True,
+                        "msg": "Successfully ran operation on Grafana host.",
+                        "data": result
+                    }
+            except (OSError, ValueError, requests.exceptions.RequestException) as e:
+                result = {
+                    "success": False,
+                    "msg": "Failed to run operation on Grafana host. " + str(e)
+                }
+            return result, time.perf_counter() - hostStart
+
+        managers = list(self.managers.values())
+
+        # Hosts beyond maxConcurrency would only wait for a request slot
+        with ThreadPoolExecutor(max_workers=min(len(managers), self.maxConcurrency)) as executor:
+            outcomes = list(executor.map(runOnHost, managers))
+
+        hostResults = {}
+        hostElapsed = {}
+        for manager, (result, elapsed) in zip(managers, outcomes):
+            hostResults[manager.host] = result
+            hostElapsed[manager.host] = elapsed
+
+        succeeded = len([result for result in hostResults.values() if result['success']])
+
+        response['data'] = {
+            "hosts": hostResults,
+            "hostElapsed": hostElapsed,
+            "succeeded": succeeded,
+            "failed": len(hostResults) - succeeded,
+            "elapsed": time.perf_counter() - startTime
+        }
+
+        if succeeded == len(hostResults):
+            response['success'] = True
+            response['msg'] = "Successfully ran operation on all Grafana hosts."
+        else:
+            response['msg'] = "Failed to run operation on some Grafana hosts. Check data for specific information."
+
+        return response
+
+    def close(self):
+        """
+        Closes the shared session of every manager.
+        """
+        for manager in self.managers.values():
+            manager.closeSession()
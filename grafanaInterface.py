@@ -1,11 +1,273 @@
-import requests, json, os
+import os, threading, time, random, gzip, importlib
+from collections import OrderedDict
+from contextlib import nullcontext
 from os.path import exists
-from urllib3.exceptions import InsecureRequestWarning
+from apiResponse import APIResponse
+from dashboardCache import DashboardCache
+from requestMetrics import RequestMetrics
+from dashboardTools import DashboardTemplate, MinifiedDashboardCache, minifyDashboard, collapseRows, loadDashboardFile, saveDashboardFile, validateDashboard, validateDashboardFile, dashboardHash, loadManifest, updateManifest
+from tokenCache import TokenCache
+from jobJournal import JobJournal
+from userInfoStore import UserInfoStore, FileUserInfoStore, openUserInfoStore
+from dashboardAnalyzer import analyzeDashboard, checkQueryBudget, validateQueryBudget
+from userReconcile import loadDesiredUsers, normalizeDesiredUser, planUserChanges, formatPlan
+
+# Names exported by star imports, including the lazily imported InsecureRequestWarning and HTTPAdapter
+__all__ = [
+    'GrafanaManager', 'UserIdCache', 'TokenBucket', 'getHostLimit', 'getHostRateLimiter',
+    'RETRY_STATUS_CODES', 'UNPROCESSED_STATUS_CODES', 'IDEMPOTENT_METHODS', 'RESUMED_STATUS', 'GZIP_MIN_SIZE',
+    'APIResponse', 'DashboardCache', 'RequestMetrics', 'TokenCache', 'JobJournal',
+    'DashboardTemplate', 'MinifiedDashboardCache', 'minifyDashboard', 'collapseRows', 'loadDashboardFile', 'saveDashboardFile',
+    'validateDashboard', 'validateDashboardFile', 'dashboardHash', 'loadManifest', 'updateManifest',
+    'UserInfoStore', 'FileUserInfoStore', 'openUserInfoStore', 'analyzeDashboard', 'checkQueryBudget', 'validateQueryBudget',
+    'loadDesiredUsers', 'normalizeDesiredUser', 'planUserChanges', 'formatPlan',
+    'requests', 'os', 'exists', 'InsecureRequestWarning', 'HTTPAdapter'
+]
 
 # Settings
 
-# Prevents invalid certificate warning
-requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning) 
+class _LazyModule(object):
+    """
+    Stand-in for a module that is imported on first attribute access
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+# requests and urllib3 make up most of the import time, so they load with the first session
+requests = _LazyModule('requests')
+concurrentFutures = _LazyModule('concurrent.futures')
+_certificateWarningsDisabled = False
+
+def __getattr__(name):
+    # Names this module used to import eagerly
+    if name == 'InsecureRequestWarning':
+        return importlib.import_module('urllib3.exceptions').InsecureRequestWarning
+    if name == 'HTTPAdapter':
+        return importlib.import_module('requests.adapters').HTTPAdapter
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+def _isConnectError(error):
+    # Connection failed before any of the request was sent
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if len(error.args) > 0 else None
+    return isinstance(reason, importlib.import_module('urllib3.exceptions').NewConnectionError)
+
+def _disableCertificateWarnings():
+    # Prevents invalid certificate warning
+    global _certificateWarningsDisabled
+    if not _certificateWarningsDisabled:
+        requests.packages.urllib3.disable_warnings(category=__getattr__('InsecureRequestWarning'))
+        _certificateWarningsDisabled = True
+
+# Responses worth retrying: rate limited or a proxy in front of Grafana failed
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+# Responses telling the request was not processed, the only ones non-idempotent requests are retried after
+UNPROCESSED_STATUS_CODES = (429, 503)
+
+# Methods that can be sent again without repeating their effect
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+# Result of bulk job items that succeeded in an earlier run of the job
+RESUMED_STATUS = {
+    "success": True,
+    "msg": "Completed by an earlier run of the job. Skipped."
+}
+
+# Request bodies smaller than this are not worth gzipping
+GZIP_MIN_SIZE = 1024
+
+# Minified dashboard files shared by every manager, so uploading one file to many hosts minifies it once
+_minifiedDashboards = MinifiedDashboardCache()
+
+# Concurrent request limits shared by every manager talking to the same host
+_hostLimits = {}
+_hostLimitsLock = threading.Lock()
+
+def getHostLimit(host, limit):
+    """
+    Returns the semaphore bounding concurrent requests to given host.
+    The limit of the first caller for a host is kept for the life of the process.
+
+    :param host: Grafana Host
+    :type host: str
+    :param limit: Maximum number of concurrent requests to host
+    :type limit: int
+    :return: Host semaphore
+    :rtype: threading.BoundedSemaphore
+    """
+    with _hostLimitsLock:
+        if host not in _hostLimits:
+            _hostLimits[host] = threading.BoundedSemaphore(limit)
+        return _hostLimits[host]
+
+# Whether each host accepts gzipped uploads, learned by the first manager uploading to it
+_hostGzipAccepted = {}
+
+# Client-side request rate limits shared by every manager talking to the same host
+_hostRateLimiters = {}
+
+def getHostRateLimiter(host, rate, burst=None):
+    """
+    Returns the token bucket limiting request rate to given host.
+    The rate of the first caller for a host is kept for the life of the process.
+
+    :param host: Grafana Host
+    :type host: str
+    :param rate: Requests per second
+    :type rate: float
+    :param burst: Requests allowed back to back, defaults to rate rounded up
+    :type burst: int
+    :return: Host token bucket
+    :rtype: TokenBucket
+    """
+    with _hostLimitsLock:
+        if host not in _hostRateLimiters:
+            _hostRateLimiters[host] = TokenBucket(rate, burst)
+        return _hostRateLimiters[host]
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket refilled at a constant rate
+
+    :param rate: Tokens added per second
+    :type rate: float
+    :param burst: Bucket capacity, defaults to rate rounded up
+    :type burst: int
+    """
+    def __init__(self, rate, burst=None):
+        """
+        Constructor Method
+        """
+        self.rate = float(rate)
+        self.burst = burst if burst is not None else max(int(-(-self.rate // 1)), 1)
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes one token, sleeping until one is available.
+
+        :return: Seconds spent waiting
+        :rtype: float
+        """
+        waited = 0.0
+        while True:
+            delay = self.take()
+            if delay == 0:
+                return waited
+
+            time.sleep(delay)
+            waited += delay
+
+    def take(self):
+        """
+        Takes one token if one is available, without waiting.
+
+        :return: 0 if a token was taken, otherwise seconds until one is available
+        :rtype: float
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+
+            return (1 - self._tokens) / self.rate
+
+class UserIdCache(object):
+    """
+    Thread-safe least recently used cache of Grafana user IDs keyed by login and email
+
+    :param maxSize: Maximum number of cached logins and emails
+    :type maxSize: int
+    :param ttl: Seconds an entry stays valid
+    :type ttl: float
+    """
+    def __init__(self, maxSize=10000, ttl=300):
+        """
+        Constructor Method
+        """
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, credential):
+        """
+        Finds cached user ID of given login or email.
+
+        :param credential: Grafana username or email
+        :type credential: str
+        :return: User ID, None if not cached or expired
+        :rtype: int
+        """
+        with self._lock:
+            entry = self._entries.get(credential)
+
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[credential]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(credential)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user):
+        """
+        Caches user ID under the login and email of given Grafana user.
+
+        :param user: Grafana user as returned by the users API
+        :type user: dict
+        """
+        if self.maxSize <= 0 or 'id' not in user:
+            return
+
+        expiry = time.monotonic() + self.ttl
+
+        with self._lock:
+            for key in ('login', 'email'):
+                credential = user.get(key)
+                if credential:
+                    self._entries[credential] = (user['id'], expiry)
+                    self._entries.move_to_end(credential)
+
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, credential):
+        """
+        Removes given login or email, along with every other key of the same user ID.
+
+        :param credential: Grafana username or email
+        :type credential: str
+        """
+        with self._lock:
+            entry = self._entries.pop(credential, None)
+            if entry is not None:
+                for key in [key for key, value in self._entries.items() if value[0] == entry[0]]:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
 
 class GrafanaManager(object):
     """
@@ -23,8 +285,48 @@ class GrafanaManager(object):
     :type infoFileDelimiter: str
     :param key: Grafana API token
     :type key: str
+    :param poolSize: Maximum number of kept-alive connections to Grafana Host
+    :type poolSize: int
+    :param hostConcurrency: Maximum number of concurrent requests to Grafana Host, defaults to poolSize
+    :type hostConcurrency: int
+    :param infoBackend: User Information File backend, 'file', 'sqlite' or a UserInfoStore object
+    :type infoBackend: str or UserInfoStore
+    :param userCacheSize: Maximum number of logins and emails kept in the user ID cache
+    :type userCacheSize: int
+    :param userCacheTTL: Seconds a cached user ID stays valid
+    :type userCacheTTL: float
+    :param dashboardCacheDir: Directory caching fetched dashboards, no caching when None
+    :type dashboardCacheDir: str
+    :param dashboardCacheSize: Maximum number of cached dashboards
+    :type dashboardCacheSize: int
+    :param dashboardCacheMaxAge: Seconds a cached dashboard is served without asking the server for its version
+    :type dashboardCacheMaxAge: float
+    :param retries: Number of times a request is retried after a connection error or a 429, 502, 503 or 504 response. Non-idempotent requests such as POST are only retried when they cannot have reached Grafana: failed connections and 429 or 503 responses
+    :type retries: int
+    :param backoffFactor: Base delay in seconds of the exponential backoff between retries
+    :type backoffFactor: float
+    :param maxBackoff: Longest delay in seconds between retries, including delays asked for by Retry-After
+    :type maxBackoff: float
+    :param rateLimit: Maximum requests per second to Grafana Host, no limit when None
+    :type rateLimit: float
+    :param rateBurst: Requests allowed back to back under rateLimit
+    :type rateBurst: int
+    :param minifyDashboards: Upload dashboard files re-serialized without whitespace instead of as written
+    :type minifyDashboards: bool
+    :param compressUploads: Gzip dashboard uploads, falling back to plain uploads if Grafana Host rejects them
+    :type compressUploads: bool
+    :param lazy: Defer creating the user information file and storing the admin login until the file is first used
+    :type lazy: bool
+    :param tokenCache: API token cache shared across processes, or path to its file. createAdminToken reuses its token until it nears expiry
+    :type tokenCache: str or TokenCache
+    :param tokenTTL: Seconds API tokens created through the token cache live, no expiry when None
+    :type tokenTTL: float
+    :param adminAuth: Authentication of admin requests, 'cookie' for the admin login or 'token' to try the API token first
+    :type adminAuth: str
+    :param journalDir: Directory of the journals kept by bulk methods given a job ID
+    :type journalDir: str
     """
-    def __init__(self, host=None, username=None, password=None, infoFilePath=None, infoFileDelimiter=None, key=None):
+    def __init__(self, host=None, username=None, password=None, infoFilePath=None, infoFileDelimiter=None, key=None, poolSize=10, hostConcurrency=None, infoBackend='file', userCacheSize=10000, userCacheTTL=300, dashboardCacheDir=None, dashboardCacheSize=500, dashboardCacheMaxAge=0, retries=3, backoffFactor=0.5, maxBackoff=30, rateLimit=None, rateBurst=None, minifyDashboards=False, compressUploads=False, lazy=False, tokenCache=None, tokenTTL=86400, adminAuth='cookie', journalDir='jobJournals'):
         """
         Constructor Method
         """
@@ -34,26 +336,79 @@ class GrafanaManager(object):
         self.username = username
         self.password = password
 
+        # Shared HTTP session, created on first request and reused by every method
+
+        self.poolSize = poolSize
+        self.hostConcurrency = hostConcurrency if hostConcurrency is not None else poolSize
+        self._session = None
+        self._sessionLock = threading.RLock()
+        self._loggedIn = False
+        self._loginGeneration = 0
+        self.loginCount = 0
+
+        # Retry and rate limit settings of every request
+        self.retries = retries
+        self.backoffFactor = backoffFactor
+        self.maxBackoff = maxBackoff
+        self.rateLimit = rateLimit
+        self.rateBurst = rateBurst
+        self.retryCount = 0
+
+        # API tokens reused across runs, and whether Grafana accepts the token for admin requests
+        self.tokenCache = TokenCache(tokenCache) if isinstance(tokenCache, str) else tokenCache
+        self.tokenTTL = tokenTTL
+        self.adminAuth = adminAuth
+        self._tokenName = "newToken"
+        self._adminTokenAccepted = None
+
+        # Journals of resumable bulk jobs, one file per job ID and host
+        self.journalDir = journalDir
+
+        # Semaphore bounding concurrent requests of several managers together, set by GrafanaFleet
+        self.requestLimit = None
+        self._counterLock = threading.Lock()
+
+        # Per-endpoint request metrics and hooks called after every request attempt
+        self.requestMetrics = RequestMetrics(host)
+        self.requestHooks = []
+
+        # Login and email to user ID cache, filled by findUser and getAllUsers
+        self.userIdCache = UserIdCache(userCacheSize, userCacheTTL)
+
+        # Dashboard upload encoding, gzip support of the host is learned from the first compressed upload
+        self.minifyDashboards = minifyDashboards
+        self.compressUploads = compressUploads
+
+        # Fetched dashboards, keyed by host and API path
+        self.dashboardCache = DashboardCache(dashboardCacheDir, dashboardCacheSize) if dashboardCacheDir is not None else None
+        self.dashboardCacheMaxAge = dashboardCacheMaxAge
+
         # Constant attributes for user local database
 
         self.infoFilePath = infoFilePath
         self.infoFileDelimiter = infoFileDelimiter
-
-        # Create User Information file if it does not exist
-        if infoFilePath is not None:
-            if not exists(infoFilePath):
-                fout = open(self.infoFilePath, 'w')
-                fout.close()
-
-        # Store admin username and password
-        if username is not None and password is not None and infoFilePath is not None:
-            self.storeUserInfo(username, password)
+        self.infoBackend = infoBackend
+        self._userInfoStore = None
+        self._userInfoStoreKey = None
+
+        # A store object brings its own location
+        if isinstance(infoBackend, UserInfoStore):
+            self.infoFilePath = infoFilePath = infoBackend.filePath
+            self.infoFileDelimiter = infoBackend.delimiter
+
+        # User Information file setup, run now or on first use of the file
+        self._infoFilePending = True
+        if not lazy:
+            self._prepareUserInfoFile()
     
     def getHost(self):
         return self.host
     
     def setHost(self, host):
         self.host = host
+        self._loggedIn = False
+        self.userIdCache.clear()
+        self.requestMetrics.host = host
     
     def getAPIKey(self):
         return self.apiKey
@@ -66,16 +421,19 @@ class GrafanaManager(object):
     
     def setUsername(self, username):
         self.username = username
+        self._loggedIn = False
     
     def getPassword(self):
         return self.password
 
     def setPassword(self, password):
         self.password = password
+        self._loggedIn = False
     
     def setUserLogin(self, username, password):
         self.username = username
         self.password = password
+        self._loggedIn = False
 
     def setUserInfoFile(self, userInfoFilePath, userInfoFileDelimiter):
         """
@@ -103,6 +461,282 @@ class GrafanaManager(object):
 
         return response
 
+    # Session Methods
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.closeSession()
+
+    def getSession(self):
+        """
+        Returns the shared keep-alive session, creating it on first use.
+
+        :return: Pooled HTTP session
+        :rtype: requests.Session
+        """
+        with self._sessionLock:
+            if self._session is None:
+                _disableCertificateWarnings()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=self.poolSize, pool_maxsize=self.poolSize)
+                session = requests.Session()
+                session.verify = False
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+                self._loggedIn = False
+
+            return self._session
+
+    def closeSession(self):
+        """
+        Closes the shared session and its pooled connections.
+        A new session is opened by the next request.
+        """
+        with self._sessionLock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            self._loggedIn = False
+
+    def getSessionStats(self):
+        """
+        Obtains counters of the shared session.
+
+        :return: Number of logins, retries, requests sent, connections opened and connections reused
+        :rtype: dict
+        """
+        stats = {
+            "logins": self.loginCount,
+            "retries": self.retryCount,
+            "requests": 0,
+            "connections": 0,
+            "reusedConnections": 0
+        }
+
+        with self._sessionLock:
+            if self._session is not None:
+                for adapter in set(self._session.adapters.values()):
+                    pools = adapter.poolmanager.pools
+                    for key in pools.keys():
+                        pool = pools.get(key)
+                        if pool is not None:
+                            stats['requests'] += pool.num_requests
+                            stats['connections'] += pool.num_connections
+
+        stats['reusedConnections'] = max(stats['requests'] - stats['connections'], 0)
+
+        return stats
+
+    def metrics(self, prometheus=False):
+        """
+        Obtains request metrics of the object: per-endpoint latency histograms, status codes
+        and bytes moved, along with login and retry counts.
+
+        :param prometheus: Return metrics in Prometheus text exposition format
+        :type prometheus: bool
+        :return: Metrics snapshot, or Prometheus text
+        :rtype: dict or str
+        """
+        if prometheus:
+            return self.requestMetrics.prometheus()
+        return self.requestMetrics.snapshot()
+
+    def addRequestHook(self, hook):
+        """
+        Registers function called after every request attempt with the method, API path,
+        status code ('error' if no response), elapsed seconds, bytes sent and bytes received.
+
+        :param hook: Function to call
+        :type hook: callable
+        """
+        self.requestHooks.append(hook)
+
+    def _url(self, path):
+        """
+        Builds request URL for given API path. Hosts without a scheme default to HTTPS.
+        """
+        if '://' in self.host:
+            return self.host.rstrip('/') + path
+        return 'https://' + self.host + path
+
+    def _login(self, generation=None):
+        """
+        Logs the shared session in to Grafana. When generation is given, the login
+        is skipped if another thread has already logged in since that generation.
+        """
+        with self._sessionLock:
+            if generation is not None and generation != self._loginGeneration:
+                return
+
+            x = self._send(
+                'POST',
+                '/grafana/login',
+                idempotent=True,
+                headers={'Content-Type': 'application/json'},
+                json={"password": self.password,"user": self.username}
+            )
+            self.loginCount += 1
+            self.requestMetrics.increment('logins')
+            self._loginGeneration += 1
+            self._loggedIn = x.status_code == 200
+
+    def _adminRequest(self, method, path, **kwargs):
+        """
+        Sends request authenticated as the admin. With adminAuth 'token' the API token, taken from
+        the token cache if the object has none, is tried first. Grafana refuses API tokens on its
+        server admin endpoints, so after a 403 the object keeps to the admin login cookie.
+        """
+        if self.adminAuth == 'token' and self._adminTokenAccepted is not False:
+            if self.apiKey is None and self.tokenCache is not None:
+                self._cachedAdminToken(self._tokenName)
+
+            if self.apiKey is not None:
+                x = self._tokenRequest(method, path, **kwargs)
+                if x.status_code != 403:
+                    return x
+                self._adminTokenAccepted = False
+
+        return self._cookieRequest(method, path, **kwargs)
+
+    def _cookieRequest(self, method, path, **kwargs):
+        """
+        Sends request authenticated with the admin login cookie. Logs in on first use
+        and logs in again once if Grafana rejects the cookie.
+        """
+        if not self._loggedIn:
+            self._login(self._loginGeneration)
+
+        generation = self._loginGeneration
+        x = self._send(method, path, **kwargs)
+
+        # Cookie expired or was revoked
+        if x.status_code == 401:
+            self._login(generation)
+            x = self._send(method, path, **kwargs)
+
+        return x
+
+    def _tokenRequest(self, method, path, headers=None, **kwargs):
+        """
+        Sends request authenticated with the object's API token. With a token cache, a token Grafana
+        rejects is replaced through the cache and the request is sent once more.
+        """
+        requestHeaders = dict(headers or {})
+        requestHeaders['Authorization'] = "Bearer " + self.apiKey
+
+        body = kwargs.get('data')
+        bodyStart = body.tell() if hasattr(body, 'seek') else None
+
+        x = self._send(method, path, headers=requestHeaders, **kwargs)
+
+        # Token expired or was revoked
+        if x.status_code == 401 and self.tokenCache is not None:
+            rejectedKey = self.apiKey
+            if self._cachedAdminToken(self._tokenName, rejectedKey)['success'] and self.apiKey != rejectedKey:
+                if bodyStart is not None:
+                    body.seek(bodyStart)
+                requestHeaders['Authorization'] = "Bearer " + self.apiKey
+                x = self._send(method, path, headers=requestHeaders, **kwargs)
+
+        return x
+
+    def _send(self, method, path, idempotent=None, **kwargs):
+        """
+        Sends request over the shared session while holding one of the host's concurrency slots.
+        Connection errors and 429, 502, 503 and 504 responses are retried with exponential backoff
+        and full jitter, waiting at least as long as a Retry-After header asks. Requests that are not
+        idempotent, by default every method but GET, HEAD, OPTIONS, PUT and DELETE, are only retried
+        when Grafana cannot have processed them. The final response is returned as an APIResponse
+        timed from the first attempt.
+        """
+        session = self.getSession()
+        hostLimit = getHostLimit(self.host, self.hostConcurrency)
+        rateLimiter = getHostRateLimiter(self.host, self.rateLimit, self.rateBurst) if self.rateLimit else None
+
+        # Streamed bodies are rewound before every retry
+        body = kwargs.get('data')
+        bodyStart = body.tell() if hasattr(body, 'seek') else None
+
+        attempt = 0
+        requestStart = time.perf_counter()
+        while True:
+            if bodyStart is not None:
+                body.seek(bodyStart)
+
+            if rateLimiter is not None:
+                rateLimiter.acquire()
+
+            startTime = time.perf_counter()
+            try:
+                with hostLimit, self.requestLimit or nullcontext():
+                    x = session.request(method, self._url(path), verify=False, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                self._recordRequest(method, path, None, time.perf_counter() - startTime)
+                if not self._shouldRetry(method, idempotent, attempt, None, _isConnectError(error)):
+                    raise
+                x = None
+            else:
+                self._recordRequest(method, path, x, time.perf_counter() - startTime)
+
+            if x is not None and not self._shouldRetry(method, idempotent, attempt, x.status_code):
+                return APIResponse.fromResponse(x, time.perf_counter() - requestStart)
+
+            time.sleep(self._retryDelay(attempt, x))
+            attempt += 1
+            with self._counterLock:
+                self.retryCount += 1
+            self.requestMetrics.increment('retries')
+
+    def _shouldRetry(self, method, idempotent, attempt, status, connectFailed=False):
+        """
+        Tells whether a failed request attempt is sent again. A status of None means no response came back.
+        """
+        if attempt >= self.retries:
+            return False
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        if status is None:
+            return idempotent or connectFailed
+        return status in (RETRY_STATUS_CODES if idempotent else UNPROCESSED_STATUS_CODES)
+
+    def _recordRequest(self, method, path, x, elapsed):
+        """
+        Passes one request attempt to the metrics and every request hook.
+        A missing response is recorded with status 'error'.
+        """
+        if x is not None:
+            self._recordAttempt(method, path, x.status_code, elapsed, int(x.request.headers.get('Content-Length') or 0), len(x.content))
+        else:
+            self._recordAttempt(method, path, 'error', elapsed, 0, 0)
+
+    def _recordAttempt(self, method, path, status, elapsed, bytesSent, bytesReceived):
+        self.requestMetrics.record(method, path, status, elapsed, bytesSent, bytesReceived)
+
+        for hook in self.requestHooks:
+            hook(method, path, status, elapsed, bytesSent, bytesReceived)
+
+    def _retryDelay(self, attempt, x):
+        """
+        Returns seconds to wait before given retry attempt, honouring Retry-After of the failed response.
+        """
+        delay = random.uniform(0, min(self.maxBackoff, self.backoffFactor * (2 ** attempt)))
+
+        retryAfter = x.headers.get('Retry-After') if x is not None else None
+        if retryAfter is not None:
+            try:
+                delay = max(delay, float(retryAfter))
+            except ValueError:
+                try:
+                    from email.utils import parsedate_to_datetime
+                    delay = max(delay, parsedate_to_datetime(retryAfter).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+
+        return min(max(delay, 0), self.maxBackoff)
+
     # File Handling Methods
 
     def createConfigFile(self, fileName, delimiter):
@@ -205,37 +839,48 @@ class GrafanaManager(object):
             "msg": None
         }
 
+        self._prepareUserInfoFile()
+
         if not exists(self.infoFilePath):
             response['msg'] = "User Info File not found."
             return response
 
-        # Attempt to find user
-        user = self.getUserInfo(username)
-
         # If user exist in info file
-        if user['success']:
-            previousLines = ""
-
-            with open(self.infoFilePath,'r') as infoF:
-                for line in infoF:
-                    if len(line.strip()) > 0:
-                        currentLine = line.split(self.infoFileDelimiter)
-                        if currentLine[0] != username:
-                            previousLines += line.strip() + '\n'
-
-            previousLines += username + self.infoFileDelimiter + password + '\n'
-
-            with open(self.infoFilePath, 'w') as infoF:
-                infoF.write(previousLines)
-
+        if self._getUserInfoStore().store(username, password):
             response['success'] = True
             response['msg'] = "Replaced user info in info file."
         # If user does not exist in info file
         else:
-            with open(self.infoFilePath,'a') as infoF:
-                infoF.write(username + self.infoFileDelimiter + password + '\n')
-                response['success'] = True
-                response['msg'] = "Added user info to info file."
+            response['success'] = True
+            response['msg'] = "Added user info to info file."
+
+        return response
+
+    def storeUsersInfo(self, users):
+        """
+        Stores many usernames and passwords to user information file in one write.
+        Existing entries for the given usernames are replaced.
+
+        :param users: Account passwords keyed by username
+        :type users: dict
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        self._prepareUserInfoFile()
+
+        if not exists(self.infoFilePath):
+            response['msg'] = "User Info File not found."
+            return response
+
+        self._getUserInfoStore().storeMany(users)
+
+        response['success'] = True
+        response['msg'] = "Stored " + str(len(users)) + " users in info file."
 
         return response
 
@@ -253,25 +898,23 @@ class GrafanaManager(object):
             "msg": None
         }
 
+        self._prepareUserInfoFile()
+
         if not exists(self.infoFilePath):
             response['msg'] = "User Info File not found."
             return response
 
-        with open(self.infoFilePath,'r') as infoF:
-            for line in infoF:
-                if len(line.strip()) > 0:
-                    currentLine = line.split(self.infoFileDelimiter)
-                    if(currentLine[0] == username):
-                        response['success'] = True
-                        response['msg'] = "User found."
-                        user = {
-                            "username": str(currentLine[0]).strip(),
-                            "password": str(currentLine[1]).strip()
-                        }
-                        response['data'] = user
+        password = self._getUserInfoStore().get(username)
 
-                        return response
-            
+        if password is not None:
+            response['success'] = True
+            response['msg'] = "User found."
+            user = {
+                "username": str(username).strip(),
+                "password": password
+            }
+            response['data'] = user
+        else:
             response['msg'] = "User not found."
 
         return response
@@ -288,24 +931,94 @@ class GrafanaManager(object):
             "msg": None
         }
 
+        self._prepareUserInfoFile()
+
         if not exists(self.infoFilePath):
             response['msg'] = "User Info File not found."
             return response
 
-        with open(self.infoFilePath,'r') as infoF:
-            storedUsers = []
-            for line in infoF:
-                if len(line.strip()) > 0:
-                    currentLine = line.split(self.infoFileDelimiter)
-                    user = {
-                        "username": str(currentLine[0]).strip(),
-                        "password": str(currentLine[1]).strip()
-                    }
-                    storedUsers.append(user)
+        storedUsers = []
+        for username, password in self._getUserInfoStore().getAll():
+            user = {
+                "username": str(username).strip(),
+                "password": password
+            }
+            storedUsers.append(user)
 
-            response['success'] = True
-            response['msg'] = "Users stored in data."
-            response['data'] = storedUsers
+        response['success'] = True
+        response['msg'] = "Users stored in data."
+        response['data'] = storedUsers
+
+        return response
+
+    def _prepareUserInfoFile(self):
+        """
+        Creates the user information file if it does not exist and stores the admin login in it.
+        Runs once, at construction or, for lazy objects, on first use of the file.
+        """
+        with self._sessionLock:
+            if not self._infoFilePending:
+                return
+            self._infoFilePending = False
+
+            # Create User Information file if it does not exist
+            if self.infoFilePath is not None:
+                if not exists(self.infoFilePath):
+                    fout = open(self.infoFilePath, 'w')
+                    fout.close()
+
+            # Store admin username and password
+            if self.username is not None and self.password is not None and self.infoFilePath is not None:
+                self.storeUserInfo(self.username, self.password)
+
+    def _getUserInfoStore(self):
+        """
+        Returns the indexed store of the current user information file, opening it on first use.
+        """
+        with self._sessionLock:
+            if isinstance(self.infoBackend, UserInfoStore):
+                return self.infoBackend
+
+            storeKey = (self.infoBackend, self.infoFilePath, self.infoFileDelimiter)
+            if self._userInfoStore is None or self._userInfoStoreKey != storeKey:
+                if self._userInfoStore is not None:
+                    self._userInfoStore.close()
+                self._userInfoStore = openUserInfoStore(self.infoBackend, self.infoFilePath, self.infoFileDelimiter)
+                self._userInfoStoreKey = storeKey
+            return self._userInfoStore
+
+    def migrateUserInfo(self, sourceFilePath, sourceDelimiter):
+        """
+        Copies every username and password of a delimited user information file
+        into the object's user information store.
+
+        :param sourceFilePath: Path to the user information file to migrate
+        :type sourceFilePath: str
+        :param sourceDelimiter: Delimiter of the user information file to migrate
+        :type sourceDelimiter: str
+        :return: Function Status
+        :rtype: JSON dictionary
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        if not exists(sourceFilePath):
+            response['msg'] = "Source User Info File not found."
+            return response
+
+        self._prepareUserInfoFile()
+
+        if self.infoFilePath is None or not exists(self.infoFilePath):
+            response['msg'] = "User Info File not found."
+            return response
+
+        migrated = self._getUserInfoStore().migrateFrom(FileUserInfoStore(sourceFilePath, sourceDelimiter))
+
+        response['success'] = True
+        response['msg'] = "Migrated " + str(migrated) + " users to user info store."
+        response['data'] = migrated
 
         return response
 
@@ -331,8 +1044,6 @@ class GrafanaManager(object):
             "msg": None
         }
 
-        session = requests.session()
-
         newUser = {
             "name": newUserName, 
             "email": newUserEmail, 
@@ -355,34 +1066,135 @@ class GrafanaManager(object):
         if self.infoFilePath is None:
             response['msg'] = "No user information file path specified to object."
             return response
+
+        response = self._createUser(newUser)
+
+        if response['success']:
+            self.storeUserInfo(newUserLogin, newUserPassword)
+
+        return response
+
+    def createUsers(self, users, workers=10, jobId=None):
+        """
+        Creates many Grafana users concurrently over the shared session, then stores
+        every new login and password to the user information file in a single write.
+
+        :param users: Users to create, as dictionaries with name, email, login and password keys
+        :type users: iterable
+        :param workers: Number of users created concurrently
+        :type workers: int
+        :param jobId: Journal results under this job ID, so a rerun with the same ID skips items that already succeeded
+        :type jobId: str
+        :return: Function Status, data holds results keyed by login, created and failed counts, and elapsed seconds
+        :rtype: JSON dictionary 
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        if self.password is None:
+            response['msg'] = "No Grafana host admin password specified to object."
+            return response
         
-        # Login to Grafana
-        session.post(
-            'https://' + self.host + '/grafana/login', 
-            headers={'Content-Type': 'application/json'},
-            json={"password": self.password,"user": self.username}, 
-            verify=False
-        )
+        if self.username is None:
+            response['msg'] = "No Grafana host username specified to object."
+            return response
+
+        if self.host is None:
+            response['msg'] = "No Grafana host specified to object."
+            return response
+        
+        if self.infoFilePath is None:
+            response['msg'] = "No user information file path specified to object."
+            return response
+
+        startTime = time.perf_counter()
+
+        newUsers = [
+            {
+                "name": user['name'], 
+                "email": user['email'], 
+                "login": user['login'], 
+                "password": user['password']
+            }
+            for user in users
+        ]
+
+        with (self._openJournal(jobId) if jobId is not None else nullcontext()) as journal:
+            completed = journal.completed() if journal is not None else {}
+
+            def create(newUser):
+                if completed.get(newUser['login'], {}).get('success'):
+                    return dict(RESUMED_STATUS)
+
+                try:
+                    status = self._createUser(newUser)
+                except requests.exceptions.RequestException as e:
+                    status = {
+                        "success": False,
+                        "msg": "Failed to create new Grafana user. " + str(e)
+                    }
+
+                if journal is not None:
+                    journal.record(newUser['login'], status)
+                return status
+
+            with concurrentFutures.ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+                results = list(executor.map(create, newUsers))
+
+        # Users created by an earlier run are stored again, in case that run died before storing them
+        userStatus = {}
+        createdUsers = {}
+        for newUser, status in zip(newUsers, results):
+            userStatus[newUser['login']] = status
+            if status['success']:
+                createdUsers[newUser['login']] = newUser['password']
+
+        storeStatus = self.storeUsersInfo(createdUsers)
+
+        response['data'] = {
+            "users": userStatus,
+            "created": len(createdUsers),
+            "failed": len(newUsers) - len(createdUsers),
+            "elapsed": time.perf_counter() - startTime
+        }
+
+        if not storeStatus['success']:
+            response['msg'] = "Created Grafana users but failed to store user info. " + storeStatus['msg']
+        elif len(createdUsers) == len(newUsers):
+            response['success'] = True
+            response['msg'] = "Successfully created new Grafana users."
+        else:
+            response['msg'] = "Failed to create some Grafana users. Check data for specific information."
+
+        return response
+
+    def _createUser(self, newUser):
+        """
+        Sends create request for one user without touching the user information file.
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
         # Create New User
-        x = session.post(
-            'https://' + self.host + '/grafana/api/admin/users', 
+        x = self._adminRequest(
+            'POST',
+            '/grafana/api/admin/users', 
             headers={'Content-Type': 'application/json', 'Accept': 'application/json'}, 
-            json=newUser, 
-            verify=False
+            json=newUser
         )
 
         if x.status_code == 200:
             response['success'] = True
             response['msg'] = "Successfully created new Grafana user."
             response['data'] = x
-
-            self.storeUserInfo(newUserLogin, newUserPassword)
         else:
             response['msg'] = "Failed to create new Grafana user."
             response['data'] = x
 
-        session.close()
-
         return response
     
     def findUser(self, credential):
@@ -399,8 +1211,6 @@ class GrafanaManager(object):
             "msg": None
         }
 
-        session = requests.session()
-
         if self.password is None:
             response['msg'] = "No Grafana host admin password specified to object."
             return response
@@ -413,39 +1223,40 @@ class GrafanaManager(object):
             response['msg'] = "No Grafana host specified to object."
             return response
         
-        # Login to Grafana
-        session.post(
-            'https://' + self.host + '/grafana/login', 
-            headers={'Content-Type': 'application/json'},
-            json={"password": self.password,"user": self.username}, 
-            verify=False
-        )
         # Find User
-        x = session.get(
-            'https://' + self.host + '/grafana/api/users/lookup?loginOrEmail=' + str(credential), 
+        x = self._adminRequest(
+            'GET',
+            '/grafana/api/users/lookup', 
             headers={'Content-Type': 'application/json', 'Accept': 'application/json'}, 
-            verify=False
+            params={'loginOrEmail': str(credential)}
         )
 
         if x.status_code == 200:
             response['success'] = True
             response['msg'] = "Successfully found Grafana user."
             response['data'] = x
+
+            self.userIdCache.put(x.json())
         else:
             response['msg'] = "Failed to find Grafana user."
             response['data'] = x
 
-        session.close()
-
         return response
     
-    def getAllUsers(self):
-        response = {
-            "success": False,
-            "msg": None
-        }
+    def getAllUsers(self, pageSize=None):
+        """
+        Get all Grafana users
 
-        session = requests.session()
+        :param pageSize: Users fetched per page. When given, users are paged through
+            iterUsers and data holds the list of user dictionaries instead of the raw response
+        :type pageSize: int
+        :return: Function Status
+        :rtype: JSON dictionary 
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
 
         if self.password is None:
             response['msg'] = "No Grafana host admin password specified to object."
@@ -458,33 +1269,98 @@ class GrafanaManager(object):
         if self.host is None:
             response['msg'] = "No Grafana host specified to object."
             return response
+
+        if pageSize is not None:
+            try:
+                response['data'] = list(self.iterUsers(pageSize))
+                response['success'] = True
+                response['msg'] = "Successfully found Grafana user."
+            except requests.exceptions.HTTPError as e:
+                response['msg'] = "Failed to find Grafana user."
+                response['data'] = e.response
+            return response
         
-        # Login to Grafana
-        session.post(
-            'https://' + self.host + '/grafana/login', 
-            headers={'Content-Type': 'application/json'},
-            json={"password": self.password,"user": self.username}, 
-            verify=False
-        )
         # Get Users
-        x = session.get(
-            'https://' + self.host + '/grafana/api/users', 
-            headers={'Content-Type': 'application/json', 'Accept': 'application/json'}, 
-            verify=False
+        x = self._adminRequest(
+            'GET',
+            '/grafana/api/users', 
+            headers={'Content-Type': 'application/json', 'Accept': 'application/json'}
         )
 
         if x.status_code == 200:
             response['success'] = True
             response['msg'] = "Successfully found Grafana user."
             response['data'] = x
+
+            for user in x.json():
+                self.userIdCache.put(user)
         else:
             response['msg'] = "Failed to find Grafana user."
             response['data'] = x
 
-        session.close()
-
         return response
-    
+
+    def iterUsers(self, pageSize=1000, prefetch=True):
+        """
+        Lazily yields every Grafana user, one search page at a time, so only
+        about two pages are held in memory.
+
+        :param pageSize: Users fetched per page
+        :type pageSize: int
+        :param prefetch: Fetch the next page in the background while the current page is consumed
+        :type prefetch: bool
+        :return: Generator of Grafana user dictionaries
+        :rtype: generator
+        :raises ValueError: If host or admin login is not specified to object
+        :raises requests.exceptions.HTTPError: If a page fails to load
+        """
+        if self.password is None:
+            raise ValueError("No Grafana host admin password specified to object.")
+        
+        if self.username is None:
+            raise ValueError("No Grafana host username specified to object.")
+        
+        if self.host is None:
+            raise ValueError("No Grafana host specified to object.")
+
+        def fetchPage(page):
+            x = self._adminRequest(
+                'GET',
+                '/grafana/api/users/search', 
+                headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+                params={'perpage': pageSize, 'page': page}
+            )
+            x.raise_for_status()
+            return x.json()
+
+        executor = concurrentFutures.ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            page = 1
+            pending = executor.submit(fetchPage, page) if prefetch else None
+            fetched = 0
+
+            while True:
+                result = pending.result() if prefetch else fetchPage(page)
+                users = result.get('users') or []
+                fetched += len(users)
+
+                hasMore = len(users) >= pageSize and fetched < result.get('totalCount', fetched + 1)
+                page += 1
+                if prefetch and hasMore:
+                    pending = executor.submit(fetchPage, page)
+
+                for user in users:
+                    self.userIdCache.put(user)
+                    yield user
+
+                del users, result
+
+                if not hasMore:
+                    return
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
     def changePassword(self, credential, newPassword):
         """
         Change Grafana user password
@@ -501,8 +1377,6 @@ class GrafanaManager(object):
             "msg": None
         }
 
-        session = requests.session()
-
         if self.password is None:
             response['msg'] = "No Grafana host admin password specified to object."
             return response
@@ -518,37 +1392,16 @@ class GrafanaManager(object):
         if self.infoFilePath is None:
             response['msg'] = "No user information file path specified to object."
             return response
-        
-        # Login to Grafana
-        session.post(
-            'https://' + self.host + '/grafana/login', 
-            headers={'Content-Type': 'application/json'},
-            json={"password": self.password,"user": self.username}, 
-            verify=False
-        )
 
-        # Find user with credential
-        jsonResponse = self.findUser(credential)
-
-        responseData = jsonResponse['data']
+        # Change Password
+        x, found = self._updateUser(credential, 'password', {"password": newPassword})
 
         # Return if user does not exist
-        if responseData.status_code != 200:
+        if not found:
             response['msg'] = "Failed to change password. User not found."
-            response['data'] = responseData
+            response['data'] = x
             return response
 
-        # Get User ID
-        userId = json.loads(responseData.text)['id']
-
-        # Change Password
-        x = session.put(
-            'https://' + self.host + '/grafana/api/admin/users/' + str(userId) + '/password', 
-            headers={'Content-Type': 'application/json', 'Accept': 'application/json'}, 
-            json={"password": newPassword},
-            verify=False
-        )
-
         if x.status_code == 200:
             response['success'] = True
             response['msg'] = "Successfully changed password for Grafana user."
@@ -559,8 +1412,6 @@ class GrafanaManager(object):
             response['msg'] = "Failed to change password for Grafana user."
             response['data'] = x
         
-        session.close()
-
         return response
 
     def changeAdminPermission(self, credential, makeAdmin):
@@ -579,8 +1430,6 @@ class GrafanaManager(object):
             "msg": None
         }
 
-        session = requests.session()
-
         if self.password is None:
             response['msg'] = "No Grafana host admin password specified to object."
             return response
@@ -592,37 +1441,16 @@ class GrafanaManager(object):
         if self.host is None:
             response['msg'] = "No Grafana host specified to object."
             return response
-        
-        # Login to Grafana
-        session.post(
-            'https://' + self.host + '/grafana/login', 
-            headers={'Content-Type': 'application/json'},
-            json={"password": self.password,"user": self.username}, 
-            verify=False
-        )
-
-        # Find user with credential
-        jsonResponse = self.findUser(credential)
 
-        responseData = jsonResponse['data']
+        # Change Admin Permission
+        x, found = self._updateUser(credential, 'permissions', {"isGrafanaAdmin": makeAdmin})
 
         # Return if user does not exist
-        if responseData.status_code != 200:
+        if not found:
             response['msg'] = "Failed to change admin permissions. User not found."
-            response['data'] = responseData
+            response['data'] = x
             return response
 
-        # Get User ID
-        userId = json.loads(responseData.text)['id']
-
-        # Change Admin Permission
-        x = session.put(
-            'https://' + self.host + '/grafana/api/admin/users/' + str(userId) + '/permissions', 
-            headers={'Content-Type': 'application/json', 'Accept': 'application/json'}, 
-            json={"isGrafanaAdmin": makeAdmin},
-            verify=False
-        )
-
         if x.status_code == 200:
             response['success'] = True
             response['msg'] = "Successfully changed admin permissions for Grafana user."
@@ -631,26 +1459,249 @@ class GrafanaManager(object):
             response['msg'] = "Failed to change admin permissions for Grafana user."
             response['data'] = x
 
-        session.close()
+        return response
+
+    def _findUserId(self, credential):
+        """
+        Resolves login or email to user ID, answering from the user ID cache when possible.
+        Returns the ID and the lookup response, which is None on a cache hit.
+        The ID is None when the user was not found.
+        """
+        userId = self.userIdCache.get(credential)
+        if userId is not None:
+            return userId, None
+
+        responseData = self.findUser(credential)['data']
+
+        if responseData.status_code != 200:
+            return None, responseData
+
+        return responseData.json()['id'], responseData
+
+    def _updateUser(self, credential, pathSuffix, body):
+        """
+        Sends admin PUT for the user with given login or email.
+        Returns the response and whether the user was found.
+        """
+        while True:
+            userId, responseData = self._findUserId(credential)
+
+            if userId is None:
+                return responseData, False
+
+            x = self._adminRequest(
+                'PUT',
+                '/grafana/api/admin/users/' + str(userId) + '/' + pathSuffix, 
+                headers={'Content-Type': 'application/json', 'Accept': 'application/json'}, 
+                json=body
+            )
+
+            # Cached ID belonged to a since deleted user, look it up again
+            if x.status_code == 404 and responseData is None:
+                self.userIdCache.invalidate(credential)
+                continue
+
+            return x, True
+
+    def reconcileUsers(self, desiredUsers, dryRun=False, workers=10, pageSize=1000):
+        """
+        Brings Grafana users in line with a desired state. Server users are fetched once and compared
+        with the desired state and the user information file, then only the users needing changes are
+        created or updated, concurrently. Users missing from the desired state are left alone.
+
+        :param desiredUsers: Path to desired-state JSON or CSV file, or desired users as dictionaries with login, email, name, isAdmin and optional password keys
+        :type desiredUsers: str or iterable
+        :param dryRun: Only plan the changes without applying them
+        :type dryRun: bool
+        :param workers: Number of users changed concurrently
+        :type workers: int
+        :param pageSize: Users fetched per search page
+        :type pageSize: int
+        :return: Function Status, data holds the plan and its text, results keyed by login, applied, failed and unchanged counts, and elapsed seconds
+        :rtype: JSON dictionary 
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        if self.password is None:
+            response['msg'] = "No Grafana host admin password specified to object."
+            return response
+        
+        if self.username is None:
+            response['msg'] = "No Grafana host username specified to object."
+            return response
+
+        if self.host is None:
+            response['msg'] = "No Grafana host specified to object."
+            return response
+        
+        if self.infoFilePath is None:
+            response['msg'] = "No user information file path specified to object."
+            return response
+
+        startTime = time.perf_counter()
+
+        try:
+            if isinstance(desiredUsers, str):
+                desired = loadDesiredUsers(desiredUsers)
+            else:
+                desired = [normalizeDesiredUser(user) for user in desiredUsers]
+
+            storedUsers = self.getAllUserInfo()
+            storedPasswords = {user['username']: user['password'] for user in storedUsers.get('data', [])}
+
+            plan = planUserChanges(desired, self.iterUsers(pageSize), storedPasswords)
+        except requests.exceptions.RequestException as e:
+            response['msg'] = "Failed to fetch Grafana users. " + str(e)
+            return response
+        except (OSError, ValueError, KeyError) as e:
+            response['msg'] = "Failed to plan user changes. " + str(e)
+            return response
+
+        response['data'] = {
+            "plan": [
+                {
+                    "login": userPlan['login'],
+                    "actions": [{key: value for key, value in action.items() if key != 'password'} for action in userPlan['actions']]
+                }
+                for userPlan in plan
+            ],
+            "planText": formatPlan(plan),
+            "unchanged": len(desired) - len(plan)
+        }
+
+        if dryRun:
+            response['success'] = True
+            response['msg'] = "Planned changes for " + str(len(plan)) + " Grafana users."
+            response['data']['elapsed'] = time.perf_counter() - startTime
+            return response
+
+        def apply(userPlan):
+            try:
+                return self._applyUserPlan(userPlan)
+            except requests.exceptions.RequestException as e:
+                return {
+                    "success": False,
+                    "msg": "Failed to change Grafana user. " + str(e)
+                }, None
+
+        if workers > 1 and len(plan) > 1:
+            with concurrentFutures.ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(apply, plan))
+        else:
+            results = [apply(userPlan) for userPlan in plan]
+
+        userStatus = {}
+        newPasswords = {}
+        for userPlan, (status, password) in zip(plan, results):
+            userStatus[userPlan['login']] = status
+            if password is not None:
+                newPasswords[userPlan['login']] = password
+
+        storeStatus = self.storeUsersInfo(newPasswords)
+        applied = len([status for status in userStatus.values() if status['success']])
+
+        response['data'].update({
+            "users": userStatus,
+            "applied": applied,
+            "failed": len(plan) - applied,
+            "elapsed": time.perf_counter() - startTime
+        })
+
+        if not storeStatus['success']:
+            response['msg'] = "Changed Grafana users but failed to store user info. " + storeStatus['msg']
+        elif applied == len(plan):
+            response['success'] = True
+            response['msg'] = "Successfully reconciled Grafana users. Changed " + str(applied) + " users."
+        else:
+            response['msg'] = "Failed to change some Grafana users. Check data for specific information."
 
         return response
 
+    def _applyUserPlan(self, userPlan):
+        """
+        Runs the planned actions of one user in order, stopping at the first failure.
+        Returns the user's status and the password to store, None if no password was set.
+        """
+        userId = userPlan['id']
+        storedPassword = None
+        x = None
+
+        for action in userPlan['actions']:
+            if action['action'] == 'error':
+                return {"success": False, "msg": action['msg']}, None
+
+            if action['action'] == 'create':
+                status = self._createUser({
+                    "name": action['name'],
+                    "email": action['email'],
+                    "login": userPlan['login'],
+                    "password": action['password']
+                })
+                if not status['success']:
+                    return status, None
+                x = status['data']
+                userId = x.json()['id']
+                storedPassword = action['password']
+                continue
+
+            if action['action'] == 'updateProfile':
+                path = '/grafana/api/users/' + str(userId)
+                body = {"login": userPlan['login']}
+                body.update({field: new for field, (old, new) in action['changes'].items()})
+            elif action['action'] == 'setAdmin':
+                path = '/grafana/api/admin/users/' + str(userId) + '/permissions'
+                body = {"isGrafanaAdmin": action['isAdmin']}
+            else:
+                path = '/grafana/api/admin/users/' + str(userId) + '/password'
+                body = {"password": action['password']}
+
+            x = self._adminRequest(
+                'PUT',
+                path,
+                headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+                json=body
+            )
+
+            if x.status_code != 200:
+                return {
+                    "success": False,
+                    "msg": "Failed to " + action['action'] + " for Grafana user.",
+                    "data": x
+                }, storedPassword
+
+            if action['action'] == 'setPassword':
+                storedPassword = action['password']
+            elif action['action'] == 'updateProfile':
+                # The old email is still cached under the user's ID
+                self.userIdCache.invalidate(userPlan['login'])
+
+        return {
+            "success": True,
+            "msg": "Successfully changed Grafana user.",
+            "data": x
+        }, storedPassword
+
     def createAdminToken(self, tokenName="newToken"):
         """
-        Generate new admin API token for object
+        Generate new admin API token for object. With a token cache, the cached token of the host is
+        reused without logging in, and a new token is only created once it nears expiry.
 
         :param tokenName: Name of new token
         :type tokenName: str
         :return: Function Status
         :rtype: JSON dictionary 
         """
+        if self.tokenCache is not None:
+            return self._cachedAdminToken(tokenName)
+
         response = {
             "success": False,
             "msg": None
         }
 
-        session = requests.session()
-
         if self.password is None:
             response['msg'] = "No Grafana host admin password specified to object."
             return response
@@ -664,23 +1715,16 @@ class GrafanaManager(object):
             return response
 
         try:
-            # Login to Grafana
-            session.post(
-                'https://' + self.host + '/grafana/login', 
-                headers={'Content-Type': 'application/json'},
-                json={"password": self.password,"user": self.username}, 
-                verify=False
-            )
             # Get API key
-            x = session.post(
-                'https://' + self.host + '/grafana/api/auth/keys', 
+            x = self._adminRequest(
+                'POST',
+                '/grafana/api/auth/keys', 
                 headers={'Content-Type': 'application/json'}, 
-                json={"name": tokenName, "role":"Admin"}, 
-                verify=False
+                json={"name": tokenName, "role":"Admin"}
             )
 
             if x.status_code == 200:
-                self.apiKey = json.loads(x.text)['key']
+                self.apiKey = x.json()['key']
                 response['success'] = True
                 response['msg'] = "Successfully created new Grafana API token."
                 response['data'] = x
@@ -689,21 +1733,95 @@ class GrafanaManager(object):
                 response['data'] = x
         except KeyError:
             response['msg'] = "Grafana API token with given name has already been created."
-        except:
-            response['msg'] = "Failed to create new Grafana API token."
+        except (requests.exceptions.RequestException, ValueError) as e:
+            response['msg'] = "Failed to create new Grafana API token. " + str(e)
+
+        return response
+
+    def _cachedAdminToken(self, tokenName, rejectedKey=None):
+        """
+        Takes admin API token of the host from the token cache, creating and caching a new one when the
+        cache has none, it nears expiry or it is rejectedKey. Replaced tokens are deleted from Grafana
+        once they expire. Data holds the token name, ID, expiry and whether it was created.
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        if self.host is None:
+            response['msg'] = "No Grafana host specified to object."
+            return response
+
+        self._tokenName = tokenName
+        failure = {}
+
+        def create():
+            if self.username is None or self.password is None:
+                failure['msg'] = "No Grafana host admin login specified to object."
+                return None
+
+            # Timestamped names, since Grafana keeps names of replaced tokens until they are deleted
+            body = {"name": tokenName + "-" + str(int(time.time() * 1000)), "role": "Admin"}
+            if self.tokenTTL is not None:
+                body['secondsToLive'] = int(self.tokenTTL)
 
-        session.close()
+            x = self._cookieRequest('POST', '/grafana/api/auth/keys', headers={'Content-Type': 'application/json'}, json=body)
+            if x.status_code != 200:
+                failure['msg'] = "Failed to create new Grafana API token."
+                failure['data'] = x
+                return None
+
+            created = x.json()
+            return {
+                "key": created['key'],
+                "id": created.get('id'),
+                "name": created.get('name'),
+                "expires": time.time() + self.tokenTTL if self.tokenTTL is not None else None
+            }
+
+        def revoke(tokenId):
+            return self._cookieRequest('DELETE', '/grafana/api/auth/keys/' + str(tokenId)).status_code in (200, 404)
+
+        try:
+            token, created = self.tokenCache.fetch(self.host, "Admin", create, revoke, rejectedKey)
+        except (requests.exceptions.RequestException, ValueError, KeyError, OSError) as e:
+            response['msg'] = "Failed to get cached Grafana API token. " + str(e)
+            return response
+
+        if token is None:
+            response['msg'] = failure.get('msg')
+            if 'data' in failure:
+                response['data'] = failure['data']
+            return response
+
+        self.apiKey = token['key']
+        response['success'] = True
+        response['msg'] = "Successfully created new Grafana API token." if created else "Reused cached Grafana API token."
+        response['data'] = {
+            "name": token.get('name'),
+            "id": token.get('id'),
+            "expires": token.get('expires'),
+            "created": created
+        }
 
         return response
  
     # Dashboard Methods
 
-    def createDashboard(self, fileDir):
+    def createDashboard(self, fileDir, validate=False, queryBudget=None, transform=None):
         """
-        Creates Grafana dashboard from given JSON file
+        Creates Grafana dashboard from given JSON file. The file is streamed to Grafana
+        rather than read into memory.
 
         :param fileDir: Path to JSON containing Grafana dashboard
         :type fileDir: str
+        :param validate: Check the dashboard structure before uploading
+        :type validate: bool
+        :param queryBudget: Maximum allowed values of dashboard query load fields, see checkQueryBudget. Dashboards over budget are not uploaded
+        :type queryBudget: dict
+        :param transform: Function returning the payload to upload from a dashboard upload payload, e.g. collapseRows
+        :type transform: function
         :return: Function Status
         :rtype: JSON dictionary 
         """
@@ -720,19 +1838,98 @@ class GrafanaManager(object):
             response['msg'] = "No Grafana host specified to object."
             return response
 
-        url = 'https://' + self.host + '/grafana/api/dashboards/db'
+        response['msg'] = self._queryBudgetError(queryBudget)
+        if response['msg'] is not None:
+            return response
 
-        headers = {
-            'Content-Type': 'application/json',
-            'User-Agent': "Mozilla/5.0 (Windows NT 6.1; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/72.0.3626.119 Safari/537.36",
-            'Authorization': "Bearer " + self.apiKey
-        }
+        if validate:
+            problems = validateDashboardFile(fileDir)
+            if len(problems) > 0:
+                response['msg'] = "Invalid dashboard. " + " ".join(problems)
+                return response
+
+        if queryBudget is not None or transform is not None:
+            try:
+                payload = loadDashboardFile(fileDir)
+            except ValueError as e:
+                response['msg'] = "Invalid dashboard. Invalid JSON: " + str(e)
+                return response
+
+            # Transformed dashboards are uploaded from memory instead of streamed
+            if transform is not None:
+                return self.createDashboardFromObject(payload, queryBudget=queryBudget, transform=transform)
+
+            if self._overQueryBudget(payload, queryBudget, response):
+                return response
+
+        if self.minifyDashboards:
+            if self._useGzip():
+                x = self._postDashboard(_minifiedDashboards.get(fileDir), _minifiedDashboards.getCompressed(fileDir))
+            else:
+                x = self._postDashboard(_minifiedDashboards.get(fileDir))
+        elif self._useGzip():
+            with open(fileDir, 'rb') as dashboardFile:
+                x = self._postDashboard(dashboardFile.read())
+        else:
+            with open(fileDir, 'rb') as dashboardFile:
+                x = self._postDashboard(dashboardFile)
+
+        if x.status_code == 200:
+            response['success'] = True
+            response['msg'] = "Successfully uploaded dashboard."
+            response['data'] = x
+        else:
+            response['msg'] = "Failed to upload dashboard."
+            response['data'] = x
         
-        dashboardFile = open(fileDir)
-        dashboardObject = dashboardFile.read()
-        dashboardFile.close()
+        return response
+
+    def createDashboardFromObject(self, dashboardObject, validate=False, queryBudget=None, transform=None):
+        """
+        Creates Grafana dashboard from dashboard upload payload held in memory,
+        such as a variant rendered from a DashboardTemplate
+
+        :param dashboardObject: Dashboard upload payload with a top-level dashboard key
+        :type dashboardObject: dict
+        :param validate: Check the dashboard structure before uploading
+        :type validate: bool
+        :param queryBudget: Maximum allowed values of dashboard query load fields, see checkQueryBudget. Dashboards over budget are not uploaded
+        :type queryBudget: dict
+        :param transform: Function returning the payload to upload from a dashboard upload payload, e.g. collapseRows
+        :type transform: function
+        :return: Function Status
+        :rtype: JSON dictionary 
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        if self.apiKey is None:
+            response['msg'] = "No Grafana API token specified to object."
+            return response
+
+        if self.host is None:
+            response['msg'] = "No Grafana host specified to object."
+            return response
+
+        response['msg'] = self._queryBudgetError(queryBudget)
+        if response['msg'] is not None:
+            return response
+
+        if transform is not None:
+            dashboardObject = transform(dashboardObject)
+
+        if validate:
+            problems = validateDashboard(dashboardObject)
+            if len(problems) > 0:
+                response['msg'] = "Invalid dashboard. " + " ".join(problems)
+                return response
+
+        if queryBudget is not None and self._overQueryBudget(dashboardObject, queryBudget, response):
+            return response
 
-        x = requests.post(url, headers=headers, data=dashboardObject, verify=False)
+        x = self._postDashboard(minifyDashboard(dashboardObject))
 
         if x.status_code == 200:
             response['success'] = True
@@ -744,6 +1941,70 @@ class GrafanaManager(object):
         
         return response
 
+    def _postDashboard(self, body, compressedBody=None):
+        """
+        Posts dashboard body, given as bytes or an open binary file. Bytes bodies are gzipped
+        when compressUploads is set, unless the host has rejected a gzipped upload before.
+        A host is only marked as rejecting gzip once the plain upload of a rejected body succeeds.
+        """
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': "Mozilla/5.0 (Windows NT 6.1; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/72.0.3626.119 Safari/537.36"
+        }
+
+        if self._useGzip() and isinstance(body, bytes) and len(body) >= GZIP_MIN_SIZE:
+            if compressedBody is None:
+                compressedBody = gzip.compress(body)
+
+            x = self._tokenRequest(
+                'POST',
+                '/grafana/api/dashboards/db',
+                headers=dict(headers, **{'Content-Encoding': 'gzip'}),
+                data=compressedBody
+            )
+
+            # Grafana without request decompression fails to parse the body
+            if x.status_code == 200:
+                _hostGzipAccepted[self.host] = True
+            if x.status_code not in (400, 415) or _hostGzipAccepted.get(self.host):
+                return x
+
+            plain = self._tokenRequest('POST', '/grafana/api/dashboards/db', headers=headers, data=body)
+            if plain.status_code == 200:
+                _hostGzipAccepted[self.host] = False
+            return plain
+
+        return self._tokenRequest('POST', '/grafana/api/dashboards/db', headers=headers, data=body)
+
+    def _useGzip(self):
+        return self.compressUploads and _hostGzipAccepted.get(self.host) is not False
+
+    def _queryBudgetError(self, queryBudget):
+        """
+        Returns message describing the problems of query budget, None if it is valid or not given.
+        """
+        if queryBudget is None:
+            return None
+
+        problems = validateQueryBudget(queryBudget)
+        if len(problems) > 0:
+            return "Invalid query budget. " + " ".join(problems)
+        return None
+
+    def _overQueryBudget(self, payload, queryBudget, response):
+        """
+        Analyzes query load of dashboard payload. When it is over budget, fills response
+        with the problems and the analysis and returns True.
+        """
+        analysis = analyzeDashboard(payload)
+        problems = checkQueryBudget(analysis, queryBudget)
+        if len(problems) == 0:
+            return False
+
+        response['msg'] = "Dashboard over query budget. " + " ".join(problems)
+        response['data'] = analysis
+        return True
+
     def deleteDashboard(self, dashboardUID):
         """
         Deletes given dashboard unique ID in Grafana host 
@@ -766,13 +2027,12 @@ class GrafanaManager(object):
             response['msg'] = "No Grafana host specified to object."
             return response
 
-        url = 'https://' + self.host + '/grafana/api/dashboards/uid/' + dashboardUID
+        url = '/grafana/api/dashboards/uid/' + dashboardUID
 
-        headers = {
-            'Authorization': "Bearer " + self.apiKey
-        }
+        x = self._tokenRequest('DELETE', url)
 
-        x = requests.delete(url, headers=headers, verify=False)
+        if self.dashboardCache is not None:
+            self.dashboardCache.invalidate(self.host + url)
 
         if x.status_code == 200:
             response['success'] = True
@@ -806,13 +2066,9 @@ class GrafanaManager(object):
             response['msg'] = "No Grafana host specified to object."
             return response
 
-        url = 'https://' + self.host + '/grafana/api/dashboards/uid/' + dashboardUID
+        url = '/grafana/api/dashboards/uid/' + dashboardUID
 
-        headers = {
-            'Authorization': "Bearer " + self.apiKey
-        }
-
-        x = requests.get(url, headers=headers, verify=False)
+        x = self._cachedDashboardRequest(url, dashboardUID)
         
         if x.status_code == 200:
             response['success'] = True
@@ -844,13 +2100,9 @@ class GrafanaManager(object):
             response['msg'] = "No Grafana host specified to object."
             return response
 
-        url = 'https://' + self.host + '/grafana/api/dashboards/home'
-
-        headers = {
-            'Authorization': "Bearer " + self.apiKey
-        }
+        url = '/grafana/api/dashboards/home'
 
-        x = requests.get(url, headers=headers, verify=False)
+        x = self._cachedDashboardRequest(url)
         
         if x.status_code == 200:
             response['success'] = True
@@ -862,12 +2114,87 @@ class GrafanaManager(object):
         
         return response
     
-    def uploadDashboards(self, dashboardDir):
+    def _cachedDashboardRequest(self, path, dashboardUID=None):
+        """
+        GETs dashboard payload through the dashboard cache when one is configured. Cached payloads
+        validated within dashboardCacheMaxAge are served without a request. Older payloads are served
+        once the server reports the same version, which needs the dashboard UID.
+        """
+        if self.dashboardCache is None:
+            return self._tokenRequest('GET', path)
+
+        key = self.host + path
+        entry = self.dashboardCache.get(key)
+
+        if entry is not None:
+            fresh = entry['age'] <= self.dashboardCacheMaxAge
+
+            if not fresh and dashboardUID is not None and entry['version'] is not None:
+                fresh = self._latestDashboardVersion(dashboardUID) == entry['version']
+                if fresh:
+                    self.dashboardCache.markValidated(key)
+
+            if fresh:
+                return self._cachedResponse(path, entry['content'])
+
+        x = self._tokenRequest('GET', path)
+
+        if x.status_code == 200:
+            content = x.content
+            try:
+                payload = x.json()
+                version = payload.get('meta', {}).get('version', payload.get('dashboard', {}).get('version'))
+            except (ValueError, AttributeError):
+                version = None
+            self.dashboardCache.put(key, version, content)
+        elif x.status_code == 404:
+            self.dashboardCache.invalidate(key)
+
+        return x
+
+    def _latestDashboardVersion(self, dashboardUID):
+        """
+        Asks the server for the latest version number of given dashboard, None if unavailable.
+        """
+        x = self._tokenRequest('GET', '/grafana/api/dashboards/uid/' + dashboardUID + '/versions', params={'limit': 1})
+
+        if x.status_code != 200:
+            return None
+
+        try:
+            versions = x.json()
+            # Newer Grafana wraps the list in an object
+            if isinstance(versions, dict):
+                versions = versions.get('versions', [])
+            return versions[0]['version'] if len(versions) > 0 else None
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _cachedResponse(self, path, content):
+        """
+        Wraps cached payload in a response object like the one a request would have returned.
+        """
+        return APIResponse(200, {'Content-Type': 'application/json'}, content, self._url(path), 0.0, 'OK')
+
+    def uploadDashboards(self, dashboardDir, workers=1, failFast=False, validate=False, queryBudget=None, transform=None, jobId=None):
         """
-        Uploads all dashboards in given dashboard directory
+        Uploads all dashboards in given dashboard directory and its subdirectories.
+        Results are keyed by path relative to the directory, in sorted walk order.
 
         :param dashboardDir: Path containing directory of dashboards to be uploaded
         :type dashboardDir: str
+        :param workers: Number of dashboards uploaded concurrently
+        :type workers: int
+        :param failFast: Stop uploading remaining dashboards after the first failure
+        :type failFast: bool
+        :param validate: Check the structure of every dashboard before uploading it
+        :type validate: bool
+        :param queryBudget: Maximum allowed values of dashboard query load fields, see checkQueryBudget. Dashboards over budget are not uploaded
+        :type queryBudget: dict
+        :param transform: Function returning the payload to upload from a dashboard upload payload, e.g. collapseRows
+        :type transform: function
+        :param jobId: Journal results under this job ID, so a rerun with the same ID skips items that already succeeded
+        :type jobId: str
         :return: Function Status
         :rtype: JSON dictionary 
         """
@@ -884,16 +2211,495 @@ class GrafanaManager(object):
             response['msg'] = "No Grafana host specified to object."
             return response
 
-        if(exists(dashboardDir)):
-            dashboardUploadStatus = {}
-            for root, dirs, files in os.walk(dashboardDir):
-                for file in files:
-                    response = self.createDashboard(dashboardDir + '/' + file)
-                    dashboardUploadStatus[file] = response
+        response['msg'] = self._queryBudgetError(queryBudget)
+        if response['msg'] is not None:
+            return response
+
+        if not exists(dashboardDir):
+            response['msg'] = "Given directory not found. Failed to upload dashboards."
+            return response
+
+        with (self._openJournal(jobId) if jobId is not None else nullcontext()) as journal:
+            dashboardUploadStatus = self._runUploads(
+                self._listDashboardFiles(dashboardDir),
+                workers,
+                failFast,
+                lambda filePath: self.createDashboard(filePath, validate, queryBudget, transform),
+                journal
+            )
+
+        failed = [name for name, status in dashboardUploadStatus.items() if not status['success']]
+
+        if failFast and len(failed) > 0:
+            response['msg'] = "Stopped uploading dashboards after a failure. Check data for specific information."
+        else:
             response['success'] = True
             response['msg'] = "Successfully uploaded dashboards. Check data for specific information."
-            response['data'] = dashboardUploadStatus
+        response['data'] = dashboardUploadStatus
+
+        return response
+
+    def uploadDashboardTemplate(self, template, parameterTable, workers=1, failFast=False, validate=False, queryBudget=None, transform=None, jobId=None):
+        """
+        Renders one variant of dashboard template per parameter row and uploads them,
+        without writing variants to disk. Results are keyed by variant uid in table order.
+
+        :param template: Template to render, or path to JSON containing the base dashboard
+        :type template: DashboardTemplate or str
+        :param parameterTable: Rows of DashboardTemplate.render keyword arguments
+        :type parameterTable: iterable
+        :param workers: Number of variants rendered and uploaded concurrently
+        :type workers: int
+        :param failFast: Stop uploading remaining variants after the first failure
+        :type failFast: bool
+        :param validate: Check the structure of every variant before uploading it
+        :type validate: bool
+        :param queryBudget: Maximum allowed values of dashboard query load fields, see checkQueryBudget. Variants over budget are not uploaded
+        :type queryBudget: dict
+        :param transform: Function returning the payload to upload from a dashboard upload payload, e.g. collapseRows
+        :type transform: function
+        :param jobId: Journal results under this job ID, so a rerun with the same ID skips items that already succeeded
+        :type jobId: str
+        :return: Function Status
+        :rtype: JSON dictionary 
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        if self.apiKey is None:
+            response['msg'] = "No Grafana API token specified to object."
+            return response
+        
+        if self.host is None:
+            response['msg'] = "No Grafana host specified to object."
+            return response
+
+        response['msg'] = self._queryBudgetError(queryBudget)
+        if response['msg'] is not None:
+            return response
+
+        # Results are keyed by uid, so every row needs one
+        parameterTable = list(parameterTable)
+        for rowNumber, parameters in enumerate(parameterTable, 1):
+            if not isinstance(parameters, dict) or not parameters.get('uid'):
+                response['msg'] = "Parameter row " + str(rowNumber) + " has no 'uid'. Failed to upload dashboard variants."
+                return response
+
+        if not isinstance(template, DashboardTemplate):
+            template = DashboardTemplate(template)
+
+        def createVariant(parameters):
+            try:
+                variant = template.render(**parameters)
+            except (KeyError, TypeError) as e:
+                return {
+                    "success": False,
+                    "msg": "Failed to render dashboard variant. " + str(e)
+                }
+            return self.createDashboardFromObject(variant, validate, queryBudget, transform)
+
+        with (self._openJournal(jobId) if jobId is not None else nullcontext()) as journal:
+            dashboardUploadStatus = self._runUploads(
+                [(parameters['uid'], parameters) for parameters in parameterTable],
+                workers,
+                failFast,
+                createVariant,
+                journal
+            )
+
+        failed = [name for name, status in dashboardUploadStatus.items() if not status['success']]
+
+        if failFast and len(failed) > 0:
+            response['msg'] = "Stopped uploading dashboard variants after a failure. Check data for specific information."
         else:
-            response['msg'] = "Given directory not found. Failed to upload dashboards."
+            response['success'] = True
+            response['msg'] = "Successfully uploaded dashboard variants. Check data for specific information."
+        response['data'] = dashboardUploadStatus
+
+        return response
+
+    def syncDashboards(self, dashboardDir, manifestPath=None, workers=1, failFast=False, validate=False, queryBudget=None, transform=None):
+        """
+        Uploads only the dashboards in given directory whose content changed. Dashboards are compared
+        by a hash of their JSON that ignores id, version and iteration, against the manifest of earlier
+        syncs to this host when manifestPath is given, otherwise against the copies on the server.
+
+        :param dashboardDir: Path containing directory of dashboards to be synced
+        :type dashboardDir: str
+        :param manifestPath: Path to manifest file recording hashes of uploaded dashboards
+        :type manifestPath: str
+        :param workers: Number of dashboards compared and uploaded concurrently
+        :type workers: int
+        :param failFast: Stop uploading remaining dashboards after the first failure
+        :type failFast: bool
+        :param validate: Check the structure of every dashboard before comparing it
+        :type validate: bool
+        :param queryBudget: Maximum allowed values of dashboard query load fields, see checkQueryBudget. Dashboards over budget are not uploaded
+        :type queryBudget: dict
+        :param transform: Function returning the payload to upload from a dashboard upload payload, e.g. collapseRows
+        :type transform: function
+        :return: Function Status
+        :rtype: JSON dictionary 
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        if self.apiKey is None:
+            response['msg'] = "No Grafana API token specified to object."
+            return response
+        
+        if self.host is None:
+            response['msg'] = "No Grafana host specified to object."
+            return response
+
+        response['msg'] = self._queryBudgetError(queryBudget)
+        if response['msg'] is not None:
+            return response
+
+        if not exists(dashboardDir):
+            response['msg'] = "Given directory not found. Failed to sync dashboards."
+            return response
+
+        dashboardFiles = self._listDashboardFiles(dashboardDir)
+
+        hostManifest = loadManifest(manifestPath).get(self.host, {}) if manifestPath is not None else None
+
+        def check(dashboardFile):
+            name, filePath = dashboardFile
+            try:
+                payload = loadDashboardFile(filePath)
+            except (OSError, ValueError) as e:
+                return None, None, {
+                    "success": False,
+                    "msg": "Failed to read dashboard. " + str(e)
+                }
+
+            # Hash what is uploaded, so unchanged transformed dashboards match the server copy
+            if transform is not None:
+                payload = transform(payload)
+
+            if validate:
+                problems = validateDashboard(payload)
+                if len(problems) > 0:
+                    return None, None, {
+                        "success": False,
+                        "msg": "Invalid dashboard. " + " ".join(problems)
+                    }
+
+            if queryBudget is not None:
+                status = {
+                    "success": False,
+                    "msg": None
+                }
+                if self._overQueryBudget(payload, queryBudget, status):
+                    return None, None, status
+
+            dashboard = payload.get('dashboard', payload)
+            key = dashboard.get('uid') or name
+            contentHash = dashboardHash(dashboard)
+
+            if hostManifest is not None:
+                unchanged = hostManifest.get(key) == contentHash
+            else:
+                unchanged = self._serverDashboardHash(dashboard.get('uid')) == contentHash
+
+            if unchanged:
+                return key, contentHash, {
+                    "success": True,
+                    "msg": "Dashboard unchanged. Skipped upload."
+                }
+            return key, contentHash, None
+
+        if workers > 1 and hostManifest is None:
+            with concurrentFutures.ThreadPoolExecutor(max_workers=workers) as executor:
+                checks = list(executor.map(check, dashboardFiles))
+        else:
+            checks = [check(dashboardFile) for dashboardFile in dashboardFiles]
+
+        changedFiles = [dashboardFile for dashboardFile, result in zip(dashboardFiles, checks) if result[2] is None]
+        uploadStatus = self._runUploads(changedFiles, workers, failFast, lambda filePath: self.createDashboard(filePath, transform=transform))
+
+        dashboardUploadStatus = {}
+        uploadedHashes = {}
+        for (name, filePath), (key, contentHash, status) in zip(dashboardFiles, checks):
+            if status is None:
+                status = uploadStatus[name]
+                if status['success']:
+                    uploadedHashes[key] = contentHash
+            dashboardUploadStatus[name] = status
+
+        # Syncs to other hosts may share the manifest, so only this host's uploads are merged in
+        if manifestPath is not None:
+            updateManifest(manifestPath, self.host, uploadedHashes)
+
+        failed = [name for name, status in dashboardUploadStatus.items() if not status['success']]
+
+        if failFast and len(failed) > 0:
+            response['msg'] = "Stopped syncing dashboards after a failure. Check data for specific information."
+        else:
+            response['success'] = True
+            response['msg'] = "Successfully synced dashboards. Uploaded " + str(len(changedFiles)) + " changed dashboards. Check data for specific information."
+        response['data'] = dashboardUploadStatus
+
+        return response
+
+    def exportDashboards(self, exportDir, manifestPath=None, workers=10, prune=False):
+        """
+        Downloads every dashboard of the host into given directory as <uid>.json upload payloads,
+        readable by uploadDashboards and syncDashboards. Versions of exported dashboards are recorded
+        per host in a manifest, and later exports download only dashboards whose version changed.
+
+        :param exportDir: Directory to write dashboards to, created if missing
+        :type exportDir: str
+        :param manifestPath: Path to export manifest, defaults to .manifest.json inside exportDir
+        :type manifestPath: str
+        :param workers: Number of dashboards checked and downloaded concurrently
+        :type workers: int
+        :param prune: Remove exported files of dashboards no longer on the host
+        :type prune: bool
+        :return: Function Status, data holds results keyed by uid, downloaded, unchanged, failed and removed counts, and elapsed seconds
+        :rtype: JSON dictionary 
+        """
+        response = {
+            "success": False,
+            "msg": None
+        }
+
+        if self.apiKey is None:
+            response['msg'] = "No Grafana API token specified to object."
+            return response
+        
+        if self.host is None:
+            response['msg'] = "No Grafana host specified to object."
+            return response
+
+        startTime = time.perf_counter()
+
+        os.makedirs(exportDir, exist_ok=True)
+        if manifestPath is None:
+            manifestPath = os.path.join(exportDir, '.manifest.json')
+
+        try:
+            dashboards = self._searchDashboards()
+        except requests.exceptions.HTTPError as e:
+            response['msg'] = "Failed to list dashboards. " + str(e)
+            response['data'] = e.response
+            return response
+
+        hostManifest = loadManifest(manifestPath).get(self.host, {})
+
+        def export(dashboard):
+            uid = dashboard['uid']
+            fileName = uid + '.json'
+            filePath = os.path.join(exportDir, fileName)
+            exported = hostManifest.get(uid)
+
+            try:
+                if exported is not None and exists(os.path.join(exportDir, exported['file'])):
+                    # Search results of newer Grafana carry the version, older ones need a versions request
+                    version = dashboard.get('version')
+                    if version is None:
+                        version = self._latestDashboardVersion(uid)
+                    if version is not None and version == exported['version']:
+                        return None, {
+                            "success": True,
+                            "msg": "Dashboard unchanged. Skipped download."
+                        }
+
+                x = self._tokenRequest('GET', '/grafana/api/dashboards/uid/' + uid)
+                if x.status_code != 200:
+                    return None, {
+                        "success": False,
+                        "msg": "Failed to download dashboard.",
+                        "data": x
+                    }
+
+                payload = x.json()
+                model = dict(payload['dashboard'])
+                version = payload.get('meta', {}).get('version', model.get('version'))
+                # Ids are local to an instance, Grafana matches uploads by uid
+                model['id'] = None
+
+                saveDashboardFile(filePath, {"dashboard": model, "overwrite": True})
+            except (OSError, ValueError, KeyError, requests.exceptions.RequestException) as e:
+                return None, {
+                    "success": False,
+                    "msg": "Failed to export dashboard. " + str(e)
+                }
+
+            return {"version": version, "file": fileName}, {
+                "success": True,
+                "msg": "Successfully exported dashboard.",
+                "data": {"version": version, "file": fileName}
+            }
+
+        if workers > 1:
+            with concurrentFutures.ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(export, dashboards))
+        else:
+            results = [export(dashboard) for dashboard in dashboards]
+
+        dashboardExportStatus = {}
+        exportedEntries = {}
+        downloaded = failed = 0
+        for dashboard, (entry, status) in zip(dashboards, results):
+            dashboardExportStatus[dashboard['uid']] = status
+            if entry is not None:
+                exportedEntries[dashboard['uid']] = entry
+                downloaded += 1
+            elif not status['success']:
+                failed += 1
+
+        prunedUids = []
+        if prune:
+            current = set(dashboardExportStatus)
+            prunedUids = [uid for uid in hostManifest if uid not in current]
+            for uid in prunedUids:
+                filePath = os.path.join(exportDir, hostManifest[uid]['file'])
+                if exists(filePath):
+                    os.remove(filePath)
+        removed = len(prunedUids)
+
+        # Exports of other hosts may share the manifest, so only this host's entries are merged in
+        updateManifest(manifestPath, self.host, exportedEntries, prunedUids)
+
+        response['data'] = {
+            "dashboards": dashboardExportStatus,
+            "downloaded": downloaded,
+            "unchanged": len(dashboards) - downloaded - failed,
+            "failed": failed,
+            "removed": removed,
+            "elapsed": time.perf_counter() - startTime
+        }
+
+        if failed == 0:
+            response['success'] = True
+            response['msg'] = "Successfully exported dashboards. Downloaded " + str(downloaded) + " changed dashboards."
+        else:
+            response['msg'] = "Failed to export some dashboards. Check data for specific information."
+
+        return response
+
+    def _searchDashboards(self, pageSize=5000):
+        """
+        Lists every dashboard of the host through the search API, following pages.
+        Raises HTTPError if a page fails to load.
+        """
+        dashboards = []
+        page = 1
+
+        while True:
+            x = self._tokenRequest(
+                'GET',
+                '/grafana/api/search',
+                headers={'Accept': 'application/json'},
+                params={'type': 'dash-db', 'limit': pageSize, 'page': page}
+            )
+            x.raise_for_status()
+
+            results = x.json()
+            dashboards.extend(result for result in results if result.get('type', 'dash-db') == 'dash-db' and result.get('uid'))
+
+            if len(results) < pageSize:
+                return dashboards
+            page += 1
+
+    def _serverDashboardHash(self, dashboardUID):
+        """
+        Returns content hash of the server copy of given dashboard, None if it cannot be fetched.
+        """
+        if dashboardUID is None:
+            return None
+
+        x = self.findDashboard(dashboardUID)
+        if not x['success']:
+            return None
+
+        return dashboardHash(x['data'].json()['dashboard'])
+
+    def _openJournal(self, jobId):
+        return JobJournal.forJob(self.journalDir, jobId, self.host)
+
+    def _listDashboardFiles(self, dashboardDir):
+        """
+        Walks given directory in sorted order, returning (name, path) pairs where
+        name is the path relative to the directory. Hidden files and directories, such as
+        export manifests, are left out.
+        """
+        dashboardFiles = []
+        for root, dirs, files in os.walk(dashboardDir):
+            dirs[:] = sorted(directory for directory in dirs if not directory.startswith('.'))
+            for file in sorted(name for name in files if not name.startswith('.')):
+                filePath = os.path.join(root, file)
+                dashboardFiles.append((os.path.relpath(filePath, dashboardDir).replace(os.sep, '/'), filePath))
+
+        return dashboardFiles
+
+    def _runUploads(self, dashboardSources, workers, failFast, createFunction, journal=None):
+        """
+        Uploads (name, source) pairs with up to given number of workers, passing each source to
+        createFunction. Returns status of every pair in input order, marking pairs skipped by failFast.
+        With a journal, pairs that succeeded in an earlier run are skipped and every result is recorded.
+        """
+        dashboardUploadStatus = {}
+        completed = journal.completed() if journal is not None else {}
+
+        def upload(name, source):
+            try:
+                status = createFunction(source)
+            except (OSError, requests.exceptions.RequestException) as e:
+                status = {
+                    "success": False,
+                    "msg": "Failed to upload dashboard. " + str(e)
+                }
+
+            if journal is not None:
+                journal.record(name, status)
+            return status
+
+        skipped = {
+            "success": False,
+            "msg": "Skipped dashboard after an earlier failure."
+        }
+
+        stopped = False
+
+        if workers <= 1:
+            for name, source in dashboardSources:
+                if completed.get(name, {}).get('success'):
+                    dashboardUploadStatus[name] = dict(RESUMED_STATUS)
+                    continue
+
+                if stopped:
+                    dashboardUploadStatus[name] = dict(skipped)
+                    continue
+
+                dashboardUploadStatus[name] = upload(name, source)
+                stopped = failFast and not dashboardUploadStatus[name]['success']
+
+            return dashboardUploadStatus
+
+        with concurrentFutures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (name, None if completed.get(name, {}).get('success') else executor.submit(upload, name, source))
+                for name, source in dashboardSources
+            ]
+
+            for name, future in futures:
+                if future is None:
+                    dashboardUploadStatus[name] = dict(RESUMED_STATUS)
+                    continue
+
+                # Uploads already in flight still report their own result
+                if stopped and future.cancel():
+                    dashboardUploadStatus[name] = dict(skipped)
+                    continue
+
+                dashboardUploadStatus[name] = future.result()
+                stopped = stopped or (failFast and not dashboardUploadStatus[name]['success'])
 
-        return response
\ No newline at end of file
+        return dashboardUploadStatus
@@ -0,0 +1,126 @@
+import json, os, re, threading, time
+
+class JobJournal(object):
+    """
+    Append-only record of the items a bulk job has finished, one JSON line per item, so a rerun of the
+    job can skip them. Every line reaches the operating system as it is recorded, surviving the process
+    being killed, while fsync to disk happens in batches.
+
+    :param filePath: Path to journal file, created on first record
+    :type filePath: str
+    :param syncEvery: Records written between fsyncs
+    :type syncEvery: int
+    :param syncInterval: Longest time in seconds a record waits for fsync
+    :type syncInterval: float
+    """
+    def __init__(self, filePath, syncEvery=100, syncInterval=1.0):
+        """
+        Constructor Method
+        """
+        self.filePath = filePath
+        self.syncEvery = syncEvery
+        self.syncInterval = syncInterval
+
+        self._lock = threading.Lock()
+        self._fd = None
+        self._unsynced = 0
+        self._lastSync = time.monotonic()
+
+    @classmethod
+    def forJob(cls, journalDir, jobId, host, **options):
+        """
+        Opens journal of given job on given host, so one job ID run against several hosts keeps one journal per host.
+
+        :param journalDir: Directory of job journals
+        :type journalDir: str
+        :param jobId: Job ID, the same on every run of the job
+        :type jobId: str
+        :param host: Grafana Host
+        :type host: str
+        :return: Job journal
+        :rtype: JobJournal
+        """
+        fileName = re.sub(r'[^A-Za-z0-9_.-]+', '_', str(jobId) + '@' + str(host)) + '.jsonl'
+        return cls(os.path.join(journalDir, fileName), **options)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def completed(self):
+        """
+        Reads results of the items finished by earlier runs. A line cut short by a crash is ignored.
+
+        :return: Last recorded result keyed by item name
+        :rtype: dict
+        """
+        results = {}
+        if not os.path.exists(self.filePath):
+            return results
+
+        with open(self.filePath, 'r') as journalFile:
+            for line in journalFile:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                results[record['item']] = record
+
+        return results
+
+    def record(self, item, status):
+        """
+        Appends result of one item.
+
+        :param item: Item name, e.g. dashboard file name or user login
+        :type item: str
+        :param status: Function Status of the item, its data is reduced to the HTTP status code
+        :type status: dict
+        """
+        data = status.get('data')
+        line = json.dumps({
+            "item": item,
+            "success": bool(status.get('success')),
+            "msg": status.get('msg'),
+            "status": getattr(data, 'status_code', None),
+            "time": time.time()
+        }) + '\n'
+
+        with self._lock:
+            if self._fd is None:
+                directory = os.path.dirname(os.path.abspath(self.filePath))
+                os.makedirs(directory, exist_ok=True)
+                self._fd = os.open(self.filePath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+            # One unbuffered write per line, so a killed process leaves whole lines behind
+            os.write(self._fd, line.encode('utf-8'))
+            self._unsynced += 1
+
+            if self._unsynced >= self.syncEvery or time.monotonic() - self._lastSync >= self.syncInterval:
+                self._sync()
+
+    def close(self):
+        """
+        Syncs remaining records to disk and closes the journal file.
+        """
+        with self._lock:
+            if self._fd is not None:
+                self._sync()
+                os.close(self._fd)
+                self._fd = None
+
+    def remove(self):
+        """
+        Deletes journal file, once its job has finished and will not be resumed.
+        """
+        self.close()
+        if os.path.exists(self.filePath):
+            os.remove(self.filePath)
+
+    def _sync(self):
+        if self._unsynced > 0:
+            os.fsync(self._fd)
+        self._unsynced = 0
+        self._lastSync = time.monotonic()
@@ -0,0 +1,178 @@
+import re, threading
+
+# Upper bounds in seconds of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+# Path segments holding IDs, replaced so requests group by endpoint
+_ENDPOINT_PATTERNS = (
+    (re.compile(r'/users/\d+'), '/users/:id'),
+    (re.compile(r'/uid/[^/]+'), '/uid/:uid'),
+    (re.compile(r'/keys/\d+'), '/keys/:id')
+)
+
+def endpointName(path):
+    """
+    Groups API path under its endpoint by replacing IDs with placeholders.
+
+    :param path: API path
+    :type path: str
+    :return: Endpoint name
+    :rtype: str
+    """
+    for pattern, replacement in _ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return path
+
+class RequestMetrics(object):
+    """
+    Thread-safe per-endpoint request counters: latency histogram, status codes and bytes moved,
+    along with login and retry counts
+
+    :param host: Grafana Host, used as label of exported metrics
+    :type host: str
+    """
+    def __init__(self, host=None):
+        """
+        Constructor Method
+        """
+        self.host = host
+
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._counters = {
+            "logins": 0,
+            "retries": 0
+        }
+
+    def record(self, method, path, status, elapsed, bytesSent, bytesReceived):
+        """
+        Records one request attempt.
+
+        :param method: HTTP method
+        :type method: str
+        :param path: API path
+        :type path: str
+        :param status: HTTP status code, or 'error' if no response was received
+        :type status: int or str
+        :param elapsed: Seconds the attempt took
+        :type elapsed: float
+        :param bytesSent: Request body size
+        :type bytesSent: int
+        :param bytesReceived: Response body size
+        :type bytesReceived: int
+        """
+        key = method + ' ' + endpointName(path)
+
+        with self._lock:
+            endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                endpoint = self._endpoints[key] = {
+                    "count": 0,
+                    "statusCodes": {},
+                    "latencySum": 0.0,
+                    "latencyBuckets": [0] * len(LATENCY_BUCKETS),
+                    "bytesSent": 0,
+                    "bytesReceived": 0
+                }
+
+            endpoint['count'] += 1
+            endpoint['statusCodes'][status] = endpoint['statusCodes'].get(status, 0) + 1
+            endpoint['latencySum'] += elapsed
+            endpoint['bytesSent'] += bytesSent
+            endpoint['bytesReceived'] += bytesReceived
+
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if elapsed <= bound:
+                    endpoint['latencyBuckets'][i] += 1
+                    break
+
+    def increment(self, counter, amount=1):
+        """
+        Adds to a named counter, such as logins or retries.
+
+        :param counter: Counter name
+        :type counter: str
+        :param amount: Amount added
+        :type amount: int
+        """
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def snapshot(self):
+        """
+        Copies current metrics.
+
+        :return: Counters, and per-endpoint count, status codes, latency sum, cumulative latency buckets and bytes
+        :rtype: dict
+        """
+        with self._lock:
+            endpoints = {}
+            for key, endpoint in self._endpoints.items():
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(LATENCY_BUCKETS, endpoint['latencyBuckets']):
+                    cumulative += count
+                    buckets[bound] = cumulative
+
+                endpoints[key] = {
+                    "count": endpoint['count'],
+                    "statusCodes": dict(endpoint['statusCodes']),
+                    "latencySum": endpoint['latencySum'],
+                    "latencyBuckets": buckets,
+                    "bytesSent": endpoint['bytesSent'],
+                    "bytesReceived": endpoint['bytesReceived']
+                }
+
+            snapshot = dict(self._counters)
+            snapshot['endpoints'] = endpoints
+
+            return snapshot
+
+    def prometheus(self):
+        """
+        Formats current metrics in Prometheus text exposition format.
+
+        :return: Metrics text
+        :rtype: str
+        """
+        snapshot = self.snapshot()
+        hostLabel = 'host="' + _escapeLabel(self.host or '') + '"'
+        lines = []
+
+        lines.append('# HELP grafana_manager_requests_total Requests sent to Grafana by status code.')
+        lines.append('# TYPE grafana_manager_requests_total counter')
+        for key, endpoint in sorted(snapshot['endpoints'].items()):
+            labels = hostLabel + ',' + _endpointLabels(key)
+            for status, count in sorted(endpoint['statusCodes'].items(), key=lambda item: str(item[0])):
+                lines.append('grafana_manager_requests_total{' + labels + ',status="' + str(status) + '"} ' + str(count))
+
+        lines.append('# HELP grafana_manager_request_duration_seconds Latency of requests sent to Grafana.')
+        lines.append('# TYPE grafana_manager_request_duration_seconds histogram')
+        for key, endpoint in sorted(snapshot['endpoints'].items()):
+            labels = hostLabel + ',' + _endpointLabels(key)
+            for bound, count in endpoint['latencyBuckets'].items():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append('grafana_manager_request_duration_seconds_bucket{' + labels + ',le="' + le + '"} ' + str(count))
+            lines.append('grafana_manager_request_duration_seconds_sum{' + labels + '} ' + repr(endpoint['latencySum']))
+            lines.append('grafana_manager_request_duration_seconds_count{' + labels + '} ' + str(endpoint['count']))
+
+        lines.append('# HELP grafana_manager_request_bytes_total Bytes sent to and received from Grafana.')
+        lines.append('# TYPE grafana_manager_request_bytes_total counter')
+        for key, endpoint in sorted(snapshot['endpoints'].items()):
+            labels = hostLabel + ',' + _endpointLabels(key)
+            lines.append('grafana_manager_request_bytes_total{' + labels + ',direction="sent"} ' + str(endpoint['bytesSent']))
+            lines.append('grafana_manager_request_bytes_total{' + labels + ',direction="received"} ' + str(endpoint['bytesReceived']))
+
+        for counter in sorted(key for key in snapshot if key != 'endpoints'):
+            name = 'grafana_manager_' + counter + '_total'
+            lines.append('# TYPE ' + name + ' counter')
+            lines.append(name + '{' + hostLabel + '} ' + str(snapshot[counter]))
+
+        return '\n'.join(lines) + '\n'
+
+def _endpointLabels(key):
+    method, endpoint = key.split(' ', 1)
+    return 'method="' + method + '",endpoint="' + _escapeLabel(endpoint) + '"'
+
+def _escapeLabel(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
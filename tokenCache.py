@@ -0,0 +1,118 @@
+import json, threading, time
+from os.path import exists
+from fileTools import FileLock, atomicWrite
+
+class TokenCache(object):
+    """
+    Grafana API tokens kept in a JSON file shared by every process using it, keyed by host and role.
+    Reads and updates hold an exclusive lock on a companion .lock file, so concurrent jobs agree on
+    one token instead of each creating their own. The cache file holds secrets and is only readable
+    by its owner.
+
+    :param filePath: Path to cache file, created on first store
+    :type filePath: str
+    :param refreshMargin: Seconds before expiry at which a token is rotated instead of reused
+    :type refreshMargin: float
+    """
+    def __init__(self, filePath, refreshMargin=300):
+        """
+        Constructor Method
+        """
+        self.filePath = filePath
+        self.refreshMargin = refreshMargin
+        self._lock = threading.Lock()
+
+    def get(self, host, role):
+        """
+        Finds cached token of host and role that is not about to expire.
+
+        :param host: Grafana Host
+        :type host: str
+        :param role: Token role, e.g. Admin
+        :type role: str
+        :return: Token entry with key, id, name, created and expires, None if there is no usable token
+        :rtype: dict
+        """
+        # Writes replace the file whole, so reads need no lock
+        entry = self._read().get(host, {}).get(role)
+
+        if entry is not None and self._usable(entry['token']):
+            return entry['token']
+        return None
+
+    def fetch(self, host, role, create, revoke=None, rejectedKey=None):
+        """
+        Returns cached token of host and role, calling create for a new one when there is none,
+        it expires within refreshMargin, or it is rejectedKey. Replaced tokens are kept until they
+        expire, so processes still using them are not cut off, and are then passed to revoke.
+
+        :param host: Grafana Host
+        :type host: str
+        :param role: Token role, e.g. Admin
+        :type role: str
+        :param create: Function creating a token, returning an entry with key, id, name and expires, or None on failure
+        :type create: function
+        :param revoke: Function called with the ID of every expired replaced token, returning True once it is deleted
+        :type revoke: function
+        :param rejectedKey: Token Grafana refused, replaced unless another process already did
+        :type rejectedKey: str
+        :return: (token entry or None if create failed, True if the token was created)
+        :rtype: tuple
+        """
+        with self._locked():
+            tokens = self._read()
+            entry = tokens.get(host, {}).get(role)
+
+            if entry is not None and self._usable(entry['token']) and entry['token']['key'] != rejectedKey:
+                return entry['token'], False
+
+            token = create()
+            if token is None:
+                return None, False
+            token.setdefault('created', time.time())
+
+            retired = list(entry['retired']) if entry is not None else []
+            if entry is not None and entry['token'].get('id') is not None:
+                if entry['token']['key'] == rejectedKey:
+                    # Rejected tokens are useless to every process
+                    if revoke is not None:
+                        revoke(entry['token']['id'])
+                else:
+                    retired.append({"id": entry['token']['id'], "expires": entry['token'].get('expires')})
+
+            if revoke is not None:
+                now = time.time()
+                retired = [item for item in retired if item['expires'] is None or item['expires'] > now or not revoke(item['id'])]
+
+            tokens.setdefault(host, {})[role] = {"token": token, "retired": retired}
+            self._write(tokens)
+
+        return token, True
+
+    def _usable(self, token):
+        if token.get('key') is None:
+            return False
+        if token.get('expires') is None:
+            return True
+
+        # Short-lived tokens are used for at least half their life
+        margin = min(self.refreshMargin, (token['expires'] - token.get('created', token['expires'])) / 2)
+        return token['expires'] - time.time() > margin
+
+    def _read(self):
+        if not exists(self.filePath):
+            return {}
+
+        with open(self.filePath, 'r') as cacheFile:
+            try:
+                return json.load(cacheFile)
+            except ValueError:
+                # Unreadable cache only costs a new token
+                return {}
+
+    def _write(self, tokens):
+        # Tokens are only readable by their owner
+        atomicWrite(self.filePath, json.dumps(tokens, indent=2, sort_keys=True).encode('utf-8'), mode=0o600)
+
+    def _locked(self):
+        return FileLock(self.filePath + '.lock', self._lock)
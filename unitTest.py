@@ -1,5 +1,8 @@
 from grafanaInterface import *
-import unittest, requests
+from grafanaFleet import GrafanaFleet
+from dashboardCache import DashboardCache
+from fakeGrafana import FakeGrafana
+import unittest, requests, asyncio, time, json, os, sys, subprocess, shutil
 
 # Prevents invalid certificate warning
 requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning) 
@@ -25,6 +28,11 @@ class TestGrafanaMethods(unittest.TestCase):
         result = interface.createNewUser('user', 'user@user.com', 'userLogin', 'userPassword')
         self.assertEqual(True, result['success'], result['msg'])
     
+    def test_CreateUsers(self):
+        users = [{'name': 'user' + str(i), 'email': 'user' + str(i) + '@user.com', 'login': 'batchUser' + str(i), 'password': 'userPassword'} for i in range(3)]
+        result = interface.createUsers(users, workers=3)
+        self.assertEqual(True, result['success'], result['msg'])
+
     def test_StoreUserInfo(self):
         result = interface.storeUserInfo('testingUser', 'testingUserPassword')
         self.assertEqual(True, result['success'], result['msg'])
@@ -33,18 +41,190 @@ class TestGrafanaMethods(unittest.TestCase):
         result = interface.getAllUserInfo()
         self.assertEqual(True, result['success'], result['msg'])
 
+    def test_SQLiteUserInfoBackend(self):
+        sqliteInterface = GrafanaManager(host, username, password, 'userInfo.db', None, infoBackend='sqlite')
+        result = sqliteInterface.storeUserInfo('sqliteUser', 'sqlitePassword')
+        self.assertEqual(True, result['success'], result['msg'])
+        result = sqliteInterface.getUserInfo('sqliteUser')
+        self.assertEqual('sqlitePassword', result['data']['password'], result['msg'])
+        result = sqliteInterface.getUserInfo(username)
+        self.assertEqual(password, result['data']['password'], result['msg'])
+
+    def test_MigrateUserInfo(self):
+        with open('legacyUserInfo.txt', 'w') as legacyFile:
+            legacyFile.write('legacyUser-legacyPassword\nlegacyAdmin-legacyAdminPassword\n')
+        sqliteInterface = GrafanaManager(host, username, password, 'migratedUserInfo.db', None, infoBackend='sqlite')
+        result = sqliteInterface.migrateUserInfo('legacyUserInfo.txt', '-')
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertEqual(2, result['data'])
+        result = sqliteInterface.getUserInfo('legacyUser')
+        self.assertEqual('legacyPassword', result['data']['password'], result['msg'])
+
+    def test_UserInfoStoreAbstract(self):
+        self.assertRaises(TypeError, UserInfoStore)
+
+    def test_FileUserInfoStoreCompaction(self):
+        open('compactUserInfo.txt', 'w').close()
+        store = FileUserInfoStore('compactUserInfo.txt', '-', compactThreshold=2)
+        for i in range(4):
+            store.store('compactUser', 'password' + str(i))
+        store.store('otherUser', 'otherPassword')
+        with open('compactUserInfo.txt') as infoFile:
+            lines = infoFile.readlines()
+        self.assertLess(len(lines), 5)
+        self.assertEqual(sorted(store.getAll()), sorted(tuple(line.strip().split('-', 1)) for line in lines))
+        self.assertEqual('password3', FileUserInfoStore('compactUserInfo.txt', '-').get('compactUser'))
+
+    def test_FileUserInfoStoreUnterminatedLine(self):
+        with open('unterminatedUserInfo.txt', 'w') as infoFile:
+            infoFile.write('alice-pw1\nbob-pw2')
+        store = FileUserInfoStore('unterminatedUserInfo.txt', '-')
+        self.assertEqual('pw2', store.get('bob'))
+        store.store('carol', 'pw3')
+        reloaded = FileUserInfoStore('unterminatedUserInfo.txt', '-')
+        self.assertEqual([('alice', 'pw1'), ('bob', 'pw2'), ('carol', 'pw3')], list(reloaded.getAll()))
+
+    def test_FileUserInfoStoreReload(self):
+        open('sharedUserInfo.txt', 'w').close()
+        reader = FileUserInfoStore('sharedUserInfo.txt', '-')
+        writer = FileUserInfoStore('sharedUserInfo.txt', '-')
+        self.assertIsNone(reader.get('sharedUser'))
+        writer.store('sharedUser', 'sharedPassword')
+        self.assertEqual('sharedPassword', reader.get('sharedUser'))
+
+    def test_DashboardCacheVersionCheck(self):
+        cachedInterface = GrafanaManager(host, key=interface.getAPIKey(), dashboardCacheDir='dashboardCache', lazy=True)
+        dashboard = {'dashboard': {'uid': 'cacheTest', 'title': 'Cache Test', 'panels': []}, 'overwrite': True}
+        cachedInterface.createDashboardFromObject(dashboard)
+
+        cachedInterface.findDashboard('cacheTest')
+        result = cachedInterface.findDashboard('cacheTest')
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertEqual(1, cachedInterface.metrics()['endpoints']['GET /grafana/api/dashboards/uid/:uid']['count'])
+
+        # A new server version is downloaded again
+        dashboard['dashboard']['title'] = 'Cache Test Changed'
+        cachedInterface.createDashboardFromObject(dashboard)
+        result = cachedInterface.findDashboard('cacheTest')
+        self.assertEqual('Cache Test Changed', result['data'].json()['dashboard']['title'])
+        self.assertEqual(2, cachedInterface.metrics()['endpoints']['GET /grafana/api/dashboards/uid/:uid']['count'])
+
+    def test_DashboardCacheEviction(self):
+        cache = DashboardCache('evictionCache', maxEntries=2)
+        cache.put('first', 1, b'{"first": 1}')
+        cache.put('second', 1, b'{"second": 1}')
+        cache.get('first')
+        cache.put('third', 1, b'{"third": 1}')
+        self.assertIsNone(cache.get('second'))
+        self.assertEqual(b'{"first": 1}', cache.get('first')['content'])
+        self.assertEqual(b'{"third": 1}', DashboardCache('evictionCache', maxEntries=2).get('third')['content'])
+
     def test_FindUser(self):
         result = interface.findUser('userLogin')
         self.assertEqual(True, result['success'], result['msg'])
+
+    def test_ResponseData(self):
+        result = interface.findUser('userLogin')
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertEqual('userLogin', result['data'].json()['login'])
+        self.assertIs(result['data'].json(), result['data'].json())
+        self.assertGreater(result['data'].elapsed.total_seconds(), 0)
     
     def test_GetAllUsers(self):
         result = interface.getAllUsers()
         self.assertEqual(True, result['success'], result['msg'])
 
+    def test_FleetFindUser(self):
+        with GrafanaFleet(maxConcurrency=4) as fleet:
+            fleet.addHost(host, username, password)
+            result = fleet.run('findUser', 'userLogin')
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertEqual(True, result['data']['hosts'][host]['success'])
+
+    def test_FleetRunNonStatusOperation(self):
+        with GrafanaFleet() as fleet:
+            fleet.addHost(host, username, password)
+            fleet.run('findUser', username)
+            result = fleet.run('getSessionStats')
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertEqual(1, result['data']['hosts'][host]['data']['logins'])
+
+    def test_IterUsers(self):
+        logins = [user['login'] for user in interface.iterUsers(pageSize=2)]
+        self.assertIn(username, logins)
+
+    def test_AsyncFindUser(self):
+        from asyncGrafanaInterface import AsyncGrafanaManager
+
+        async def findUser():
+            async with AsyncGrafanaManager(host, username, password, userInfoFilePath, userInfoFileDelimiter) as asyncInterface:
+                return await asyncInterface.findUser(username)
+
+        result = asyncio.run(findUser())
+        self.assertEqual(True, result['success'], result['msg'])
+
+    def test_AsyncGetAllUsersPaged(self):
+        from asyncGrafanaInterface import AsyncGrafanaManager
+
+        async def getAllUsers():
+            async with AsyncGrafanaManager(host, username, password, userInfoFilePath, userInfoFileDelimiter) as asyncInterface:
+                return await asyncInterface.getAllUsers(pageSize=2)
+
+        result = asyncio.run(getAllUsers())
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertIn(username, [user['login'] for user in result['data']])
+
+    def test_AsyncCreateUsersLazy(self):
+        from asyncGrafanaInterface import AsyncGrafanaManager
+
+        async def createUsers():
+            async with AsyncGrafanaManager(host, username, password, 'lazyAsyncUserInfo.txt', '-', lazy=True) as asyncInterface:
+                users = [{'name': 'lazyUser', 'email': 'lazyUser@user.com', 'login': 'lazyAsyncUser', 'password': 'lazyPassword'}]
+                return await asyncInterface.createUsers(users)
+
+        result = asyncio.run(createUsers())
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertEqual('lazyPassword', FileUserInfoStore('lazyAsyncUserInfo.txt', '-').get('lazyAsyncUser'))
+        self.assertEqual(password, FileUserInfoStore('lazyAsyncUserInfo.txt', '-').get(username))
+
+    def test_AsyncUploadDashboardsResumable(self):
+        from asyncGrafanaInterface import AsyncGrafanaManager
+
+        async def uploadDashboards():
+            async with AsyncGrafanaManager(host, username, password) as asyncInterface:
+                await asyncInterface.createAdminToken('asyncUploadToken')
+                first = await asyncInterface.uploadDashboards('Dashboards', validate=True, queryBudget={'queriesPerLoad': 10000}, jobId='unitTestAsyncUpload')
+                second = await asyncInterface.uploadDashboards('Dashboards', jobId='unitTestAsyncUpload')
+                return first, second
+
+        first, second = asyncio.run(uploadDashboards())
+        self.assertEqual(True, first['success'], first['msg'])
+        self.assertEqual(True, all(status['success'] for status in first['data'].values()), first['data'])
+        self.assertEqual(True, all(status['msg'].startswith('Completed by') for status in second['data'].values()), second['msg'])
+
+    def test_GetSessionStats(self):
+        interface.findUser('userLogin')
+        result = interface.getSessionStats()
+        self.assertGreaterEqual(result['logins'], 1)
+        self.assertGreaterEqual(result['requests'], result['connections'])
+
+    def test_Metrics(self):
+        interface.findUser('userLogin')
+        result = interface.metrics()
+        self.assertIn('GET /grafana/api/users/lookup', result['endpoints'])
+        self.assertIn('grafana_manager_requests_total', interface.metrics(prometheus=True))
+
     def test_CreateAdminToken(self):
         result = interface.createAdminToken()
         self.assertEqual(True, result['success'], result['msg'])
 
+    def test_CreateAdminTokenCached(self):
+        cached = GrafanaManager(host, username, password, userInfoFilePath, userInfoFileDelimiter, tokenCache='tokenCache.json')
+        result = cached.createAdminToken('cachedToken')
+        self.assertEqual(True, result['success'], result['msg'])
+        result = cached.createAdminToken('cachedToken')
+        self.assertEqual(False, result['data']['created'], result['msg'])
+
     def test_CreateDashboard(self):
         result = interface.createDashboard('Dashboards/networkDashboard.json')
         self.assertEqual(True, result['success'], result['msg'])
@@ -60,6 +240,305 @@ class TestGrafanaMethods(unittest.TestCase):
     def test_UploadDashboards(self):
         result = interface.uploadDashboards('Dashboards')
         self.assertEqual(True, result['success'], result['msg'])
+
+    def test_UploadDashboardsNested(self):
+        shutil.rmtree('nestedDashboards', ignore_errors=True)
+        os.makedirs('nestedDashboards/network')
+        os.makedirs('nestedDashboards/.hidden')
+        shutil.copy('Dashboards/nodeExporter.json', 'nestedDashboards/nodeExporter.json')
+        shutil.copy('Dashboards/networkDashboard.json', 'nestedDashboards/network/networkDashboard.json')
+        shutil.copy('Dashboards/networkDashboard.json', 'nestedDashboards/.hidden/networkDashboard.json')
+        result = interface.uploadDashboards('nestedDashboards')
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertEqual(['nodeExporter.json', 'network/networkDashboard.json'], list(result['data']))
+        self.assertEqual(True, all(status['success'] for status in result['data'].values()), result['data'])
+
+    def test_UploadDashboardsCompressed(self):
+        compact = GrafanaManager(host, key=interface.getAPIKey(), minifyDashboards=True, compressUploads=True)
+        result = compact.uploadDashboards('Dashboards')
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertEqual(True, all(status['success'] for status in result['data'].values()), result['data'])
+
+    def test_UploadDashboardTemplate(self):
+        variants = [{'uid': 'netVariant' + str(i), 'title': 'Network Variant ' + str(i), 'variables': {'job': 'node'}} for i in range(2)]
+        result = interface.uploadDashboardTemplate('Dashboards/networkDashboard.json', variants, workers=2)
+        self.assertEqual(True, result['success'], result['msg'])
+
+    def test_UploadDashboardTemplateMissingUid(self):
+        variants = [{'uid': 'netVariantOk', 'title': 'Network Variant'}, {'title': 'Network Variant Without UID'}]
+        result = interface.uploadDashboardTemplate('Dashboards/networkDashboard.json', variants)
+        self.assertEqual(False, result['success'], result['msg'])
+        self.assertIn('Parameter row 2', result['msg'])
+
+    def test_SyncDashboards(self):
+        result = interface.syncDashboards('Dashboards', 'dashboardManifest.json')
+        self.assertEqual(True, result['success'], result['msg'])
+
+        # Work on a copy, as the dashboards are changed
+        shutil.rmtree('syncDashboards', ignore_errors=True)
+        shutil.copytree('Dashboards', 'syncDashboards')
+        if os.path.exists('syncManifest.json'):
+            os.remove('syncManifest.json')
+        skipped = "Dashboard unchanged. Skipped upload."
+
+        result = interface.syncDashboards('syncDashboards', 'syncManifest.json')
+        self.assertEqual(True, result['success'], result['msg'])
+        result = interface.syncDashboards('syncDashboards', 'syncManifest.json')
+        self.assertEqual({'networkDashboard.json': skipped, 'nodeExporter.json': skipped}, {name: status['msg'] for name, status in result['data'].items()})
+
+        payload = loadDashboardFile('syncDashboards/networkDashboard.json')
+        payload['dashboard']['title'] = 'Network Traffic Dashboard Changed'
+        saveDashboardFile('syncDashboards/networkDashboard.json', payload)
+
+        for manifestPath in ('syncManifest.json', None):
+            result = interface.syncDashboards('syncDashboards', manifestPath)
+            self.assertEqual(True, result['success'], result['msg'])
+            self.assertNotEqual(skipped, result['data']['networkDashboard.json']['msg'])
+            self.assertEqual(skipped, result['data']['nodeExporter.json']['msg'])
+            payload['dashboard']['title'] = 'Network Traffic Dashboard Changed Again'
+            saveDashboardFile('syncDashboards/networkDashboard.json', payload)
+
+    def test_ExportDashboards(self):
+        result = interface.exportDashboards('exportedDashboards', workers=4)
+        self.assertEqual(True, result['success'], result['msg'])
+        result = interface.exportDashboards('exportedDashboards', workers=4)
+        self.assertEqual(0, result['data']['downloaded'], result['msg'])
+
+    def test_UploadDashboardsQueryBudget(self):
+        result = interface.uploadDashboards('Dashboards', queryBudget={'queriesPerMinute': 100})
+        self.assertEqual(False, result['data']['nodeExporter.json']['success'], result['data']['nodeExporter.json']['msg'])
+
+    def test_UploadDashboardsInvalidQueryBudget(self):
+        result = interface.uploadDashboards('Dashboards', queryBudget={'queriesPerMinut': 100})
+        self.assertEqual(False, result['success'], result['msg'])
+        self.assertNotIn('data', result)
+        for queryBudget in ({'refresh': 10}, {'title': 1}, {'queriesPerMinute': '100'}):
+            result = interface.uploadDashboards('Dashboards', queryBudget=queryBudget)
+            self.assertEqual(False, result['success'], result['msg'])
+
+    def test_UploadDashboardsCollapsed(self):
+        result = interface.uploadDashboards('Dashboards', transform=collapseRows)
+        self.assertEqual(True, result['success'], result['msg'])
+
+    def test_ReconcileUsersDryRun(self):
+        result = interface.reconcileUsers([{'login': 'reconcileUser', 'email': 'reconcile@user.com', 'name': 'reconcile', 'password': 'reconcilePassword'}], dryRun=True)
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertNotIn('reconcilePassword', result['data']['planText'])
+
+    def test_ReconcileUsersUnspecifiedFields(self):
+        result = interface.reconcileUsers([{'login': username}], dryRun=True)
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertEqual([], result['data']['plan'], result['data']['planText'])
+
+    def test_UploadDashboardsResumable(self):
+        result = interface.uploadDashboards('Dashboards', jobId='unitTestUpload')
+        self.assertEqual(True, result['success'], result['msg'])
+        result = interface.uploadDashboards('Dashboards', jobId='unitTestUpload')
+        self.assertEqual(True, all(status['msg'].startswith('Completed by') for status in result['data'].values()), result['msg'])
+
+    def test_UploadDashboardsParallel(self):
+        result = interface.uploadDashboards('Dashboards', workers=4, failFast=True)
+        self.assertEqual(True, result['success'], result['msg'])
+
+    def test_CreateDashboardInvalid(self):
+        from asyncGrafanaInterface import AsyncGrafanaManager
+
+        with open('invalidDashboard.json', 'w') as dashboardFile:
+            json.dump({'dashboard': {'title': 'No UID', 'panels': {}}}, dashboardFile)
+
+        async def createDashboard(key):
+            async with AsyncGrafanaManager(fake.host, key=key) as asyncInterface:
+                return await asyncInterface.createDashboard('invalidDashboard.json', validate=True)
+
+        with FakeGrafana() as fake:
+            validatingInterface = GrafanaManager(fake.host, 'admin', 'admin')
+            validatingInterface.createAdminToken()
+            for result in (validatingInterface.createDashboard('invalidDashboard.json', validate=True), asyncio.run(createDashboard(validatingInterface.getAPIKey()))):
+                self.assertEqual(False, result['success'], result['msg'])
+                self.assertIn("Dashboard has no 'uid'.", result['msg'])
+                self.assertIn("Dashboard has no 'panels' list.", result['msg'])
+            self.assertNotIn(('POST', '/grafana/api/dashboards/db'), fake.state.pathCounts)
+
+    def test_CreateDashboardStreamed(self):
+        sent = []
+        with FakeGrafana() as fake:
+            streamingInterface = GrafanaManager(fake.host, 'admin', 'admin')
+            streamingInterface.createAdminToken()
+            streamingInterface.addRequestHook(lambda method, path, status, elapsed, bytesSent, bytesReceived: sent.append((path, bytesSent)))
+            result = streamingInterface.createDashboard('Dashboards/networkDashboard.json', validate=True)
+            self.assertEqual(True, result['success'], result['msg'])
+
+            with open('Dashboards/networkDashboard.json') as dashboardFile:
+                dashboard = json.load(dashboardFile)['dashboard']
+            saved = fake.state.dashboards['dHEquNzGz']['dashboard']
+            self.assertEqual({key: value for key, value in dashboard.items() if key not in ('id', 'version')}, {key: value for key, value in saved.items() if key not in ('id', 'version')})
+            self.assertEqual([('/grafana/api/dashboards/db', os.path.getsize('Dashboards/networkDashboard.json'))], sent)
+
+    def test_UserIdCacheHits(self):
+        with FakeGrafana() as fake:
+            cachedInterface = GrafanaManager(fake.host, 'admin', 'admin', 'cacheUserInfo.txt', '-')
+            cachedInterface.createNewUser('cacheUser', 'cacheUser@user.com', 'cacheUser', 'cachePassword')
+            cachedInterface.findUser('cacheUser')
+            result = cachedInterface.changePassword('cacheUser@user.com', 'newCachePassword')
+            self.assertEqual(True, result['success'], result['msg'])
+            result = cachedInterface.changeAdminPermission('cacheUser', True)
+            self.assertEqual(True, result['success'], result['msg'])
+            self.assertEqual(1, fake.state.pathCounts[('GET', '/grafana/api/users/lookup')])
+            self.assertEqual(2, cachedInterface.userIdCache.hits)
+
+    def test_UserIdCacheExpiry(self):
+        cache = UserIdCache(ttl=0.05)
+        cache.put({'id': 2, 'login': 'expiringUser'})
+        self.assertEqual(2, cache.get('expiringUser'))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('expiringUser'))
+
+    def test_UserIdCacheEviction(self):
+        cache = UserIdCache(maxSize=2)
+        cache.put({'id': 1, 'login': 'firstUser'})
+        cache.put({'id': 2, 'login': 'secondUser'})
+        cache.get('firstUser')
+        cache.put({'id': 3, 'login': 'thirdUser'})
+        self.assertIsNone(cache.get('secondUser'))
+        self.assertEqual(1, cache.get('firstUser'))
+        self.assertEqual(3, cache.get('thirdUser'))
+
+    def test_UserIdCacheDeletedUser(self):
+        with FakeGrafana() as fake:
+            cachedInterface = GrafanaManager(fake.host, 'admin', 'admin', 'deletedUserInfo.txt', '-')
+            cachedInterface.createNewUser('deletedUser', 'deletedUser@user.com', 'deletedUser', 'deletedPassword')
+            oldId = cachedInterface.findUser('deletedUser')['data'].json()['id']
+
+            # Delete and recreate the user behind the manager's back
+            with fake.state.lock:
+                del fake.state.users[oldId]
+                del fake.state.userIndex['deletedUser']
+                del fake.state.userIndex['deletedUser@user.com']
+            cachedInterface.userIdCache.put({'id': oldId, 'login': 'deletedUser'})
+            GrafanaManager(fake.host, 'admin', 'admin', 'deletedUserInfo.txt', '-').createNewUser('deletedUser', 'deletedUser@user.com', 'deletedUser', 'deletedPassword')
+
+            result = cachedInterface.changePassword('deletedUser', 'recreatedPassword')
+            self.assertEqual(True, result['success'], result['msg'])
+            newId = fake.state.userIndex['deletedUser']
+            self.assertNotEqual(oldId, newId)
+            self.assertEqual('recreatedPassword', fake.state.passwords[newId])
+            self.assertEqual(newId, cachedInterface.userIdCache.get('deletedUser'))
+
+    def test_UserIdCacheRenamedUser(self):
+        with FakeGrafana() as fake:
+            cachedInterface = GrafanaManager(fake.host, 'admin', 'admin', 'renamedUserInfo.txt', '-')
+            cachedInterface.createNewUser('renamedUser', 'oldEmail@user.com', 'renamedUser', 'renamedPassword')
+            cachedInterface.findUser('renamedUser')
+            self.assertIsNotNone(cachedInterface.userIdCache.get('oldEmail@user.com'))
+
+            result = cachedInterface.reconcileUsers([{'login': 'renamedUser', 'email': 'newEmail@user.com'}])
+            self.assertEqual(True, result['success'], result['msg'])
+            self.assertIsNone(cachedInterface.userIdCache.get('oldEmail@user.com'))
+
+    def test_AsyncChangePasswordCached(self):
+        from asyncGrafanaInterface import AsyncGrafanaManager
+
+        async def changePassword():
+            async with AsyncGrafanaManager(fake.host, 'admin', 'admin', 'asyncCacheUserInfo.txt', '-') as asyncInterface:
+                await asyncInterface.createNewUser('asyncCacheUser', 'asyncCacheUser@user.com', 'asyncCacheUser', 'cachePassword')
+                await asyncInterface.findUser('asyncCacheUser')
+                return await asyncInterface.changePassword('asyncCacheUser', 'newCachePassword')
+
+        with FakeGrafana() as fake:
+            result = asyncio.run(changePassword())
+            self.assertEqual(True, result['success'], result['msg'])
+            self.assertEqual(1, fake.state.pathCounts[('GET', '/grafana/api/users/lookup')])
+
+    def test_LazyImports(self):
+        # A fresh interpreter, as this one already loaded requests
+        code = "import sys, grafanaInterface; print(sorted(name for name in ('requests', 'urllib3', 'argparse') if name in sys.modules))"
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        self.assertEqual('[]', result.stdout.strip(), result.stderr)
+
+    def test_LazyUserInfoFile(self):
+        if os.path.exists('lazyUserInfo.txt'):
+            os.remove('lazyUserInfo.txt')
+        lazyInterface = GrafanaManager(host, username, password, 'lazyUserInfo.txt', '-', lazy=True)
+        self.assertEqual(False, os.path.exists('lazyUserInfo.txt'))
+        result = lazyInterface.getUserInfo(username)
+        self.assertEqual(True, result['success'], result['msg'])
+        self.assertEqual(password, result['data']['password'])
+
+    def test_BenchmarkPercentile(self):
+        from benchmark import percentile
+        self.assertEqual(5, percentile(list(range(1, 11)), 0.5))
+        self.assertEqual(99, percentile(list(range(1, 101)), 0.99))
+        self.assertEqual(100, percentile(list(range(1, 101)), 1.0))
+        self.assertEqual(1, percentile([1], 0.5))
+
+    @unittest.skipIf(os.name == 'nt', "POSIX file modes")
+    def test_AtomicWriteMode(self):
+        from fileTools import atomicWrite
+        from tokenCache import TokenCache
+        umask = os.umask(0)
+        os.umask(umask)
+
+        if os.path.exists('atomicWrite.json'):
+            os.remove('atomicWrite.json')
+        atomicWrite('atomicWrite.json', b'{}')
+        self.assertEqual(0o666 & ~umask, os.stat('atomicWrite.json').st_mode & 0o777)
+        os.chmod('atomicWrite.json', 0o640)
+        atomicWrite('atomicWrite.json', b'{"changed": true}')
+        self.assertEqual(0o640, os.stat('atomicWrite.json').st_mode & 0o777)
+
+        TokenCache('modeTokenCache.json').fetch('host', 'Admin', lambda: {'key': 'key', 'id': 1, 'name': 'token', 'expires': None})
+        self.assertEqual(0o600, os.stat('modeTokenCache.json').st_mode & 0o777)
+
+    def test_RetryIdempotentRequest(self):
+        with FakeGrafana() as fake:
+            fake.failNext('GET', '/grafana/api/users/lookup', 502)
+            retryInterface = GrafanaManager(fake.host, 'admin', 'admin', backoffFactor=0.01)
+            result = retryInterface.findUser('admin')
+            self.assertEqual(True, result['success'], result['msg'])
+            self.assertEqual(2, fake.state.pathCounts[('GET', '/grafana/api/users/lookup')])
+            self.assertEqual(1, retryInterface.metrics()['retries'])
+
+    def test_RetryUnprocessedPost(self):
+        with FakeGrafana() as fake:
+            retryInterface = GrafanaManager(fake.host, 'admin', 'admin', backoffFactor=0.01)
+            retryInterface.createAdminToken()
+            fake.failNext('POST', '/grafana/api/dashboards/db', 503)
+            result = retryInterface.createDashboard('Dashboards/networkDashboard.json')
+            self.assertEqual(True, result['success'], result['msg'])
+            self.assertEqual(2, fake.state.pathCounts[('POST', '/grafana/api/dashboards/db')])
+            # The streamed file is sent again from its start
+            with open('Dashboards/networkDashboard.json') as dashboardFile:
+                panels = json.load(dashboardFile)['dashboard']['panels']
+            self.assertEqual(panels, fake.state.dashboards['dHEquNzGz']['dashboard']['panels'])
+
+    def test_NoRetryProcessedPost(self):
+        with FakeGrafana() as fake:
+            retryInterface = GrafanaManager(fake.host, 'admin', 'admin', backoffFactor=0.01)
+            retryInterface.createAdminToken()
+            fake.failNext('POST', '/grafana/api/dashboards/db', 502)
+            result = retryInterface.createDashboard('Dashboards/networkDashboard.json')
+            self.assertEqual(False, result['success'], result['msg'])
+            self.assertEqual(502, result['data'].status_code)
+            self.assertEqual(1, fake.state.pathCounts[('POST', '/grafana/api/dashboards/db')])
+            self.assertEqual(0, retryInterface.metrics()['retries'])
+
+    def test_RetryMaxBackoff(self):
+        with FakeGrafana() as fake:
+            fake.failNext('GET', '/grafana/api/users/lookup', 503, headers={'Retry-After': '60'})
+            retryInterface = GrafanaManager(fake.host, 'admin', 'admin', maxBackoff=0.2)
+            startTime = time.perf_counter()
+            result = retryInterface.findUser('admin')
+            self.assertEqual(True, result['success'], result['msg'])
+            self.assertLess(time.perf_counter() - startTime, 5)
+
+    def test_RateLimit(self):
+        with FakeGrafana() as fake:
+            limitedInterface = GrafanaManager(fake.host, 'admin', 'admin', rateLimit=10, rateBurst=1)
+            limitedInterface.findUser('admin')
+            startTime = time.perf_counter()
+            for i in range(3):
+                limitedInterface.findUser('admin')
+            self.assertGreaterEqual(time.perf_counter() - startTime, 0.25)
     
     # POST PROCESS TESTS (FAIL DURING INITIAL RUN OF UNIT TESTING)
 
@@ -0,0 +1,293 @@
+import os, threading
+from abc import ABC, abstractmethod
+from os.path import exists
+from fileTools import atomicWrite
+
+def openUserInfoStore(backend, filePath, delimiter):
+    """
+    Opens user information store of given backend.
+
+    :param backend: Store backend, 'file' or 'sqlite'
+    :type backend: str
+    :param filePath: Path to User Information File or database
+    :type filePath: str
+    :param delimiter: User Information File Delimiter, unused by the sqlite backend
+    :type delimiter: str
+    :return: User information store
+    :rtype: UserInfoStore
+    """
+    if backend == 'file':
+        return FileUserInfoStore(filePath, delimiter)
+    if backend == 'sqlite':
+        return SQLiteUserInfoStore(filePath)
+    raise ValueError("Unknown user information store backend: " + str(backend))
+
+class UserInfoStore(ABC):
+    """
+    Storage of Grafana usernames and passwords used by GrafanaManager
+    """
+    @abstractmethod
+    def get(self, username):
+        """
+        Finds password of given username.
+
+        :param username: Account username to be searched
+        :type username: str
+        :return: Stored password, None if username is not stored
+        :rtype: str
+        """
+        pass
+
+    @abstractmethod
+    def getAll(self):
+        """
+        Obtains all stored usernames and passwords.
+
+        :return: (username, password) pairs in storage order
+        :rtype: list
+        """
+        pass
+
+    @abstractmethod
+    def store(self, username, password):
+        """
+        Stores username and password, replacing any previous password.
+
+        :param username: Account username to be stored
+        :type username: str
+        :param password: Account password to be stored
+        :type password: str
+        :return: True if username was already stored
+        :rtype: bool
+        """
+        pass
+
+    def storeMany(self, users):
+        """
+        Stores many usernames and passwords at once.
+
+        :param users: Account passwords keyed by username
+        :type users: dict
+        """
+        for username, password in users.items():
+            self.store(username, password)
+
+    def migrateFrom(self, sourceStore):
+        """
+        Copies every username and password of another store into this store.
+
+        :param sourceStore: Store to copy from
+        :type sourceStore: UserInfoStore
+        :return: Number of users copied
+        :rtype: int
+        """
+        users = dict(sourceStore.getAll())
+        self.storeMany(users)
+        return len(users)
+
+    def close(self):
+        """
+        Releases resources held by the store.
+        """
+        pass
+
+class FileUserInfoStore(UserInfoStore):
+    """
+    Indexed view of a delimited user information file. The file is read once into memory,
+    updates are appended to it and the file is rewritten only when stale lines pile up.
+    The file is read again whenever another writer changes it.
+
+    :param filePath: Path to User Information File
+    :type filePath: str
+    :param delimiter: User Information File Delimiter
+    :type delimiter: str
+    :param compactThreshold: Number of stale lines tolerated before the file is rewritten
+    :type compactThreshold: int
+    """
+    def __init__(self, filePath, delimiter, compactThreshold=1000):
+        """
+        Constructor Method
+        """
+        self.filePath = filePath
+        self.delimiter = delimiter
+        self.compactThreshold = compactThreshold
+
+        self._lock = threading.RLock()
+        self._index = {}
+        self._lineCount = 0
+        self._signature = None
+
+    def get(self, username):
+        with self._lock:
+            self._refresh()
+            return self._index.get(username)
+
+    def getAll(self):
+        with self._lock:
+            self._refresh()
+            return list(self._index.items())
+
+    def store(self, username, password):
+        with self._lock:
+            self._refresh()
+            replaced = username in self._index
+            self._append({username: password})
+            return replaced
+
+    def storeMany(self, users):
+        """
+        Stores many usernames and passwords with a single append.
+        """
+        with self._lock:
+            self._refresh()
+            self._append(users)
+
+    def compact(self):
+        """
+        Rewrites the file with one line per stored username.
+        """
+        with self._lock:
+            self._refresh()
+
+            lines = [username + self.delimiter + password + '\n' for username, password in self._index.items()]
+            atomicWrite(self.filePath, ''.join(lines).encode('utf-8'), sync=True)
+
+            self._lineCount = len(lines)
+            self._signature = self._stat()
+
+    def _append(self, users):
+        if len(users) == 0:
+            return
+
+        content = ''.join(username + self.delimiter + password + '\n' for username, password in users.items()).encode('utf-8')
+        if self._endsUnterminated():
+            # Last line was written by hand or cut off by a crash, keep it apart from the batch
+            content = b'\n' + content
+
+        # One write of the whole batch, so a crash cuts off at most the last line
+        fd = os.open(self.filePath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, content)
+        finally:
+            os.close(fd)
+
+        for username, password in users.items():
+            # Replaced users move to the end, matching their position in the file
+            self._index.pop(username, None)
+            self._index[username] = password
+
+        self._lineCount += len(users)
+        self._signature = self._stat()
+
+        staleLines = self._lineCount - len(self._index)
+        if staleLines > self.compactThreshold and staleLines > len(self._index):
+            self.compact()
+
+    def _refresh(self):
+        if self._signature is None or self._stat() != self._signature:
+            self._load()
+
+    def _load(self):
+        index = {}
+        lineCount = 0
+
+        signature = self._stat()
+        with open(self.filePath, 'r') as infoF:
+            for line in infoF:
+                if len(line.strip()) > 0:
+                    currentLine = line.split(self.delimiter, 1)
+                    # Lines without a delimiter, such as one cut off by a crash while appending, hold no user
+                    if len(currentLine) < 2:
+                        continue
+                    username = str(currentLine[0])
+                    index.pop(username, None)
+                    index[username] = str(currentLine[1]).strip()
+                    lineCount += 1
+
+        self._index = index
+        self._lineCount = lineCount
+        self._signature = signature
+
+    def _endsUnterminated(self):
+        if not exists(self.filePath) or os.path.getsize(self.filePath) == 0:
+            return False
+        with open(self.filePath, 'rb') as infoF:
+            infoF.seek(-1, os.SEEK_END)
+            return infoF.read(1) != b'\n'
+
+    def _stat(self):
+        stat = os.stat(self.filePath)
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+class SQLiteUserInfoStore(UserInfoStore):
+    """
+    User information store kept in a SQLite database in WAL mode, so several
+    processes can read and update it concurrently. Each thread uses its own connection.
+
+    :param filePath: Path to SQLite database
+    :type filePath: str
+    :param timeout: Seconds to wait for another writer to release the database
+    :type timeout: float
+    """
+    def __init__(self, filePath, timeout=30.0):
+        """
+        Constructor Method
+        """
+        self.filePath = filePath
+        self.delimiter = None
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        connection = self._connect()
+        connection.execute('PRAGMA journal_mode=WAL')
+        with connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS users ('
+                'username TEXT PRIMARY KEY, '
+                'password TEXT NOT NULL)'
+            )
+
+    def get(self, username):
+        row = self._connect().execute('SELECT password FROM users WHERE username = ?', (username,)).fetchone()
+        return row[0] if row is not None else None
+
+    def getAll(self):
+        return self._connect().execute('SELECT username, password FROM users ORDER BY rowid').fetchall()
+
+    def store(self, username, password):
+        connection = self._connect()
+        with connection:
+            replaced = connection.execute('SELECT 1 FROM users WHERE username = ?', (username,)).fetchone() is not None
+            # REPLACE gives the row a new rowid, moving replaced users to the end like the file store
+            connection.execute('INSERT OR REPLACE INTO users (username, password) VALUES (?, ?)', (username, password))
+        return replaced
+
+    def storeMany(self, users):
+        """
+        Stores many usernames and passwords in one transaction.
+        """
+        connection = self._connect()
+        with connection:
+            connection.executemany('INSERT OR REPLACE INTO users (username, password) VALUES (?, ?)', users.items())
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Only the sqlite backend needs the module
+            import sqlite3
+            connection = sqlite3.connect(self.filePath, timeout=self.timeout, check_same_thread=False)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
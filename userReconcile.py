@@ -0,0 +1,135 @@
+import json, csv
+
+# Fields of a desired user compared with the server copy
+PROFILE_FIELDS = ('email', 'name')
+
+def loadDesiredUsers(filePath):
+    """
+    Reads desired-state user file. JSON files hold a list of users, or an object with a users list.
+    Other files are read as CSV with columns login, email, name, isAdmin and an optional password.
+
+    :param filePath: Path to desired-state file
+    :type filePath: str
+    :return: Desired users as dictionaries with login, email, name, isAdmin and password keys
+    :rtype: list
+    """
+    if filePath.endswith('.json'):
+        with open(filePath, 'r') as desiredFile:
+            users = json.load(desiredFile)
+        if isinstance(users, dict):
+            users = users.get('users', [])
+        return [normalizeDesiredUser(user) for user in users]
+
+    with open(filePath, 'r', newline='') as desiredFile:
+        return [normalizeDesiredUser(row) for row in csv.DictReader(desiredFile)]
+
+def normalizeDesiredUser(user):
+    """
+    Converts desired user to the keys used by planUserChanges and its admin flag to bool.
+    Fields left out or empty, such as blank CSV cells, are None, and are not changed on the server.
+
+    :param user: Desired user with at least a login
+    :type user: dict
+    :return: Desired user with login, email, name, isAdmin and password keys
+    :rtype: dict
+    """
+    login = user.get('login')
+    if not login:
+        raise ValueError("Desired user has no login: " + str(user))
+
+    isAdmin = user.get('isAdmin')
+    if isinstance(isAdmin, str):
+        isAdmin = isAdmin.strip().lower() in ('true', 'yes', '1') if len(isAdmin.strip()) > 0 else None
+
+    return {
+        "login": str(login),
+        "email": user.get('email') or None,
+        "name": user.get('name') or None,
+        "isAdmin": bool(isAdmin) if isAdmin is not None else None,
+        "password": user.get('password') or None
+    }
+
+def planUserChanges(desiredUsers, serverUsers, storedPasswords):
+    """
+    Compares desired users with the users on the server and the stored passwords, and lists
+    the changes needed per user. Users left out of the desired state are not touched.
+
+    :param desiredUsers: Desired users, as returned by normalizeDesiredUser
+    :type desiredUsers: list
+    :param serverUsers: Grafana users as returned by the users search API
+    :type serverUsers: iterable
+    :param storedPasswords: Passwords of the user information store keyed by login
+    :type storedPasswords: dict
+    :return: One entry per user needing changes, with login, server user ID (None for new users) and actions
+    :rtype: list
+    """
+    serverByLogin = {user['login']: user for user in serverUsers}
+
+    plan = []
+    seen = set()
+    for desired in desiredUsers:
+        login = desired['login']
+        if login in seen:
+            raise ValueError("Desired state lists user more than once: " + login)
+        seen.add(login)
+
+        current = serverByLogin.get(login)
+        storedPassword = storedPasswords.get(login)
+        actions = []
+
+        if current is None:
+            password = desired['password'] or storedPassword
+            if password is None:
+                actions.append({"action": "error", "msg": "New user has no password in desired state or user info file."})
+            else:
+                actions.append({"action": "create", "email": desired['email'] or '', "name": desired['name'] or '', "password": password})
+                if desired['isAdmin']:
+                    actions.append({"action": "setAdmin", "isAdmin": True})
+            plan.append({"login": login, "id": None, "actions": actions})
+            continue
+
+        changes = {}
+        for field in PROFILE_FIELDS:
+            if desired[field] is not None and desired[field] != (current.get(field) or ''):
+                changes[field] = (current.get(field) or '', desired[field])
+        if len(changes) > 0:
+            actions.append({"action": "updateProfile", "changes": changes})
+
+        # Search results call the flag isAdmin, single user lookups isGrafanaAdmin
+        currentAdmin = bool(current.get('isAdmin', current.get('isGrafanaAdmin', False)))
+        if desired['isAdmin'] is not None and desired['isAdmin'] != currentAdmin:
+            actions.append({"action": "setAdmin", "isAdmin": desired['isAdmin']})
+
+        # Server passwords cannot be read, the user information file records the last one set
+        if desired['password'] is not None and desired['password'] != storedPassword:
+            actions.append({"action": "setPassword", "password": desired['password']})
+
+        if len(actions) > 0:
+            plan.append({"login": login, "id": current['id'], "actions": actions})
+
+    return plan
+
+def formatPlan(plan):
+    """
+    Formats user change plan as one line per action, leaving out passwords.
+
+    :param plan: Plan returned by planUserChanges
+    :type plan: list
+    :return: Plan text
+    :rtype: str
+    """
+    lines = []
+    for userPlan in plan:
+        for action in userPlan['actions']:
+            if action['action'] == 'create':
+                lines.append('+ ' + userPlan['login'] + ' create (email ' + action['email'] + ', name ' + action['name'] + ')')
+            elif action['action'] == 'updateProfile':
+                changes = ', '.join(field + ' ' + repr(old) + ' -> ' + repr(new) for field, (old, new) in sorted(action['changes'].items()))
+                lines.append('~ ' + userPlan['login'] + ' ' + changes)
+            elif action['action'] == 'setAdmin':
+                lines.append('~ ' + userPlan['login'] + (' grant' if action['isAdmin'] else ' revoke') + ' admin')
+            elif action['action'] == 'setPassword':
+                lines.append('~ ' + userPlan['login'] + ' change password')
+            else:
+                lines.append('! ' + userPlan['login'] + ' ' + action['msg'])
+    return '\n'.join(lines)